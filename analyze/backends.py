@@ -0,0 +1,207 @@
+import os
+from types import SimpleNamespace
+from typing import List
+
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification, pipeline
+
+from analyze.inference import activation
+from analyze.quantization import quantize_int8
+
+BACKENDS = ("torch", "onnx")
+
+# Optional inputs a sequence classifier may take, in the order they are fed to an exported graph
+ONNX_INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+
+
+def onnx_model_dir(root: str, model_id: str) -> str:
+    """Directory holding the exported graph and config for a Hugging Face model id."""
+    return os.path.join(root, model_id.replace("/", "__"))
+
+
+def onnx_model_file(precision: str) -> str:
+    return "model.onnx" if precision == "fp32" else f"model.{precision}.onnx"
+
+
+class InferenceBackend:
+    """
+    Loads sequence classifiers for the model registry.
+
+    Whatever a backend returns from `load_model` must behave like a Hugging Face
+    model for the inference helpers: calling it with the tokenizer's tensors
+    returns an object with `.logits`, and it exposes `.config`.
+    """
+
+    name = None
+
+    def __init__(self, device: str, precision: str = "fp32"):
+        self.device = device
+        self.precision = precision
+
+    def load_model(self, model_id: str):
+        raise NotImplementedError
+
+    def build_classifier(self, task: str, model, tokenizer):
+        """A callable with the text-classification pipeline's call signature and output format."""
+        raise NotImplementedError
+
+
+class TorchBackend(InferenceBackend):
+    name = "torch"
+
+    def load_model(self, model_id: str):
+        model = AutoModelForSequenceClassification.from_pretrained(model_id).to(self.device)
+        model.eval()
+        model.requires_grad_(False)
+        if self.precision == "int8":
+            model = quantize_int8(model)
+        return model
+
+    def build_classifier(self, task: str, model, tokenizer):
+        return pipeline(task, model=model, tokenizer=tokenizer, device=self.device, top_k=None)
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    Serves graphs produced by scripts/export_onnx.py through ONNX Runtime.
+
+    Expects `<model_dir>/<model id with "/" replaced by "__">/model.onnx` (or
+    `model.int8.onnx` for int8) next to the saved model config.
+    """
+
+    name = "onnx"
+
+    def __init__(self, device: str, precision: str = "fp32", model_dir: str = "onnx_models"):
+        super().__init__(device, precision)
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise RuntimeError("INFERENCE_BACKEND=onnx requires the onnxruntime package") from e
+        self._ort = onnxruntime
+        self.model_dir = model_dir
+
+    def load_model(self, model_id: str):
+        directory = onnx_model_dir(self.model_dir, model_id)
+        path = os.path.join(directory, onnx_model_file(self.precision))
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run scripts/export_onnx.py first")
+
+        options = self._ort.SessionOptions()
+        options.graph_optimization_level = self._ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ["CPUExecutionProvider"]
+        if self.device == "cuda" and "CUDAExecutionProvider" in self._ort.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+        session = self._ort.InferenceSession(path, sess_options=options, providers=providers)
+        return OnnxSequenceClassifier(session, AutoConfig.from_pretrained(directory))
+
+    def build_classifier(self, task: str, model, tokenizer):
+        if task != "text-classification":
+            raise ValueError(f"The onnx backend only supports text-classification, not {task!r}")
+        return TextClassifier(model, tokenizer)
+
+
+class OnnxSequenceClassifier:
+    """An ONNX Runtime session dressed up as a Hugging Face sequence classifier."""
+
+    def __init__(self, session, config):
+        self.session = session
+        self.config = config
+        self.input_names = [i.name for i in session.get_inputs()]
+
+    def __call__(self, **inputs):
+        feed = {name: inputs[name].cpu().numpy() for name in self.input_names}
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+    # Registry and warm-up code treat models uniformly; a session has no training mode or device.
+    def eval(self):
+        return self
+
+    def requires_grad_(self, requires_grad: bool = True):
+        return self
+
+    def to(self, device):
+        return self
+
+
+class TextClassifier:
+    """Minimal text-classification pipeline for models that `transformers.pipeline` cannot wrap."""
+
+    def __init__(self, model, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+
+    def __call__(self, texts: List[str], truncation: bool = True, max_length: int = 512,
+                 batch_size: int = 16, **kwargs) -> List[List[dict]]:
+        if isinstance(texts, str):
+            texts = [texts]
+        to_probs = activation(self.model.config)
+        results = []
+        for start in range(0, len(texts), batch_size or len(texts)):
+            inputs = self.tokenizer(texts[start:start + (batch_size or len(texts))], return_tensors="pt",
+                                    truncation=truncation, max_length=max_length, padding=True)
+            with torch.inference_mode():
+                probs = to_probs(self.model(**inputs).logits)
+            for row in probs.tolist():
+                predictions = [{"label": self.model.config.id2label[i], "score": score} for i, score in enumerate(row)]
+                results.append(sorted(predictions, key=lambda p: p["score"], reverse=True))
+        return results
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Positional-argument wrapper so torch.onnx.export sees a plain tensors-in, logits-out module."""
+
+    def __init__(self, model, input_names):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *tensors):
+        return self.model(**dict(zip(self.input_names, tensors))).logits
+
+
+def export_onnx(model, tokenizer, path: str, opset: int = 17, sample_text: str = "Warm-up text.") -> List[str]:
+    """Export a sequence classifier to ONNX with dynamic batch and sequence axes. Returns the graph inputs."""
+    sample = tokenizer([sample_text], return_tensors="pt", truncation=True, max_length=512, padding=True)
+    input_names = [name for name in ONNX_INPUT_NAMES if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    model.eval()
+    with torch.inference_mode():
+        torch.onnx.export(
+            _LogitsOnly(model, input_names), tuple(sample[name] for name in input_names), path,
+            input_names=input_names, output_names=["logits"], dynamic_axes=dynamic_axes,
+            opset_version=opset, dynamo=False,
+        )
+    return input_names
+
+
+def optimize_onnx(source: str, destination: str):
+    """
+    Apply ONNX Runtime's graph optimizations (constant folding, node fusions) offline.
+
+    Uses the extended level rather than "all": the saved graph must stay portable
+    across CPUs, and the layout-specific optimizations are redone at load time.
+    """
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    options.optimized_model_filepath = destination
+    onnxruntime.InferenceSession(source, sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def quantize_onnx(source: str, destination: str):
+    """Dynamic int8 quantization of an exported graph's weights."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(source, destination, weight_type=QuantType.QInt8)
+
+
+def create_backend(name: str, device: str, precision: str = "fp32", model_dir: str = "onnx_models") -> InferenceBackend:
+    if name == "torch":
+        return TorchBackend(device, precision)
+    if name == "onnx":
+        return OnnxBackend(device, precision, model_dir)
+    raise ValueError(f"Unknown inference backend {name!r}, expected one of {BACKENDS}")
@@ -0,0 +1,157 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, List
+
+import numpy as np
+
+from analyze.executor import Overloaded
+from analyze.metrics import summarize
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests for one model and runs them as a single batch.
+
+    A batch is dispatched once `max_batch_size` items are waiting or the oldest
+    item has waited `max_wait_ms`, whichever comes first. `batch_fn` receives the
+    list of items and must return one result per item, in order. Batches run in
+    `pool` (a BoundedPool) when given, otherwise in `executor` (or the loop's
+    default executor); once `max_pending` requests are waiting new ones are
+    refused with Overloaded.
+
+    At most `max_in_flight` batches run at the same time. With the default of
+    one, requests that arrive while a batch is running accumulate into the next
+    batch; raise it to match the number of inference workers.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 16, max_wait_ms: float = 10.0,
+                 executor=None, history: int = 1000, pool=None, max_pending: int = 0,
+                 max_in_flight: int = 1):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.executor = executor
+        self.pool = pool
+        self.max_pending = max_pending
+        self.max_in_flight = max(1, max_in_flight)
+
+        self._pending = []
+        self._full = None
+        self._slots = None
+        self._worker = None
+        self._in_flight = set()
+
+        self._batches = 0
+        self._items = 0
+        self._errors = 0
+        self._batch_sizes = deque(maxlen=history)
+        self._queue_waits = deque(maxlen=history)
+        self._run_times = deque(maxlen=history)
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._full is None:
+            self._full = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        if self.max_pending and len(self._pending) >= self.max_pending:
+            raise Overloaded(f"{self.name} batcher has {len(self._pending)} requests waiting")
+
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._drain())
+        return await future
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                await self._slots.acquire()
+                if len(self._pending) < self.max_batch_size:
+                    remaining = self.max_wait - (time.perf_counter() - self._pending[0][2])
+                    if remaining > 0:
+                        self._full.clear()
+                        try:
+                            await asyncio.wait_for(self._full.wait(), remaining)
+                        except asyncio.TimeoutError:
+                            pass
+
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:len(batch)]
+                self._full.clear()
+                task = loop.create_task(self._run_batch(batch))
+                self._in_flight.add(task)
+                task.add_done_callback(self._batch_done)
+        except asyncio.CancelledError:
+            # Don't leave callers waiting on a batcher that is shutting down
+            for _, future, _ in self._pending:
+                future.cancel()
+            self._pending.clear()
+            raise
+
+    def _batch_done(self, task):
+        self._in_flight.discard(task)
+        self._slots.release()
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            self._queue_waits.append(started - enqueued)
+
+        try:
+            items = [item for item, _, _ in batch]
+            if self.pool is not None:
+                results = await self.pool.run(self.batch_fn, items, block=True)
+            else:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name} batch returned {len(results)} results for {len(batch)} inputs")
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            print(f"Batch error in {self.name}: {str(e)}")
+            self._errors += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._batches += 1
+            self._items += len(batch)
+            self._batch_sizes.append(len(batch))
+            self._run_times.append(time.perf_counter() - started)
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        waits_ms = np.array(self._queue_waits) * 1000.0
+        run_ms = np.array(self._run_times) * 1000.0
+        sizes = np.array(self._batch_sizes)
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self._batches,
+            "items": self._items,
+            "errors": self._errors,
+            "pending": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "batch_size": {
+                "mean": float(sizes.mean()) if sizes.size else 0.0,
+                "max": int(sizes.max()) if sizes.size else 0,
+                "histogram": {int(k): int(v) for k, v in zip(*np.unique(sizes, return_counts=True))},
+            },
+            "queue_wait_ms": summarize(waits_ms),
+            "batch_run_ms": summarize(run_ms),
+        }
+
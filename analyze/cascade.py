@@ -0,0 +1,155 @@
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+import torch
+
+from analyze.cheap_talk import scanner
+from analyze.inference import build_analysis_result, normalize_esg_scores
+from analyze.long_document import aggregate
+from analyze.preprocessing import sentence_spans
+from analyze.sentence_cache import SentenceCache
+
+# Sentence-level model score above which a sentence counts as a commitment or specific claim
+CLAIM_THRESHOLD = 0.5
+
+# Fields describing one run (timings, cache hits) rather than the text; kept out of cached results
+RUN_MEASUREMENTS = ("seconds", "full_seconds", "speedup", "sentence_cache")
+
+
+def document_sentences(text: str) -> List[Tuple[int, int]]:
+    """(start, end) offsets of the text's non-blank sentences."""
+    return [(start, end) for start, end in sentence_spans(text) if text[start:end].strip()]
+
+
+def candidate_sentences(text: str) -> Tuple[List[str], List[int]]:
+    """The text's sentences and the indices of those with at least one cheap-talk indicator hit."""
+    spans = document_sentences(text)
+    starts = [start for start, _ in spans]
+    candidates = set()
+    sentence = 0
+    for start, _, _, _ in scanner.scan(text):
+        # Hits come in text order, so the containing sentence only moves forward
+        while sentence + 1 < len(starts) and starts[sentence + 1] <= start:
+            sentence += 1
+        if spans and spans[sentence][0] <= start < spans[sentence][1]:
+            candidates.add(sentence)
+    return [text[start:end].strip() for start, end in spans], sorted(candidates)
+
+
+def score_sentences(score: Callable[[List[str]], List[Any]], sentences: List[str], batch_size: int,
+                    cache: Optional[SentenceCache] = None, model: str = "") -> Tuple[List[Any], Optional[dict]]:
+    """`score`'s output for every sentence in batches, through `cache` under `model` when given, and its stats."""
+    if cache is not None:
+        return cache.score(model, sentences, score, batch_size)
+    results = []
+    for start in range(0, len(sentences), batch_size):
+        results.extend(score(sentences[start:start + batch_size]))
+    return results, None
+
+
+def document_analysis(results: List[dict], sentences: List[str], aggregation: str) -> dict:
+    """Commitment and specificity of a document combined over its sentence results, weighted by length."""
+    values = torch.tensor([[result["commitment_probability"], result["specificity_probability"]]
+                           for result in results], dtype=torch.float64)
+    lengths = torch.tensor([len(sentence) for sentence in sentences], dtype=torch.float64)
+    commitment, specificity = aggregate(values, lengths, aggregation).tolist()
+    return build_analysis_result(commitment, specificity)
+
+
+def score_cascade(score: Callable[[List[str]], List[dict]], text: str, aggregation: str = "mean",
+                  batch_size: int = 16, include_sentences: bool = False, compare: bool = False,
+                  cache: Optional[SentenceCache] = None, model: str = "") -> dict:
+    """
+    Document analysis from the model scores of its claim-bearing sentences only.
+
+    The cheap-talk indicator patterns select the sentences worth scoring; only
+    those go through `score` (a batch of texts to analysis results), in batches
+    of `batch_size`, and the document scores combine them with `aggregation`.
+    A text with no candidate sentences is scored whole, as the default mode
+    does. The result reports the filter's selectivity and the share of
+    characters the models were spared; with `compare` every sentence is scored
+    as well, to report how far the cascade is from full sentence scoring and
+    how many of the claims full scoring finds the filter kept. Sentences are
+    scored through `cache`, under `model`, when one is given; the full-scoring
+    baseline never is, so its timing is that of scoring every sentence.
+    """
+    started = time.perf_counter()
+    sentences, candidates = candidate_sentences(text)
+    selected = [sentences[index] for index in candidates]
+    if selected:
+        results, cache_stats = score_sentences(score, selected, batch_size, cache, model)
+        analysis = document_analysis(results, selected, aggregation)
+    else:
+        results, cache_stats = [], None
+        analysis = score([text])[0]
+
+    total_chars = sum(len(sentence) for sentence in sentences)
+    scored_chars = sum(len(sentence) for sentence in selected) if selected else len(text)
+    cascade = {
+        "aggregation": aggregation,
+        "sentences": len(sentences),
+        "candidates": len(selected),
+        "selectivity": len(selected) / len(sentences) if sentences else 0.0,
+        "chars_scored": scored_chars,
+        "compute_saved": max(0.0, 1.0 - scored_chars / total_chars) if total_chars else 0.0,
+        "seconds": time.perf_counter() - started,
+    }
+    if cache_stats is not None:
+        cascade["sentence_cache"] = cache_stats
+    if include_sentences:
+        cascade["sentence_scores"] = [{"sentence": index, "text": sentence, **result}
+                                      for index, sentence, result in zip(candidates, selected, results)]
+
+    if compare and sentences:
+        started = time.perf_counter()
+        full_results, _ = score_sentences(score, sentences, batch_size)
+        full_analysis = document_analysis(full_results, sentences, aggregation)
+        claims = [index for index, result in enumerate(full_results)
+                  if result["commitment_probability"] >= CLAIM_THRESHOLD
+                  or result["specificity_probability"] >= CLAIM_THRESHOLD]
+        kept = set(candidates)
+        full_seconds = time.perf_counter() - started
+        cascade["comparison"] = {
+            "full_analysis": full_analysis,
+            "absolute_difference": {key: abs(analysis[key] - full_analysis[key]) for key in analysis},
+            "claims": len(claims),
+            "claim_recall": sum(index in kept for index in claims) / len(claims) if claims else 1.0,
+            "full_seconds": full_seconds,
+            "speedup": full_seconds / cascade["seconds"] if cascade["seconds"] > 0 else 0.0,
+        }
+    return {"analysis": analysis, "cascade": cascade}
+
+
+def score_esg_sentences(score: Callable[[List[str]], List[dict]], text: str, aggregation: str = "mean",
+                        batch_size: int = 16, include_sentences: bool = False,
+                        cache: Optional[SentenceCache] = None, model: str = "") -> dict:
+    """ESG category scores for a document combined over every one of its sentences, through `cache` if given."""
+    started = time.perf_counter()
+    sentences = [text[start:end].strip() for start, end in document_sentences(text)]
+    if not sentences:
+        return {"scores": score([text])[0], "sentences": {"sentences": 0}}
+
+    results, cache_stats = score_sentences(score, sentences, batch_size, cache, model)
+    categories = list(results[0])
+    values = torch.tensor([[result.get(category, 0.0) for category in categories] for result in results],
+                          dtype=torch.float64)
+    lengths = torch.tensor([len(sentence) for sentence in sentences], dtype=torch.float64)
+    combined = aggregate(values, lengths, aggregation).tolist()
+    details = {"aggregation": aggregation, "sentences": len(sentences), "seconds": time.perf_counter() - started}
+    if cache_stats is not None:
+        details["sentence_cache"] = cache_stats
+    if include_sentences:
+        details["sentence_scores"] = results
+    return {
+        "scores": normalize_esg_scores([{"label": label, "score": value} for label, value in zip(categories, combined)]),
+        "sentences": details,
+    }
+
+
+def without_run_measurements(result):
+    """A copy of a cascade or sentence-level result without RUN_MEASUREMENTS, for the result cache."""
+    if isinstance(result, dict):
+        return {key: without_run_measurements(value) for key, value in result.items() if key not in RUN_MEASUREMENTS}
+    if isinstance(result, list):
+        return [without_run_measurements(value) for value in result]
+    return result
@@ -0,0 +1,88 @@
+import bisect
+import re
+from typing import Dict, List
+
+from analyze.preprocessing import sentence_spans
+
+# Cheap Talk Analysis patterns, matched case-insensitively (write them in lower case, see CheapTalkScanner)
+COMMITMENT_PATTERNS = [
+    r'will|shall|must|commit|pledge|promise|ensure|guarantee|dedicated to|aim to|target|goal|by \d{4}',
+    r'we are committed|we will|we shall|we must|we promise|we guarantee|we ensure'
+]
+
+SPECIFICITY_PATTERNS = [
+    r'\d+%|\d+ percent|\d+ tonnes|\d+mw|\d+ megawatts|\d+ gw|\d+ gigawatts',
+    r'specific|measurable|timebound|quantifiable|detailed|precise|exact|defined',
+    r'by \d{4}|by 20\d{2}|in \d{4}|in 20\d{2}'
+]
+
+
+class CheapTalkScanner:
+    """
+    Indicator patterns compiled once and matched against a lower-cased copy of the text.
+
+    Python's IGNORECASE matching is more than twice as slow as exact matching,
+    so the text is lower-cased once and each lower-case pattern is scanned
+    without it. Every pattern keeps its own scan, so hits are exactly what one
+    `re.findall` per pattern counted, overlaps between patterns included ("we
+    will" counts for "will" and for "we will"); one alternation of all the
+    patterns measured slower in CPython's backtracking engine. Texts whose
+    lower-casing changes their length (so offsets would not line up) are
+    matched with IGNORECASE copies of the patterns instead.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        self.categories = list(patterns)
+        self._patterns = [(category, re.compile(pattern), re.compile(pattern, re.IGNORECASE))
+                          for category, category_patterns in patterns.items() for pattern in category_patterns]
+
+    def scan(self, text: str) -> List[tuple]:
+        """(start, end, category, pattern index) of every hit, in text order."""
+        lowered = text.lower()
+        exact = len(lowered) == len(text)
+        hits = []
+        for index, (category, pattern, ignorecase_pattern) in enumerate(self._patterns):
+            matches = pattern.finditer(lowered) if exact else ignorecase_pattern.finditer(text)
+            hits.extend((match.start(), match.end(), category, index) for match in matches)
+        hits.sort()
+        return hits
+
+    def analyze(self, text: str, include_spans: bool = False) -> dict:
+        """Indicator counts and the cheap talk scores derived from them, optionally with every hit's spans."""
+        hits = self.scan(text)
+        counts = {category: 0 for category in self.categories}
+        for _, _, category, _ in hits:
+            counts[category] += 1
+
+        # Normalize scores using word count
+        word_count = len(text.split())
+        commitment_prob = min(counts["commitment"] / (word_count * 0.05), 1.0) if word_count else 0.0
+        specificity_prob = min(counts["specificity"] / (word_count * 0.05), 1.0) if word_count else 0.0
+
+        result = {
+            "analysis": {
+                "commitment_probability": commitment_prob,
+                "specificity_probability": specificity_prob,
+                "cheap_talk_probability": commitment_prob * (1 - specificity_prob),
+                "safe_talk_probability": (1 - commitment_prob) * specificity_prob
+            },
+            "counts": counts,
+        }
+        if include_spans:
+            sentences = sentence_spans(text)
+            sentence_starts = [start for start, _ in sentences]
+            spans = []
+            for start, end, category, _ in hits:
+                sentence = bisect.bisect_right(sentence_starts, start) - 1
+                spans.append({"category": category, "start": start, "end": end, "match": text[start:end],
+                              "sentence": sentence, "sentence_start": sentences[sentence][0],
+                              "sentence_end": sentences[sentence][1]})
+            result["spans"] = spans
+        return result
+
+
+scanner = CheapTalkScanner({"commitment": COMMITMENT_PATTERNS, "specificity": SPECIFICITY_PATTERNS})
+
+
+def analyze_cheap_talk(text: str) -> dict:
+    return scanner.analyze(text)["analysis"]
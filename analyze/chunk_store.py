@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from config import CHUNK_STORE_CHUNK_CHARS, CHUNK_STORE_PATH
+
+# Separator between chunks in a document's joined text, as the Pinecone pull joined them
+CHUNK_SEPARATOR = "\n\n"
+
+
+def split_page(text: str, chunk_chars: int) -> List[str]:
+    """A page's text in chunks of at most `chunk_chars`, cut at paragraph breaks, else at whitespace."""
+    chunks = []
+    for paragraph in text.split(CHUNK_SEPARATOR):
+        paragraph = paragraph.strip()
+        while len(paragraph) > chunk_chars:
+            cut = paragraph.rfind(" ", 0, chunk_chars + 1)
+            cut = cut if cut > 0 else chunk_chars
+            chunks.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if not paragraph:
+            continue
+        if chunks and len(chunks[-1]) + len(CHUNK_SEPARATOR) + len(paragraph) <= chunk_chars:
+            chunks[-1] = f"{chunks[-1]}{CHUNK_SEPARATOR}{paragraph}"
+        else:
+            chunks.append(paragraph)
+    return chunks
+
+
+class ChunkStore:
+    """
+    Report text kept locally as ordered chunks with their page numbers, keyed by `pdf_name`.
+
+    Replaces pulling a report back out of Pinecone with a zero-vector query:
+    `chunks()` streams every chunk of a document in order, a batch of rows at a
+    time, with no network round trip and no cap on the number of chunks. The
+    path ":memory:" gives a private in-memory store, the stand-in for tests.
+    """
+
+    def __init__(self, path: str, chunk_chars: int = 2000):
+        self.path = path
+        self.chunk_chars = chunk_chars
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def _db(self):
+        # Opened on first use so importing the module (e.g. in worker processes) touches no files
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "pdf_name TEXT, position INTEGER, page_number INTEGER, text TEXT, "
+                "PRIMARY KEY (pdf_name, position)) WITHOUT ROWID"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents (pdf_name TEXT PRIMARY KEY, chunks INTEGER, created REAL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def put(self, pdf_name: str, chunks: Iterable[Tuple[int, str]]) -> int:
+        """Replace a document's chunks with `chunks`, (page number, text) pairs in reading order."""
+        rows = [(pdf_name, position, page_number, text) for position, (page_number, text) in enumerate(chunks)]
+        with self._lock:
+            self._db.execute("DELETE FROM chunks WHERE pdf_name = ?", (pdf_name,))
+            self._db.executemany(
+                "INSERT INTO chunks (pdf_name, position, page_number, text) VALUES (?, ?, ?, ?)", rows
+            )
+            self._db.execute("INSERT OR REPLACE INTO documents (pdf_name, chunks, created) VALUES (?, ?, ?)",
+                             (pdf_name, len(rows), time.time()))
+            self._db.commit()
+        return len(rows)
+
+    def put_pages(self, pdf_name: str, pages: List[str]) -> int:
+        """Store a document from its page texts (page 1 first), split into chunks of at most `chunk_chars`."""
+        return self.put(pdf_name, ((number, chunk) for number, page in enumerate(pages, start=1)
+                                   for chunk in split_page(page, self.chunk_chars)))
+
+    def has(self, pdf_name: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM documents WHERE pdf_name = ?", (pdf_name,)).fetchone() is not None
+
+    def chunks(self, pdf_name: str, batch_size: int = 256) -> Iterator[Tuple[int, str]]:
+        """(page number, text) of every chunk of a document in order, read `batch_size` rows at a time."""
+        position = -1
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT position, page_number, text FROM chunks WHERE pdf_name = ? AND position > ? "
+                    "ORDER BY position LIMIT ?", (pdf_name, position, batch_size)
+                ).fetchall()
+            for position, page_number, text in rows:
+                yield page_number, text
+            if len(rows) < batch_size:
+                return
+
+    def text(self, pdf_name: str) -> Optional[str]:
+        """A document's chunks joined in order, or None if it is not stored."""
+        if not self.has(pdf_name):
+            return None
+        return CHUNK_SEPARATOR.join(text for _, text in self.chunks(pdf_name))
+
+    def delete(self, pdf_name: str) -> bool:
+        with self._lock:
+            self._db.execute("DELETE FROM chunks WHERE pdf_name = ?", (pdf_name,))
+            deleted = self._db.execute("DELETE FROM documents WHERE pdf_name = ?", (pdf_name,)).rowcount
+            self._db.commit()
+        return deleted > 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            documents, chunks = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(chunks), 0) FROM documents"
+            ).fetchone()
+        return {"documents": documents, "chunks": chunks}
+
+
+chunk_store = ChunkStore(CHUNK_STORE_PATH, chunk_chars=CHUNK_STORE_CHUNK_CHARS)
@@ -0,0 +1,42 @@
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+COMPRESSIONS = ("none", "gzip", "brotli")
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with gzip, or brotli (falling back to gzip) when brotli-asgi is installed.
+
+    Streaming endpoints are passed through untouched: the compressor buffers its
+    output, which would hold back NDJSON records and server-sent events.
+    """
+
+    def __init__(self, app: ASGIApp, compression: str = "gzip", minimum_size: int = 1024,
+                 streaming_paths: tuple = ()):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}, expected one of {COMPRESSIONS}")
+        if compression == "brotli" and BrotliMiddleware is None:
+            print("brotli-asgi is not installed; compressing responses with gzip")
+            compression = "gzip"
+
+        self.app = app
+        self.compression = compression
+        self.streaming_paths = streaming_paths
+        if compression == "brotli":
+            self.compressed = BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=True)
+        elif compression == "gzip":
+            self.compressed = GZipMiddleware(app, minimum_size=minimum_size)
+        else:
+            self.compressed = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].endswith(self.streaming_paths):
+            await self.compressed(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
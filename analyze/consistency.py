@@ -1,43 +1,66 @@
-from fastapi import APIRouter, Request, File, UploadFile
+from fastapi import APIRouter, HTTPException, Request, File, UploadFile
 from pydantic import BaseModel
-from typing import List, Union
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, Optional, Union
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
+from scipy import sparse
+from starlette.concurrency import run_in_threadpool
 import numpy as np
-import re
-import string
+import contextlib
+import hashlib
+import io
+import math
 import os
 
+from analyze.document_store import document_store, resolve_text
+from analyze.executor import execution
+from analyze.extraction import extract_document_async
+from analyze.language import is_english
+from analyze.result_cache import result_cache
+from analyze.mapping import load_mapping
+from analyze.preprocessing import PreprocessedText, preprocess_document
+from config import (
+    CONSISTENCY_BATCH_MAX_DOCUMENTS, CONSISTENCY_MEMORY_MB, CONSISTENCY_TOKENIZER, EXECUTOR_CPU_WORKERS
+)
+
 import openai
 openai.api_key = os.environ.get("OPENAI_API_KEY")
 
 
-import fitz  # PyMuPDF
-from docx import Document
-import langid  # 🔥 Language detection
-
-from textstat import flesch_reading_ease
-from nltk import word_tokenize
 from nltk.util import ngrams
 from nltk.corpus import stopwords
 
 import nltk
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
 
-router = APIRouter()
+# Resource path -> download name; punkt_tab replaces punkt from nltk 3.9 on
+NLTK_RESOURCES = {
+    "tokenizers/punkt": "punkt",
+    "tokenizers/punkt_tab": "punkt_tab",
+    "corpora/stopwords": "stopwords",
+    "corpora/cmudict": "cmudict",  # textstat's syllable counts
+}
+_nltk_ready = False
+
+def ensure_nltk_data():
+    """Download the tokenizer data on first use, skipping anything already installed."""
+    global _nltk_ready
+    if _nltk_ready:
+        return
+    for path, name in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(name, quiet=True)
+    _nltk_ready = True
 
-class ConsistencyInput(BaseModel):
-    chunks: List[str]  # Still accepts chunks, but we'll treat them as full texts
+router = APIRouter()
 
-def is_english(text: str) -> bool:
-    lang, _ = langid.classify(text)
-    return lang == "en"
+# Part of the result cache key; bump when the metrics below change
+CONSISTENCY_VERSION = f"tfidf-flesch-cttr-2-{CONSISTENCY_TOKENIZER}"
+NON_ENGLISH_ERROR = "Non-English text detected. Only English documents are supported."
 
-def preprocess(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r'\d+', '', text)
-    return text.translate(str.maketrans('', '', string.punctuation))
+class ConsistencyInput(BaseModel):
+    chunks: Optional[List[str]] = None  # Still accepts chunks, but we'll treat them as full texts
+    document_id: Optional[str] = None  # Or a document stored by an upload
 
 def split_into_segments(text: str, segment_length: int) -> List[str]:
     """Split text into segments of approximately equal length."""
@@ -52,6 +75,41 @@ def split_into_segments(text: str, segment_length: int) -> List[str]:
     return segments
 
 
+def pairwise_similarity_stats(matrix, max_bytes: int = CONSISTENCY_MEMORY_MB * 1024 * 1024) -> tuple:
+    """
+    Exact mean and standard deviation of the cosine similarity over all pairs of rows.
+
+    `matrix` holds L2-normalized rows (TfidfVectorizer's default), so similarities
+    are dot products. The mean is closed-form: the pairwise dot products sum to
+    (|sum of rows|^2 - sum of |row|^2) / 2. The squared deviations from it are
+    summed over blocks of rows against the rows before them, so about
+    `max_bytes` of similarities are held at any time instead of the full n x n
+    matrix.
+    """
+    matrix = matrix.tocsr().astype(np.float64, copy=False)
+    n = matrix.shape[0]
+    pairs = n * (n - 1) / 2
+
+    row_sum = np.asarray(matrix.sum(axis=0)).ravel()
+    diagonal = matrix.multiply(matrix).sum()
+    mean = (row_sum @ row_sum - diagonal) / 2 / pairs
+
+    # Half the budget for the dense block, the rest for the sparse product it is expanded from
+    block = max(1, int(max_bytes // (16 * n)))
+    squared_deviations = 0.0
+    for start in range(1, n, block):
+        stop = min(n, start + block)
+        # Rows start..stop-1 against every earlier row; the diagonal and upper triangle are skipped.
+        # Deviations from the known mean avoid the cancellation of E[x^2] - E[x]^2.
+        similarities = (matrix[start:stop] @ matrix[:stop].T).toarray()
+        similarities -= mean
+        for i, row in enumerate(similarities):
+            squared_deviations += float(row[:start + i] @ row[:start + i])
+
+    variance = squared_deviations / pairs
+    return float(mean), float(np.sqrt(variance))
+
+
 def compute_tfidf_consistency(segments: List[str]) -> Union[dict, None]:
     if len(segments) <= 1:
         return None
@@ -59,12 +117,7 @@ def compute_tfidf_consistency(segments: List[str]) -> Union[dict, None]:
     try:
         vectorizer = TfidfVectorizer()
         tfidf_matrix = vectorizer.fit_transform(segments)
-        sim_matrix = cosine_similarity(tfidf_matrix)
-        tril_indices = np.tril_indices_from(sim_matrix, k=-1)
-        values = sim_matrix[tril_indices]
-
-        mean_sim = float(np.mean(values))
-        std_dev_sim = float(np.std(values))
+        mean_sim, std_dev_sim = pairwise_similarity_stats(tfidf_matrix)
         return {
             "consistency_score": mean_sim,
             "consistency_variability": std_dev_sim
@@ -75,15 +128,56 @@ def compute_tfidf_consistency(segments: List[str]) -> Union[dict, None]:
 
 
 
-from nltk.tokenize import sent_tokenize
+def segment_statistics(counts, unit: int, segment_lengths: List[int]) -> dict:
+    """
+    Consistency of one text for each segment length, from the term counts of its `unit`-word units.
+
+    Every segmentation sums runs of unit rows and reweights them with its own
+    IDF, which gives exactly the TF-IDF matrix a fresh vectorizer would fit on
+    that segmentation. Lengths must be multiples of `unit`.
+    """
+    units = counts.shape[0]
+    results = {}
+    for length in segment_lengths:
+        # Sparse 0/1 matrix summing each run of length // unit consecutive unit rows
+        segment_of_unit = np.arange(units) // (length // unit)
+        combine = sparse.csr_matrix((np.ones(units), (segment_of_unit, np.arange(units))))
+        tfidf_matrix = TfidfTransformer().fit_transform(combine @ counts)
+        mean_sim, std_dev_sim = pairwise_similarity_stats(tfidf_matrix)
+        results[length] = {
+            "consistency_score": mean_sim,
+            "consistency_variability": std_dev_sim
+        }
+    return results
+
+
+def segment_consistency(text: str, segment_lengths: List[int]) -> List[Union[dict, None]]:
+    """
+    `compute_tfidf_consistency` of `text` split into segments of each length, from one tokenization.
+
+    The text is tokenized once into term counts for units of the greatest common
+    divisor of the lengths, and `segment_statistics` derives every segmentation
+    from them. Lengths that leave the text in a single segment have no pairs
+    and give None, as before.
+    """
+    words = text.split()
+    lengths = sorted({length for length in segment_lengths if 0 < length < len(words)})
+    results = {}
+    if lengths:
+        try:
+            unit = math.gcd(*lengths)
+            counts = CountVectorizer().fit_transform(split_into_segments(text, unit))
+            results = segment_statistics(counts, unit, lengths)
+        except Exception as e:
+            print("TF-IDF Consistency error:", e)
+    return [results.get(length) for length in segment_lengths]
+
 
-def compute_readability(text: str) -> float:
-    try:
-        # Reconstruct clean sentence-delimited text
-        sentences = sent_tokenize(text)
-        reconstructed = " ".join(sentences)
 
-        score = flesch_reading_ease(reconstructed)
+def compute_readability(document: PreprocessedText) -> float:
+    try:
+        # Flesch Reading Ease of the sentence-delimited text, from the shared counts
+        score = document.flesch_reading_ease()
         print("Raw Flesch score:", score)
 
         # Normalize: Flesch score ~ [0–100]; higher = more readable
@@ -96,12 +190,9 @@ def compute_readability(text: str) -> float:
 
 
 
-import math
-
-def compute_clarity(text: str) -> float:
+def compute_clarity(document: PreprocessedText) -> float:
     try:
-        words = word_tokenize(text.lower())
-        words = [w for w in words if w.isalpha()]
+        words = document.words
         total = len(words)
         unique = len(set(words))
         if total == 0:
@@ -124,62 +215,259 @@ def compute_clarity(text: str) -> float:
 
 @router.post("/consistency")
 async def compute_consistency(data: ConsistencyInput):
-    full_text = " ".join(data.chunks)  # Assume single document was passed
+    chunks = data.chunks
+    if chunks is None:
+        chunks = [await run_in_threadpool(resolve_text, None, data.document_id)]
+
+    full_text = " ".join(chunks)
+    cache_key = await run_in_threadpool(result_cache.key, "consistency", full_text, CONSISTENCY_VERSION)
+    cached = await run_in_threadpool(result_cache.get, cache_key)
+    if cached is not None:
+        return cached
+
+    # The language gate runs here rather than in a worker, so one verdict cache serves every request
+    if not await run_in_threadpool(is_english, full_text):
+        return {"error": NON_ENGLISH_ERROR}
+
+    # TF-IDF, NLTK and textstat are pure-Python work; keep them off the event loop
+    result = await execution.run_cpu(consistency_metrics, chunks, CONSISTENCY_TOKENIZER, False)
+    await run_in_threadpool(result_cache.set, cache_key, result)
+    return result
 
-    if not is_english(full_text):
-        return {"error": "Non-English text detected. Only English documents are supported."}
 
-    cleaned = preprocess(full_text)
+def consistency_metrics(chunks: List[str], tokenizer: str = CONSISTENCY_TOKENIZER,
+                        check_language: bool = True) -> dict:
+    if tokenizer == "nltk":
+        ensure_nltk_data()
+    full_text = " ".join(chunks)  # Assume single document was passed
+
+    if check_language and not is_english(full_text):
+        return {"error": NON_ENGLISH_ERROR}
+
+    # Sentences, words and syllables once, for every metric below
+    document = preprocess_document(full_text, tokenizer)
+    cleaned = document.cleaned
 
     segment_lengths = [500, 1000, len(cleaned.split())]  # include full doc
+    result = document_metrics(document, segment_consistency(cleaned, segment_lengths))
+
+    print("RETURNING CONSISTENCY RESULTS:")
+    print("  consistency_score:", result["consistency_score"])
+    print("  readability_score:", result["readability_score"])
+    print("  clarity_score:", result["clarity_score"])
+
+    return result
 
+
+def document_metrics(document: PreprocessedText, segment_results: List[Union[dict, None]]) -> dict:
+    """The /consistency result: segment consistency averaged over the granularities, readability and clarity."""
     scores = []
-    variabilities = [] 
-    for length in segment_lengths:
-        segments = split_into_segments(cleaned, length) if length != len(cleaned.split()) else [cleaned]
-        embedding_result = compute_tfidf_consistency(segments)
+    variabilities = []
+    for embedding_result in segment_results:
         if embedding_result is not None:
             scores.append(embedding_result["consistency_score"])
             variabilities.append(embedding_result["consistency_variability"])
 
-
-    consistency_score = float(np.mean(scores)) if scores else None
-    consistency_variability = float(np.mean(variabilities)) if scores else None
-    readability_score = compute_readability(full_text)
-    clarity_score = compute_clarity(full_text)
-
-    print("RETURNING CONSISTENCY RESULTS:")
-    print("  consistency_score:", consistency_score)
-    print("  readability_score:", readability_score)
-    print("  clarity_score:", clarity_score)
+    return {
+    "consistency_score": float(np.mean(scores)) if scores else None,
+    "consistency_variability": float(np.mean(variabilities)) if scores else None,
+    "readability_score": compute_readability(document),
+    "clarity_score": compute_clarity(document)
+    }
 
 
+# ========== BATCH AND CROSS-DOCUMENT CONSISTENCY ==========
+
+# Segment lengths scored for every document of a batch; the whole document is a single segment
+BATCH_SEGMENT_LENGTHS = (500, 1000)
+
+
+class BatchDocument(BaseModel):
+    id: Optional[str] = None
+    text: Optional[str] = None
+    document_id: Optional[str] = None
+    # Looked up in data/mapping file.csv for any of company, year and sector not given
+    pdf_name: Optional[str] = None
+    company: Optional[str] = None
+    year: Optional[int] = None
+    sector: Optional[str] = None
+
+
+class ConsistencyBatchInput(BaseModel):
+    documents: List[BatchDocument]
+
+
+def batch_document_metrics(texts: List[str], tokenizer: str = CONSISTENCY_TOKENIZER,
+                           english: Optional[List[bool]] = None) -> tuple:
+    """
+    `consistency_metrics` of many documents, plus their whole-document TF-IDF matrix.
+
+    Every document's 500-word units are tokenized together with one
+    CountVectorizer, so the vocabulary is built once for the batch. Each
+    document's segment statistics come from its own rows (with its own IDF, so
+    scores equal the single-document ones), and summing all of a document's
+    rows gives the term counts of the document-level matrix used for
+    cross-document similarity. Rows of non-English documents are empty.
+    `english` gives the language verdicts when the caller already has them.
+    """
+    if tokenizer == "nltk":
+        ensure_nltk_data()
+    results = [{"error": NON_ENGLISH_ERROR} for _ in texts]
+    english = english if english is not None else [is_english(text) for text in texts]
+    documents = {i: preprocess_document(text, tokenizer) for i, text in enumerate(texts) if english[i]}
+
+    unit = math.gcd(*BATCH_SEGMENT_LENGTHS)
+    units, spans = [], {}
+    for i, document in documents.items():
+        segments = split_into_segments(document.cleaned, unit)
+        spans[i] = (len(units), len(units) + len(segments))
+        units.extend(segments)
+    try:
+        counts = CountVectorizer().fit_transform(units)
+    except ValueError:
+        # No document has a single token
+        counts = sparse.csr_matrix((len(units), 0))
+
+    document_of_unit = np.zeros(len(units), dtype=np.int64)
+    for i, document in documents.items():
+        start, stop = spans[i]
+        document_of_unit[start:stop] = i
+        words = len(document.cleaned.split())
+        lengths = [length for length in BATCH_SEGMENT_LENGTHS if length < words]
+        segment_results = {}
+        if lengths:
+            try:
+                segment_results = segment_statistics(counts[start:stop], unit, lengths)
+            except Exception as e:
+                print("TF-IDF Consistency error:", e)
+        results[i] = document_metrics(document, list(segment_results.values()))
+
+    combine = sparse.csr_matrix((np.ones(len(units)), (document_of_unit, np.arange(len(units)))),
+                                shape=(len(texts), len(units)))
+    document_counts = combine @ counts
+    transformer = TfidfTransformer()
+    if documents and counts.shape[1]:
+        transformer.fit(document_counts[sorted(documents)])
+        return results, transformer.transform(document_counts)
+    return results, sparse.csr_matrix(document_counts.shape)
+
+
+def year_over_year_similarity(matrix, companies: List[Optional[str]], years: List[Optional[int]]) -> List[dict]:
+    """Cosine similarity of each company's consecutive reports, as one row-wise product over all pairs."""
+    order = sorted((company, year, i) for i, (company, year) in enumerate(zip(companies, years))
+                   if company is not None and year is not None)
+    pairs = [(a, b) for a, b in zip(order, order[1:]) if a[0] == b[0] and a[1] != b[1]]
+    if not pairs:
+        return []
+    first = np.array([a[2] for a, _ in pairs])
+    second = np.array([b[2] for _, b in pairs])
+    similarities = np.asarray(matrix[first].multiply(matrix[second]).sum(axis=1)).ravel()
+    return [
+        {"company": a[0], "from_year": a[1], "to_year": b[1], "from_index": int(a[2]), "to_index": int(b[2]),
+         "similarity": float(similarity)}
+        for (a, b), similarity in zip(pairs, similarities)
+    ]
+
+
+def peer_similarity(matrix, groups: List[Optional[str]]) -> tuple:
+    """
+    Each document's mean cosine similarity to the other documents of its group, and per-group statistics.
+
+    With G the sparse document-to-group indicator, G @ matrix holds every
+    group's summed rows, so a document's similarity to all its peers is one dot
+    product with its group's sum, minus its similarity to itself.
+    """
+    names = sorted({group for group in groups if group is not None})
+    index = {name: g for g, name in enumerate(names)}
+    members = [i for i, group in enumerate(groups) if group is not None]
+    peer_means = [None] * len(groups)
+    if not members:
+        return peer_means, []
+
+    member_groups = np.array([index[groups[i]] for i in members])
+    indicator = sparse.csr_matrix((np.ones(len(members)), (member_groups, members)),
+                                  shape=(len(names), len(groups)))
+    group_sums = indicator @ matrix
+    sizes = np.bincount(member_groups, minlength=len(names))
+
+    rows = matrix[members]
+    with_group = np.asarray(rows.multiply(group_sums[member_groups]).sum(axis=1)).ravel()
+    with_self = np.asarray(rows.multiply(rows).sum(axis=1)).ravel()
+    for i, g, total, own in zip(members, member_groups, with_group, with_self):
+        if sizes[g] > 1:
+            peer_means[i] = float((total - own) / (sizes[g] - 1))
+
+    statistics = []
+    for name, g in index.items():
+        if sizes[g] > 1:
+            mean_sim, std_dev_sim = pairwise_similarity_stats(matrix[[i for i in members if groups[i] == name]])
+            statistics.append({"sector": name, "documents": int(sizes[g]),
+                               "mean_similarity": mean_sim, "similarity_std": std_dev_sim})
+    return peer_means, statistics
+
+
+def cross_document_consistency(texts: List[str], companies: List[Optional[str]], years: List[Optional[int]],
+                               sectors: List[Optional[str]], tokenizer: str = CONSISTENCY_TOKENIZER,
+                               english: Optional[List[bool]] = None) -> dict:
+    """Batch metrics, year-over-year similarity per company and similarity to sector peers, in one pass."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        # The per-metric progress prints would be hundreds of lines for a batch
+        results, matrix = batch_document_metrics(texts, tokenizer, english)
+    peer_means, sector_statistics = peer_similarity(matrix, sectors)
+    for result, peer_mean in zip(results, peer_means):
+        result["sector_peer_similarity"] = peer_mean
     return {
-    "consistency_score": consistency_score,
-    "consistency_variability": consistency_variability,
-    "readability_score": readability_score,
-    "clarity_score": clarity_score
+        "documents": results,
+        "year_over_year": year_over_year_similarity(matrix, companies, years),
+        "sectors": sector_statistics,
     }
 
 
-# ========== NEW PDF/DOCX SUPPORT ==========
+@router.post("/batch")
+async def compute_batch_consistency(data: ConsistencyBatchInput):
+    """
+    Consistency, readability and clarity for many documents, with cross-document similarity.
+
+    Documents give text or a stored document_id. Company, year and sector
+    (directly, or through pdf_name in the mapping file) enable the
+    year-over-year and sector-peer similarities.
+    """
+    if not data.documents:
+        raise HTTPException(status_code=400, detail="No documents provided")
+    if len(data.documents) > CONSISTENCY_BATCH_MAX_DOCUMENTS:
+        raise HTTPException(status_code=400, detail=f"At most {CONSISTENCY_BATCH_MAX_DOCUMENTS} documents per batch")
+
+    texts, companies, years, sectors = [], [], [], []
+    mapping = await run_in_threadpool(load_mapping) if any(d.pdf_name for d in data.documents) else {}
+    for document in data.documents:
+        texts.append(await run_in_threadpool(resolve_text, document.text, document.document_id))
+        row = mapping.get(document.pdf_name, {}) if document.pdf_name else {}
+        companies.append(document.company or row.get("company_name") or None)
+        year = document.year if document.year is not None else row.get("year")
+        years.append(int(year) if year not in (None, "") else None)
+        sectors.append(document.sector or row.get("Sector") or None)
+
+    english = [await run_in_threadpool(is_english, text) for text in texts]
+    result = await execution.run_cpu(cross_document_consistency, texts, companies, years, sectors,
+                                     CONSISTENCY_TOKENIZER, english)
+    for document, metrics in zip(data.documents, result["documents"]):
+        metrics["id"] = document.id or document.pdf_name or document.document_id
+    ids = [metrics["id"] for metrics in result["documents"]]
+    for pair in result["year_over_year"]:
+        pair["from"], pair["to"] = ids[pair.pop("from_index")], ids[pair.pop("to_index")]
+    return result
 
-def extract_text_from_pdf(file_stream) -> str:
-    doc = fitz.open(stream=file_stream.read(), filetype="pdf")
-    return "\n".join([page.get_text() for page in doc])
 
-def extract_text_from_docx(file_stream) -> str:
-    document = Document(file_stream)
-    return "\n".join([p.text for p in document.paragraphs])
+# ========== NEW PDF/DOCX SUPPORT ==========
 
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    filename = file.filename.lower()
-    if filename.endswith(".pdf"):
-        text = extract_text_from_pdf(file.file)
-    elif filename.endswith(".docx"):
-        text = extract_text_from_docx(file.file)
-    else:
+async def upload_file(file: UploadFile = File(...), include_text: bool = True):
+    file_extension = os.path.splitext(file.filename.lower())[1]
+    if file_extension not in (".pdf", ".docx"):
         return {"error": "Unsupported file type. Please upload a PDF or Word document (.pdf, .docx)"}
 
-    return {"name": file.filename, "text": text}
+    data = await file.read()
+    document = await extract_document_async(data, file_extension, execution.run_cpu, EXECUTOR_CPU_WORKERS)
+    document_id = await run_in_threadpool(
+        document_store.put, document.text, file.filename, hashlib.sha256(data).hexdigest())
+    return {"name": file.filename, "document_id": document_id, "text": document.text if include_text else None}
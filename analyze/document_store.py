@@ -0,0 +1,119 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+
+from config import DOCUMENT_STORE_PATH, DOCUMENT_STORE_MAX_MB
+
+
+class DocumentStore:
+    """
+    Extracted document text kept on the server, addressed by `document_id`.
+
+    Uploads store their text here and return the id, so clients can send the id
+    to the analysis endpoints instead of posting megabytes of text back.
+    Upload ids are the SHA-256 of the uploaded file; text stored directly is
+    addressed by the SHA-256 of the text. Once the stored text exceeds
+    `max_bytes`, the least recently used documents are evicted; an evicted
+    upload's id gets a 404 and the client uploads it again.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = None
+        self._evictions = 0
+
+    @property
+    def _db(self):
+        # Opened on first use so importing the module (e.g. in worker processes) touches no files
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "id TEXT PRIMARY KEY, name TEXT, text TEXT, chars INTEGER, created REAL, last_access REAL, "
+                "bytes INTEGER)"
+            )
+            # Stores created before eviction existed lack the size column
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(documents)")}
+            if "bytes" not in columns:
+                self._connection.execute("ALTER TABLE documents ADD COLUMN bytes INTEGER")
+                self._connection.execute("UPDATE documents SET bytes = length(CAST(text AS BLOB))")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS documents_last_access ON documents (last_access)")
+            self._connection.commit()
+        return self._connection
+
+    def put(self, text: str, name: Optional[str] = None, document_id: Optional[str] = None) -> str:
+        document_id = document_id or hashlib.sha256(text.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents (id, name, text, chars, created, last_access, bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (document_id, name, text, len(text), now, now, len(text.encode("utf-8")))
+            )
+            self._evict(keep=document_id)
+            self._db.commit()
+        return document_id
+
+    def get(self, document_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, name, text, chars, created FROM documents WHERE id = ?", (document_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE documents SET last_access = ? WHERE id = ?", (time.time(), document_id))
+            self._db.commit()
+        return {"document_id": row[0], "name": row[1], "text": row[2], "chars": row[3], "created": row[4]}
+
+    def text(self, document_id: str) -> Optional[str]:
+        document = self.get(document_id)
+        return document["text"] if document is not None else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, chars, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(chars), 0), COALESCE(SUM(bytes), 0) FROM documents"
+            ).fetchone()
+            return {"documents": count, "chars": chars, "bytes": size, "max_bytes": self.max_bytes,
+                    "evictions": self._evictions}
+
+    def _evict(self, keep: str):
+        """Drop least recently used documents, never `keep`, until the store fits in `max_bytes`."""
+        if self.max_bytes is None:
+            return
+        total = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for document_id, size in self._db.execute(
+                "SELECT id, bytes FROM documents WHERE id != ? ORDER BY last_access", (keep,)).fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append((document_id,))
+            total -= size
+        self._db.executemany("DELETE FROM documents WHERE id = ?", evicted)
+        self._evictions += len(evicted)
+
+
+def resolve_text(text: Optional[str], document_id: Optional[str]) -> str:
+    """The request's text, looked up by `document_id` when no text was sent."""
+    if text is not None:
+        return text
+    if document_id is None:
+        raise HTTPException(status_code=400, detail="Provide either text or a document_id")
+    stored = document_store.text(document_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Unknown document_id {document_id}")
+    return stored
+
+
+document_store = DocumentStore(DOCUMENT_STORE_PATH, max_bytes=int(DOCUMENT_STORE_MAX_MB * 1024 * 1024))
@@ -0,0 +1,154 @@
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from analyze.metrics import summarize
+from config import (
+    EXECUTOR_INFERENCE_WORKERS, EXECUTOR_CPU_WORKERS, EXECUTOR_MAX_QUEUE,
+    EXECUTOR_OVERFLOW, EXECUTOR_QUEUE_TIMEOUT
+)
+
+
+class Overloaded(Exception):
+    """Raised when a pool's queue is full; the API turns it into a 429."""
+
+
+class BoundedPool:
+    """
+    An executor with a fixed number of running slots and a bounded wait queue.
+
+    When every slot is busy, callers wait for one. With overflow "reject" a call
+    is refused once `max_queue` callers are already waiting; with "queue" it
+    waits up to `queue_timeout` seconds before being refused.
+    """
+
+    def __init__(self, name: str, executor_factory, workers: int, max_queue: int,
+                 overflow: str = "reject", queue_timeout: float = 30.0, history: int = 1000):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.overflow = overflow
+        self.queue_timeout = queue_timeout
+        self._executor_factory = executor_factory
+        self._executor = None
+        self._slots = None
+
+        self.waiting = 0
+        self.running = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self._waits = deque(maxlen=history)
+        self._run_times = deque(maxlen=history)
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = self._executor_factory(self.workers)
+        return self._executor
+
+    async def run(self, fn, *args, block: bool = False, **kwargs):
+        """Run fn(*args, **kwargs) in the pool. With `block` the call always waits for a slot."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        if not block and self.overflow == "reject" and self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(f"{self.name} pool is saturated ({self.waiting} requests waiting)")
+
+        enqueued = time.perf_counter()
+        if not self._slots.locked():
+            await self._slots.acquire()
+        else:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                if block or self.overflow == "reject":
+                    await self._slots.acquire()
+                else:
+                    await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise Overloaded(f"{self.name} pool: no slot free after {self.queue_timeout:.0f}s")
+            finally:
+                self.waiting -= 1
+
+        started = time.perf_counter()
+        self._waits.append(started - enqueued)
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._run_times.append(time.perf_counter() - started)
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "overflow": self.overflow,
+            "running": self.running,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_ms": summarize([w * 1000.0 for w in self._waits]),
+            "run_ms": summarize([r * 1000.0 for r in self._run_times]),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class ExecutionLayer:
+    """
+    Keeps blocking work off the event loop.
+
+    `inference` is a thread pool for torch forward passes, which release the GIL.
+    `cpu` is a process pool for pure-Python work (text extraction, TF-IDF, NLTK);
+    functions sent to it must be importable module-level functions.
+    """
+
+    def __init__(self, inference_workers: int, cpu_workers: int, max_queue: int,
+                 overflow: str = "reject", queue_timeout: float = 30.0):
+        self.inference = BoundedPool(
+            "inference",
+            lambda n: ThreadPoolExecutor(max_workers=n, thread_name_prefix="inference"),
+            inference_workers, max_queue, overflow, queue_timeout
+        )
+        # Spawned workers re-import the main module, which only loads models from its startup hook
+        self.cpu = BoundedPool(
+            "cpu",
+            lambda n: ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context("spawn")),
+            cpu_workers, max_queue, overflow, queue_timeout
+        )
+
+    async def run_inference(self, fn, *args, **kwargs):
+        return await self.inference.run(fn, *args, **kwargs)
+
+    async def run_cpu(self, fn, *args, **kwargs):
+        return await self.cpu.run(fn, *args, **kwargs)
+
+    def stats(self) -> dict:
+        return {"inference": self.inference.stats(), "cpu": self.cpu.stats()}
+
+    def shutdown(self):
+        self.inference.shutdown()
+        self.cpu.shutdown()
+
+
+execution = ExecutionLayer(
+    inference_workers=EXECUTOR_INFERENCE_WORKERS,
+    cpu_workers=EXECUTOR_CPU_WORKERS,
+    max_queue=EXECUTOR_MAX_QUEUE,
+    overflow=EXECUTOR_OVERFLOW,
+    queue_timeout=EXECUTOR_QUEUE_TIMEOUT,
+)
@@ -0,0 +1,128 @@
+import asyncio
+import io
+from typing import List, Optional
+
+from config import EXTRACTION_PARALLEL_MIN_PAGES
+
+try:
+    import fitz  # PyMuPDF, several times faster than PyPDF2
+    PDF_BACKEND = "pymupdf"
+except ImportError:
+    fitz = None
+    PDF_BACKEND = "pypdf2"
+
+PAGE_SEPARATOR = "\n"
+
+
+class Page:
+    """One page of extracted text and where it sits in the document's joined text."""
+
+    def __init__(self, number: int, text: str, start: int):
+        self.number = number
+        self.text = text
+        self.start = start
+        self.end = start + len(text)
+
+    def to_dict(self) -> dict:
+        return {"number": self.number, "start": self.start, "end": self.end, "text": self.text}
+
+
+class ExtractedDocument:
+    """Extracted pages in order; `text` is the pages joined by PAGE_SEPARATOR."""
+
+    def __init__(self, page_texts: List[str], backend: str):
+        self.backend = backend
+        self.pages = []
+        offset = 0
+        for number, text in enumerate(page_texts, start=1):
+            self.pages.append(Page(number, text, offset))
+            offset += len(text) + len(PAGE_SEPARATOR)
+        self.text = PAGE_SEPARATOR.join(page_texts)
+
+
+def pdf_page_count(data: bytes) -> int:
+    if fitz is not None:
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            return doc.page_count
+    import PyPDF2
+    return len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+
+
+def extract_pdf_pages(data: bytes, start: int = 0, stop: Optional[int] = None) -> List[str]:
+    """Text of pages [start, stop) of a PDF. Runs in worker processes for page-parallel extraction."""
+    if fitz is not None:
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            stop = doc.page_count if stop is None else stop
+            return [doc[i].get_text() for i in range(start, stop)]
+    import PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    stop = len(reader.pages) if stop is None else stop
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def page_ranges(page_count: int, parts: int) -> List[tuple]:
+    """Split pages into at most `parts` contiguous, near-equal [start, stop) ranges."""
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges, start = [], 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def extract_document(data: bytes, file_extension: str, executor=None, workers: int = 1,
+                     min_parallel_pages: int = EXTRACTION_PARALLEL_MIN_PAGES) -> ExtractedDocument:
+    """
+    Extract a .pdf, .docx/.doc or .txt document held in memory.
+
+    PDFs with at least `min_parallel_pages` pages are split into `workers` page
+    ranges extracted concurrently on `executor` (a process pool), when one is given.
+    DOCX and text files come back as a single page.
+    """
+    if file_extension == '.pdf':
+        page_count = pdf_page_count(data) if executor is not None and workers > 1 else 0
+        if page_count and page_count >= min_parallel_pages:
+            ranges = page_ranges(page_count, workers)
+            parts = executor.map(extract_pdf_pages, [data] * len(ranges), *zip(*ranges))
+            return ExtractedDocument([text for part in parts for text in part], PDF_BACKEND)
+        return ExtractedDocument(extract_pdf_pages(data), PDF_BACKEND)
+    if file_extension in ['.doc', '.docx']:
+        import docx
+        doc = docx.Document(io.BytesIO(data))
+        return ExtractedDocument(["\n".join(paragraph.text for paragraph in doc.paragraphs)], "python-docx")
+    if file_extension == '.txt':
+        # Same universal-newline decoding as open(..., 'r')
+        return ExtractedDocument([io.TextIOWrapper(io.BytesIO(data), encoding='utf-8').read()], "text")
+    raise ValueError(f"Unsupported file type {file_extension!r}")
+
+
+async def extract_document_async(data: bytes, file_extension: str, run_cpu, workers: int,
+                                 min_parallel_pages: int = EXTRACTION_PARALLEL_MIN_PAGES) -> ExtractedDocument:
+    """
+    `extract_document` for request handlers, fanning large PDFs out over `run_cpu`.
+
+    `run_cpu` is the execution layer's process-pool runner, so page ranges share
+    the service's CPU workers and its overload handling rather than a pool per request.
+    """
+    if file_extension != '.pdf':
+        return await run_cpu(extract_document, data, file_extension)
+    page_count = await run_cpu(pdf_page_count, data)
+    if workers <= 1 or page_count < min_parallel_pages:
+        return await run_cpu(extract_document, data, file_extension)
+    parts = await asyncio.gather(*(
+        run_cpu(extract_pdf_pages, data, start, stop) for start, stop in page_ranges(page_count, workers)
+    ))
+    return ExtractedDocument([text for part in parts for text in part], PDF_BACKEND)
+
+
+def extract_text_from_file(file_path: str, file_extension: str) -> str:
+    """Text of an uploaded .txt, .pdf or .doc/.docx file."""
+    with open(file_path, 'rb') as f:
+        return extract_text_from_bytes(f.read(), file_extension)
+
+
+def extract_text_from_bytes(data: bytes, file_extension: str) -> str:
+    """Text of an upload already held in memory, so extraction doesn't re-read it from disk."""
+    return extract_document(data, file_extension).text
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from analyze.inference import build_analysis_result, encode, positive_scores
+
+
+def tokenizers_compatible(a, b) -> bool:
+    """True when two tokenizers produce identical input ids for any text."""
+    return (
+        type(a) is type(b)
+        and a.get_vocab() == b.get_vocab()
+        and a.all_special_tokens == b.all_special_tokens
+    )
+
+
+class FusedClimateScorer:
+    """
+    Commitment and specificity scoring from a single tokenization pass.
+
+    Both ClimateBERT heads share the distilroberta-base tokenizer, so texts are
+    encoded once and the same tensors are fed to both models. With `concurrent`
+    the two forward passes run side by side (torch releases the GIL), otherwise
+    one after the other.
+    """
+
+    def __init__(self, commitment_model, specificity_model, commitment_tokenizer, specificity_tokenizer,
+                 device: str, max_length: int = 512, concurrent: bool = True):
+        self.commitment_model = commitment_model
+        self.specificity_model = specificity_model
+        self.commitment_tokenizer = commitment_tokenizer
+        self.specificity_tokenizer = specificity_tokenizer
+        self.device = device
+        self.max_length = max_length
+        self.shared_tokenizer = tokenizers_compatible(commitment_tokenizer, specificity_tokenizer)
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fused-specificity") if concurrent else None
+
+        if not self.shared_tokenizer:
+            print("Commitment and specificity tokenizers differ; encoding texts separately for each model")
+
+    def score(self, texts: List[str]) -> List[dict]:
+        """Commitment, specificity, cheap-talk and safe-talk probabilities for every text."""
+        commitment_inputs = encode(self.commitment_tokenizer, texts, self.device, self.max_length)
+        if self.shared_tokenizer:
+            specificity_inputs = commitment_inputs
+        else:
+            specificity_inputs = encode(self.specificity_tokenizer, texts, self.device, self.max_length)
+
+        if self._pool is not None:
+            specificity_future = self._pool.submit(positive_scores, self.specificity_model, specificity_inputs)
+            commitment_scores = positive_scores(self.commitment_model, commitment_inputs)
+            specificity_scores = specificity_future.result()
+        else:
+            commitment_scores = positive_scores(self.commitment_model, commitment_inputs)
+            specificity_scores = positive_scores(self.specificity_model, specificity_inputs)
+
+        return [
+            build_analysis_result(commitment, specificity)
+            for commitment, specificity in zip(commitment_scores, specificity_scores)
+        ]
@@ -0,0 +1,86 @@
+import math
+from typing import Dict, List
+
+import torch
+
+# Score returned when a model produces an invalid probability
+DEFAULT_SCORE = 0.951066792011261
+
+# ESG categories
+ESG_CATEGORIES = [
+    'Business Ethics & Values', 'Climate Change', 'Community Relations',
+    'Corporate Governance', 'Human Capital', 'Natural Capital', 'Non-ESG',
+    'Pollution & Waste', 'Product Liability'
+]
+
+
+def encode(tokenizer, texts: List[str], device: str, max_length: int = 512) -> dict:
+    """Tokenize texts into one padded, truncated batch on the target device."""
+    inputs = tokenizer(texts, return_tensors="pt", truncation=True, max_length=max_length, padding=True)
+    return {k: v.to(device) for k, v in inputs.items()}
+
+
+def get_scores(model, tokenizer, texts: List[str], device: str, max_length: int = 512) -> List[float]:
+    """Positive-class probability for every text, computed as one padded batch."""
+    return positive_scores(model, encode(tokenizer, texts, device, max_length))
+
+
+def positive_scores(model, inputs: dict) -> List[float]:
+    """Positive-class probability for every row of an already encoded batch."""
+    with torch.inference_mode():
+        outputs = model(**inputs)
+        logits = outputs.logits if hasattr(outputs, 'logits') else outputs[0]
+        probs = torch.nn.functional.softmax(logits, dim=-1)[:, 1].tolist()
+
+    scores = []
+    for score in probs:
+        if not isinstance(score, float) or math.isnan(score):
+            print(f"Invalid score generated: {score}")
+            scores.append(DEFAULT_SCORE)
+        else:
+            scores.append(max(0.0, min(1.0, score)))
+    return scores
+
+
+def activation(config):
+    """Logits-to-probabilities function, chosen the same way the text-classification pipeline does."""
+    if config.problem_type == "multi_label_classification" or config.num_labels == 1:
+        return torch.sigmoid
+    return lambda logits: torch.nn.functional.softmax(logits, dim=-1)
+
+
+def build_analysis_result(commitment_score: float, specificity_score: float) -> dict:
+    """Commitment and specificity plus the cheap-talk and safe-talk probabilities derived from them."""
+    return {
+        "commitment_probability": float(commitment_score),
+        "specificity_probability": float(specificity_score),
+        "cheap_talk_probability": float(commitment_score * (1 - specificity_score)),
+        "safe_talk_probability": float((1 - commitment_score) * specificity_score)
+    }
+
+
+def normalize_esg_scores(predictions: List[dict]) -> Dict[str, float]:
+    """Turn raw pipeline predictions into a normalized score per ESG category."""
+    scores = {}
+    for pred in predictions:
+        score = float(pred['score'])
+        if not (isinstance(score, float) and score >= 0 and score <= 1):
+            score = 0.0
+        scores[pred['label']] = score
+
+    # Ensure all categories have a score
+    for category in ESG_CATEGORIES:
+        if category not in scores:
+            scores[category] = 0.0
+
+    # Normalize scores to ensure they sum to 1
+    total = sum(scores.values())
+    if total > 0:
+        scores = {k: float(v / total) for k, v in scores.items()}
+    return scores
+
+
+def get_esg_scores(classifier, texts: List[str], max_length: int = 512) -> List[Dict[str, float]]:
+    """ESG category scores for every text, run through a prebuilt classifier pipeline as one batch."""
+    results = classifier(texts, truncation=True, max_length=max_length, batch_size=len(texts))
+    return [normalize_esg_scores(predictions) for predictions in results]
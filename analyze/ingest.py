@@ -0,0 +1,90 @@
+import hashlib
+import os
+from typing import Optional
+
+# Large reads keep the per-chunk Python overhead negligible next to the copy itself
+INGEST_CHUNK_SIZE = 1024 * 1024
+
+
+class IngestedUpload:
+    """
+    An upload after ingestion: where it was stored, its size, its content hash and its bytes.
+
+    `duplicate` is True when a file with the same content was already stored, so nothing was written.
+    """
+
+    def __init__(self, path: str, size: int, sha256: str, data: bytearray, duplicate: bool = False):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.data = data
+        self.duplicate = duplicate
+
+
+def ingest_upload(source, upload_dir: str, file_extension: str, max_size: int,
+                  chunk_size: int = INGEST_CHUNK_SIZE) -> Optional[IngestedUpload]:
+    """
+    Read an upload once, in large chunks, enforcing `max_size` as it goes.
+
+    A seekable upload that is already too large is rejected without reading it.
+
+    Each chunk is hashed and kept in memory, so extraction can start from the
+    returned bytes instead of reading the file back. The bytes are stored as
+    `<sha256><extension>` in `upload_dir`, which makes uploads content-addressed:
+    a re-upload of the same report finds its file already there and writes
+    nothing. Returns None, leaving nothing on disk, if the upload exceeds `max_size`.
+    """
+    size = _remaining_size(source)
+    if size is not None and size > max_size:
+        return None
+
+    digest = hashlib.sha256()
+    data = bytearray()
+    received = 0
+    if size is not None and hasattr(source, "readinto"):
+        # Known size: read straight into a preallocated buffer, no per-chunk copies
+        data = bytearray(size)
+        view = memoryview(data)
+        while received < size:
+            n = source.readinto(view[received:received + chunk_size])
+            if not n:
+                break
+            digest.update(view[received:received + n])
+            received += n
+        view.release()
+        del data[received:]
+    else:
+        while chunk := source.read(chunk_size):
+            if received + len(chunk) > max_size:
+                return None
+            digest.update(chunk)
+            data += chunk
+            received += len(chunk)
+
+    sha256 = digest.hexdigest()
+    path = os.path.join(upload_dir, f"{sha256}{file_extension}")
+    if os.path.exists(path):
+        return IngestedUpload(path, received, sha256, data, duplicate=True)
+
+    # Write under a temporary name first so a crash never leaves a truncated blob at the final path
+    temp_path = os.path.join(upload_dir, f".{os.urandom(8).hex()}.part")
+    try:
+        with open(temp_path, "wb") as out:
+            out.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return IngestedUpload(path, received, sha256, data)
+
+
+def _remaining_size(source) -> Optional[int]:
+    """Bytes left in a seekable upload (Starlette spools uploads to a seekable file), else None."""
+    try:
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END) - position
+        source.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
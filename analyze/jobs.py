@@ -0,0 +1,271 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from config import JOB_QUEUE_PATH, JOB_MAX_ATTEMPTS, JOB_RETRY_BACKOFF, JOB_LEASE_SECONDS
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+TERMINAL = (SUCCEEDED, FAILED)
+
+
+class JobQueue:
+    """
+    Durable job queue in a local SQLite file.
+
+    Jobs are claimed highest priority first, then oldest first. A failed attempt
+    is retried after an exponential backoff until `max_attempts` is reached.
+
+    A claimed job records its owner (this queue object, one per process) and a
+    lease of `lease_seconds`, which the owner renews while the job runs. Only
+    jobs whose lease has expired, because the process running them died, are
+    queued again by `recover()`, so starting another worker process never
+    re-runs jobs a live process is still working on.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, retry_backoff: float = 5.0,
+                 lease_seconds: float = 60.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def _db(self):
+        # Opened on first use so importing the module (e.g. in worker processes) touches no files
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT, status TEXT, priority INTEGER, payload TEXT, "
+                "result TEXT, error TEXT, attempts INTEGER, max_attempts INTEGER, "
+                "created REAL, available_at REAL, started REAL, finished REAL, timings TEXT, "
+                "claimed_by TEXT, lease_until REAL)"
+            )
+            # Queues created before leases existed lack the owner and lease columns
+            columns = {row["name"] for row in self._connection.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("claimed_by", "TEXT"), ("lease_until", "REAL")):
+                if column not in columns:
+                    self._connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, created)")
+        return self._connection
+
+    def submit(self, kind: str, payload: dict, priority: int = 0) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, priority, payload, attempts, max_attempts, created, available_at, timings) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, '{}')",
+                (job_id, kind, QUEUED, priority, json.dumps(payload), self.max_attempts, now, now)
+            )
+        return job_id
+
+    def claim(self) -> Optional[dict]:
+        """Mark the next runnable job as running and return it, or None if nothing is due."""
+        now = time.time()
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE status = ? AND available_at <= ? "
+                    "ORDER BY priority DESC, created LIMIT 1", (QUEUED, now)
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET status = ?, started = ?, attempts = attempts + 1, claimed_by = ?, "
+                        "lease_until = ? WHERE id = ?",
+                        (RUNNING, now, self.owner, now + self.lease_seconds, row["id"])
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = self._to_dict(row)
+        job.update(status=RUNNING, started=now, attempts=job["attempts"] + 1,
+                   claimed_by=self.owner, lease_until=now + self.lease_seconds)
+        return job
+
+    def renew(self, job_id: str) -> bool:
+        """Extend this owner's lease on a running job. False if the job is no longer ours."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = ? AND claimed_by = ?",
+                (time.time() + self.lease_seconds, job_id, RUNNING, self.owner)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, job_id: str):
+        """Queue a job this owner is running again straight away, e.g. when shutting down mid-job."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, claimed_by = NULL, lease_until = NULL "
+                "WHERE id = ? AND status = ? AND claimed_by = ?",
+                (QUEUED, time.time(), job_id, RUNNING, self.owner)
+            )
+
+    def complete(self, job_id: str, result: dict, timings: dict):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, finished = ?, timings = ?, "
+                "claimed_by = NULL, lease_until = NULL WHERE id = ? AND claimed_by = ?",
+                (SUCCEEDED, json.dumps(result), time.time(), json.dumps(timings), job_id, self.owner)
+            )
+
+    def fail(self, job_id: str, error: str, timings: dict) -> str:
+        """Record a failed attempt; the job is queued again unless it is out of attempts. Returns the new status."""
+        with self._lock:
+            row = self._db.execute("SELECT status, attempts, max_attempts, claimed_by FROM jobs WHERE id = ?",
+                                   (job_id,)).fetchone()
+            if row["claimed_by"] != self.owner:
+                # The lease expired and the job was recovered; its new owner records the outcome
+                return row["status"]
+            now = time.time()
+            if row["attempts"] < row["max_attempts"]:
+                delay = self.retry_backoff * 2 ** (row["attempts"] - 1)
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, available_at = ?, timings = ?, "
+                    "claimed_by = NULL, lease_until = NULL WHERE id = ?",
+                    (QUEUED, error, now + delay, json.dumps(timings), job_id)
+                )
+                return QUEUED
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished = ?, timings = ?, "
+                "claimed_by = NULL, lease_until = NULL WHERE id = ?",
+                (FAILED, error, now, json.dumps(timings), job_id)
+            )
+            return FAILED
+
+    def recover(self, now: Optional[float] = None) -> int:
+        """Queue again every running job whose lease has expired. Returns how many were recovered."""
+        now = time.time() if now is None else now
+        with self._lock:
+            # Jobs from before leases existed have none; their owner is treated as gone
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, claimed_by = NULL, lease_until = NULL "
+                "WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)",
+                (QUEUED, time.time(), RUNNING, now)
+            )
+            return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def active_payload_values(self, field: str) -> set:
+        """Values of one payload field across the jobs still queued or running."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT json_extract(payload, ?) FROM jobs WHERE status IN (?, ?)",
+                (f"$.{field}", QUEUED, RUNNING)
+            ).fetchall()
+        return {row[0] for row in rows if row[0] is not None}
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["timings"] = json.loads(job["timings"] or "{}")
+        return job
+
+
+class JobWorkers:
+    """
+    Asyncio workers that take jobs off a JobQueue and run a handler per job kind.
+
+    Handlers are coroutines returning a result dict; they run on the caller's
+    event loop, so in the API process they share its loaded models, micro-batchers
+    and execution pools. A separate worker process (scripts/job_worker.py) runs
+    the same workers without serving HTTP. While a job runs its lease is
+    renewed every third of `queue.lease_seconds`, and idle workers recover
+    jobs whose owners stopped renewing.
+    """
+
+    def __init__(self, queue: JobQueue, handlers: dict, workers: int = 2, poll_interval: float = 0.5):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks = []
+        self._last_recovery = 0.0
+
+    def start(self):
+        self.queue.recover()
+        self._last_recovery = time.monotonic()
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_once(self) -> bool:
+        """Claim and run one job. Returns False when nothing was due."""
+        job = await asyncio.to_thread(self.queue.claim)
+        if job is None:
+            return False
+
+        timings = dict(job["timings"])
+        timings["queue_wait_ms"] = (job["started"] - job["created"]) * 1000.0
+        started = time.perf_counter()
+        renewal = asyncio.ensure_future(self._renew(job["id"]))
+        try:
+            handler: Callable[[dict, dict], Awaitable[dict]] = self.handlers[job["kind"]]
+            result = await handler(job["payload"], timings)
+        except asyncio.CancelledError:
+            # Shutting down mid-job: hand the job back so another worker can run it
+            self.queue.release(job["id"])
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            timings["run_ms"] = (time.perf_counter() - started) * 1000.0
+            await asyncio.to_thread(self.queue.fail, job["id"], str(e) or type(e).__name__, timings)
+            return True
+        finally:
+            renewal.cancel()
+        timings["run_ms"] = (time.perf_counter() - started) * 1000.0
+        await asyncio.to_thread(self.queue.complete, job["id"], result, timings)
+        return True
+
+    async def _renew(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.renew, job_id):
+                print(f"Lost the lease on job {job_id}")
+                return
+
+    async def _work(self):
+        while True:
+            if not await self.run_once():
+                if time.monotonic() - self._last_recovery >= self.queue.lease_seconds:
+                    self._last_recovery = time.monotonic()
+                    await asyncio.to_thread(self.queue.recover)
+                await asyncio.sleep(self.poll_interval)
+
+
+job_queue = JobQueue(JOB_QUEUE_PATH, max_attempts=JOB_MAX_ATTEMPTS, retry_backoff=JOB_RETRY_BACKOFF,
+                     lease_seconds=JOB_LEASE_SECONDS)
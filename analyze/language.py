@@ -0,0 +1,123 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+import numpy as np
+
+from config import LANGUAGE_CONFIDENCE, LANGUAGE_SAMPLE_CHARS, LANGUAGE_SAMPLES
+
+
+def text_samples(text: str, samples: int, sample_chars: int) -> List[str]:
+    """
+    `samples` evenly spaced slices of `sample_chars` characters, cut at whitespace.
+
+    Texts no longer than all the samples together are returned whole. The first
+    samples are the middle of the text, then its start and end, so early exit
+    sees the body of a report before its cover page and appendices.
+    """
+    if len(text) <= samples * sample_chars:
+        return [text]
+    span = len(text) - sample_chars
+    starts = [span * k // (samples - 1) for k in range(samples)] if samples > 1 else [span // 2]
+    starts.sort(key=lambda start: abs(start - span / 2))
+    slices = []
+    for start in starts:
+        # Move both ends to the next whitespace so no sample starts or ends mid-word
+        head = text.find(" ", start, start + 100)
+        start = head + 1 if head >= 0 else start
+        tail = text.find(" ", start + sample_chars, start + sample_chars + 100)
+        slices.append(text[start:tail if tail >= 0 else start + sample_chars])
+    return slices
+
+
+class LanguageGate:
+    """
+    Language detection whose cost does not grow with the document.
+
+    langid is a naive Bayes classifier, so summing the feature vectors of a few
+    samples classifies them as if they were one text. Samples are added one at
+    a time until the top language reaches `confidence` (after at least two
+    samples) or all `samples` are used. The verdict depends only on the samples,
+    so it is cached by their hash and the text's length, without hashing the
+    whole document.
+    """
+
+    def __init__(self, samples: int = 5, sample_chars: int = 1000, confidence: float = 0.99,
+                 cache_size: int = 4096):
+        self.samples = samples
+        self.sample_chars = sample_chars
+        self.confidence = confidence
+        self.cache_size = cache_size
+
+        self._lock = threading.Lock()
+        self._identifier = None
+        self._cache = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "samples_classified": 0, "early_exits": 0}
+
+    @property
+    def identifier(self):
+        # The model takes a second or two to unpack; load it on first use, once per process
+        if self._identifier is None:
+            with self._lock:
+                if self._identifier is None:
+                    from langid.langid import LanguageIdentifier, model
+                    self._identifier = LanguageIdentifier.from_modelstring(model, norm_probs=True)
+        return self._identifier
+
+    def detect(self, text: str) -> Tuple[str, float]:
+        """(language code, probability) for `text`."""
+        samples = text_samples(text, self.samples, self.sample_chars)
+        digest = hashlib.sha256(str(len(text)).encode("utf-8"))
+        for sample in samples:
+            digest.update(b"\0")
+            digest.update(sample.encode("utf-8"))
+        key = digest.hexdigest()
+
+        with self._lock:
+            verdict = self._cache.get(key)
+            if verdict is not None:
+                self._cache.move_to_end(key)
+                self._counters["hits"] += 1
+                return verdict
+            self._counters["misses"] += 1
+
+        verdict, used = self._classify(samples)
+        with self._lock:
+            self._counters["samples_classified"] += used
+            self._counters["early_exits"] += used < len(samples)
+            self._cache[key] = verdict
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return verdict
+
+    def is_language(self, text: str, language: str = "en") -> bool:
+        return self.detect(text)[0] == language
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._cache),
+            }
+
+    def _classify(self, samples: List[str]) -> Tuple[Tuple[str, float], int]:
+        identifier = self.identifier
+        features = None
+        for used, sample in enumerate(samples, start=1):
+            sample_features = identifier.instance2fv(sample).astype(np.int64)
+            features = sample_features if features is None else features + sample_features
+            probabilities = identifier.norm_probs(identifier.nb_classprobs(features))
+            best = int(np.argmax(probabilities))
+            if used >= 2 and probabilities[best] >= self.confidence:
+                break
+        return (str(identifier.nb_classes[best]), float(probabilities[best])), used
+
+
+language_gate = LanguageGate(LANGUAGE_SAMPLES, LANGUAGE_SAMPLE_CHARS, LANGUAGE_CONFIDENCE)
+
+
+def is_english(text: str) -> bool:
+    return language_gate.is_language(text, "en")
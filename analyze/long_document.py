@@ -0,0 +1,92 @@
+import math
+import time
+from typing import Dict, Literal, get_args
+
+import torch
+
+from analyze.inference import DEFAULT_SCORE, activation, normalize_esg_scores
+
+Aggregation = Literal["mean", "max", "weighted"]
+AGGREGATIONS = get_args(Aggregation)
+
+
+def window_probabilities(model, tokenizer, text: str, device: str, window: int = 512,
+                         overlap: int = 128, batch_size: int = 16):
+    """
+    Split text into overlapping token windows and run them through the model in batches.
+
+    Returns the per-window class probabilities, the number of real tokens in each
+    window and the tokens/sec achieved.
+    """
+    started = time.perf_counter()
+    encoded = tokenizer(
+        text, return_tensors="pt", truncation=True, max_length=window, stride=overlap,
+        return_overflowing_tokens=True, padding=True
+    )
+    encoded.pop("overflow_to_sample_mapping", None)
+    token_counts = encoded["attention_mask"].sum(dim=1)
+
+    probabilities = []
+    num_windows = encoded["input_ids"].shape[0]
+    with torch.inference_mode():
+        for start in range(0, num_windows, batch_size):
+            batch = {k: v[start:start + batch_size].to(device) for k, v in encoded.items()}
+            outputs = model(**batch)
+            logits = outputs.logits if hasattr(outputs, 'logits') else outputs[0]
+            probabilities.append(activation(model.config)(logits).cpu())
+
+    elapsed = time.perf_counter() - started
+    tokens = int(token_counts.sum())
+    return torch.cat(probabilities), token_counts, {
+        "windows": num_windows,
+        "tokens": tokens,
+        "seconds": elapsed,
+        "tokens_per_sec": tokens / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def aggregate(values: torch.Tensor, token_counts: torch.Tensor, aggregation: str = "mean") -> torch.Tensor:
+    """Combine per-window values (windows x classes) into one row."""
+    if aggregation == "mean":
+        return values.mean(dim=0)
+    if aggregation == "max":
+        return values.max(dim=0).values
+    if aggregation == "weighted":
+        weights = token_counts.to(values.dtype)
+        return (values * weights.unsqueeze(1)).sum(dim=0) / weights.sum()
+    raise ValueError(f"Unknown aggregation '{aggregation}'. Expected one of: {', '.join(AGGREGATIONS)}")
+
+
+def score_long_document(model, tokenizer, text: str, device: str, aggregation: str = "mean",
+                        include_windows: bool = False, **window_args) -> dict:
+    """Positive-class probability for a whole document, combined over all its windows."""
+    probs, token_counts, stats = window_probabilities(model, tokenizer, text, device, **window_args)
+    score = float(aggregate(probs, token_counts, aggregation)[1])
+    result = {
+        "score": DEFAULT_SCORE if math.isnan(score) else max(0.0, min(1.0, score)),
+        "aggregation": aggregation,
+        **stats,
+    }
+    if include_windows:
+        result["window_scores"] = [float(p) for p in probs[:, 1]]
+    return result
+
+
+def classify_esg_long_document(model, tokenizer, text: str, device: str, aggregation: str = "mean",
+                               include_windows: bool = False, **window_args) -> dict:
+    """ESG category scores for a whole document, combined over all its windows."""
+    probs, token_counts, stats = window_probabilities(model, tokenizer, text, device, **window_args)
+    result = {
+        "scores": _esg_labels(model.config, aggregate(probs, token_counts, aggregation)),
+        "aggregation": aggregation,
+        **stats,
+    }
+    if include_windows:
+        result["window_scores"] = [_esg_labels(model.config, row) for row in probs]
+    return result
+
+
+def _esg_labels(config, row: torch.Tensor) -> Dict[str, float]:
+    return normalize_esg_scores([
+        {"label": config.id2label[i], "score": float(score)} for i, score in enumerate(row.tolist())
+    ])
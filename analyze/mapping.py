@@ -0,0 +1,14 @@
+import csv
+import functools
+import os
+from typing import Dict
+
+# Report metadata: pdf_name, company_name, year, Sector, the RQI and CT labels, ...
+MAPPING_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "mapping file.csv")
+
+
+@functools.lru_cache(maxsize=1)
+def load_mapping() -> Dict[str, dict]:
+    """Rows of the mapping file keyed by pdf_name, read once per process."""
+    with open(MAPPING_PATH, newline="", encoding="utf-8") as f:
+        return {row["pdf_name"]: row for row in csv.DictReader(f)}
@@ -0,0 +1,14 @@
+import numpy as np
+
+
+def summarize(values) -> dict:
+    """Mean, median, p95 and max of a sequence of measurements."""
+    values = np.asarray(values, dtype=float)
+    if not values.size:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(values.max()),
+    }
@@ -0,0 +1,130 @@
+import functools
+import re
+import string
+from typing import List, Literal
+
+import textstat
+from nltk.tokenize import sent_tokenize
+from nltk.tokenize.destructive import NLTKWordTokenizer
+
+Tokenizer = Literal["nltk", "regex"]
+TOKENIZERS = ("nltk", "regex")
+
+# Flesch Reading Ease constants for English, as textstat uses them
+FRE_BASE, FRE_SENTENCE_LENGTH, FRE_SYLLABLES_PER_WORD = 206.835, 1.015, 84.6
+
+# Sentence ends: terminal punctuation (and closing quotes/brackets), whitespace, then an upper-case
+# letter, a digit or an opening quote/bracket
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+# A whitespace-delimited token that is letters only once edge punctuation and a contraction suffix
+# are stripped, i.e. what NLTK's tokenizer plus an isalpha() filter keeps: "don't" gives "do".
+# Like NLTK, only the sentence's final period is split off, so "inc." mid-sentence is dropped.
+_ALPHA_WORD = re.compile(r"(?<!\S)[\"'(\[{<`]*([^\W\d_]+?)(?:n't|'s|'re|'ve|'ll|'d|'m)?[\"')\]}>,;:!?`]*(?!\S)")
+_FINAL_PERIOD = re.compile(r"\.([\"')\]}>]*)\s*$")
+# textstat's word and sentence rules (lexicon_count, sentence_count)
+_NONCONTRACTION_APOSTROPHE = re.compile(r"\'(?![tsd]|ve|ll|re)")
+_PUNCTUATION = re.compile(r"[^\w\s\']")
+_TEXTSTAT_SENTENCE = re.compile(r"\b[^.!?]+[.!?]*", re.UNICODE)
+
+_word_tokenizer = NLTKWordTokenizer()
+
+
+class PreprocessedText:
+    """
+    One document tokenized once for every consistency metric.
+
+    `sentences` come from the chosen tokenizer, `words` are the lower-case
+    alphabetic tokens (clarity), `cleaned` is the `clean_for_tfidf` text for
+    TF-IDF, and `flesch_words`, `flesch_sentences` and `syllables` are the counts
+    textstat's Flesch Reading Ease formula uses. `tokenizer` is the tokenizer
+    actually used, which is "regex" when NLTK's punkt data is missing.
+    """
+
+    def __init__(self, sentences: List[str], words: List[str], cleaned: str, flesch_words: int,
+                 flesch_sentences: int, syllables: int, tokenizer: str):
+        self.sentences = sentences
+        self.words = words
+        self.cleaned = cleaned
+        self.flesch_words = flesch_words
+        self.flesch_sentences = flesch_sentences
+        self.syllables = syllables
+        self.tokenizer = tokenizer
+
+    def flesch_reading_ease(self) -> float:
+        if not self.flesch_words or not self.flesch_sentences or not self.syllables:
+            return 0.0
+        return (FRE_BASE - FRE_SENTENCE_LENGTH * self.flesch_words / self.flesch_sentences
+                - FRE_SYLLABLES_PER_WORD * self.syllables / self.flesch_words)
+
+
+def clean_for_tfidf(text: str) -> str:
+    """Lower-case and strip digits and punctuation, the input of the TF-IDF segment similarity."""
+    text = text.lower()
+    text = re.sub(r'\d+', '', text)
+    return text.translate(str.maketrans('', '', string.punctuation))
+
+
+def split_sentences(text: str, tokenizer: str = "nltk") -> List[str]:
+    if tokenizer == "nltk":
+        return sent_tokenize(text)
+    return [sentence for sentence in _SENTENCE_END.split(text.strip()) if sentence]
+
+
+def sentence_spans(text: str) -> List[tuple]:
+    """(start, end) character offsets of the regex tokenizer's sentences in `text`."""
+    spans, start = [], 0
+    for boundary in _SENTENCE_END.finditer(text):
+        spans.append((start, boundary.start()))
+        start = boundary.end()
+    spans.append((start, len(text)))
+    return spans
+
+
+def alpha_words(sentences: List[str], tokenizer: str = "nltk") -> List[str]:
+    """Lower-case tokens made only of letters, as `word_tokenize(text.lower())` filtered by isalpha()."""
+    if tokenizer == "nltk":
+        return [token for sentence in sentences for token in _word_tokenizer.tokenize(sentence.lower())
+                if token.isalpha()]
+    return [match.group(1) for sentence in sentences
+            for match in _ALPHA_WORD.finditer(_FINAL_PERIOD.sub(r"\1", sentence.lower()))]
+
+
+@functools.lru_cache(maxsize=100000)
+def word_syllables(word: str) -> int:
+    # Vocabularies are far smaller than documents, so each distinct word is looked up once
+    return textstat.syllable_count(word)
+
+
+def flesch_counts(text: str) -> tuple:
+    """(words, sentences, syllables) counted the way textstat does for flesch_reading_ease."""
+    words = _PUNCTUATION.sub("", _NONCONTRACTION_APOSTROPHE.sub("", text)).split()
+    sentences = _TEXTSTAT_SENTENCE.findall(text)
+    # textstat ignores "sentences" of two words or fewer, but always counts at least one
+    short = sum(1 for sentence in sentences
+                if len(_PUNCTUATION.sub("", _NONCONTRACTION_APOSTROPHE.sub("", sentence)).split()) <= 2)
+    sentence_count = max(1, len(sentences) - short) if text else 0
+    syllables = sum(word_syllables(word.lower()) for word in words)
+    return len(words), sentence_count, syllables
+
+
+def preprocess_document(text: str, tokenizer: str = "nltk") -> PreprocessedText:
+    """Sentences, words and syllable counts of `text` for readability, clarity and consistency, in one pass."""
+    if tokenizer not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer {tokenizer!r}, expected one of {TOKENIZERS}")
+    try:
+        sentences = split_sentences(text, tokenizer)
+    except LookupError:
+        print("NLTK punkt data is not installed; tokenizing with the regex tokenizer")
+        tokenizer = "regex"
+        sentences = split_sentences(text, tokenizer)
+
+    flesch_words, flesch_sentences, syllables = flesch_counts(" ".join(sentences))
+    return PreprocessedText(
+        sentences=sentences,
+        words=alpha_words(sentences, tokenizer),
+        cleaned=clean_for_tfidf(text),
+        flesch_words=flesch_words,
+        flesch_sentences=flesch_sentences,
+        syllables=syllables,
+        tokenizer=tokenizer,
+    )
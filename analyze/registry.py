@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import torch
+from transformers import AutoTokenizer
+
+from analyze.backends import create_backend
+from analyze.quantization import PRECISIONS, model_size_bytes
+
+WARMUP_TEXT = (
+    "We are committed to reducing our Scope 1 and 2 greenhouse gas emissions "
+    "by 40% by 2030 compared to a 2019 baseline."
+)
+
+
+class ModelHandle:
+    """A loaded model with its tokenizer and, optionally, a ready-built pipeline."""
+
+    def __init__(self, name: str, model_id: str, model, tokenizer, classifier=None):
+        self.name = name
+        self.model_id = model_id
+        self.model = model
+        self.tokenizer = tokenizer
+        self.classifier = classifier
+
+
+class ModelRegistry:
+    """
+    Builds every model, tokenizer and pipeline once and keeps them in inference mode.
+
+    Handlers ask the registry for a handle instead of constructing pipelines or
+    moving models between devices on every request.
+
+    Models come from an inference backend: PyTorch by default, or ONNX Runtime
+    graphs exported by scripts/export_onnx.py. With `precision="int8"` the models
+    are dynamically quantized. Quantized kernels only exist for CPU, so on other
+    devices the registry serves fp32 and says so in `stats()`.
+    """
+
+    def __init__(self, device: str, precision: str = "fp32", backend: str = "torch",
+                 onnx_model_dir: str = "onnx_models"):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision {precision!r}, expected one of {PRECISIONS}")
+        if precision == "int8" and device != "cpu":
+            print(f"int8 inference is CPU-only; serving fp32 on {device}")
+            precision = "fp32"
+        self.device = device
+        self.precision = precision
+        self.backend = create_backend(backend, device, precision, onnx_model_dir)
+        self._specs = {}
+        self._handles: Dict[str, ModelHandle] = {}
+        self._timings = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, model_id: str, pipeline_task: Optional[str] = None):
+        self._specs[name] = {"model_id": model_id, "pipeline_task": pipeline_task}
+        self._load_locks[name] = threading.Lock()
+
+    def load(self, name: str) -> ModelHandle:
+        """Load a model once; concurrent callers for the same name wait for the first load."""
+        with self._load_locks[name]:
+            if name in self._handles:
+                return self._handles[name]
+            return self._load(name)
+
+    def _load(self, name: str) -> ModelHandle:
+        spec = self._specs[name]
+        timings = self._timings.setdefault(name, {})
+
+        started = time.perf_counter()
+        tokenizer = AutoTokenizer.from_pretrained(spec["model_id"])
+        model = self.backend.load_model(spec["model_id"])
+        timings["load_ms"] = (time.perf_counter() - started) * 1000.0
+        if isinstance(model, torch.nn.Module):
+            timings["size_bytes"] = model_size_bytes(model)
+
+        classifier = None
+        if spec["pipeline_task"]:
+            started = time.perf_counter()
+            classifier = self.backend.build_classifier(spec["pipeline_task"], model, tokenizer)
+            timings["pipeline_build_ms"] = (time.perf_counter() - started) * 1000.0
+
+        handle = ModelHandle(name, spec["model_id"], model, tokenizer, classifier)
+        self._handles[name] = handle
+        return handle
+
+    def load_all(self, workers: int = 1):
+        """Load every registered model, `workers` at a time."""
+        names = [name for name in self._specs if name not in self._handles]
+        if workers <= 1:
+            for name in names:
+                self.load(name)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-load") as pool:
+            # list() re-raises the first loading error
+            list(pool.map(self.load, names))
+
+    def warmup(self, passes: int = 2):
+        """Run a few forward passes so the first real request doesn't pay for lazy initialization."""
+        for name, handle in list(self._handles.items()):
+            started = time.perf_counter()
+            for _ in range(passes):
+                if handle.classifier is not None:
+                    handle.classifier([WARMUP_TEXT], truncation=True, max_length=512)
+                else:
+                    inputs = handle.tokenizer([WARMUP_TEXT], return_tensors="pt", truncation=True, max_length=512)
+                    inputs = {k: v.to(self.device) for k, v in inputs.items()}
+                    with torch.inference_mode():
+                        handle.model(**inputs)
+            self._timings[name]["warmup_ms"] = (time.perf_counter() - started) * 1000.0
+
+    def get(self, name: str) -> ModelHandle:
+        """The model's handle, loading it now if startup hasn't got to it yet."""
+        handle = self._handles.get(name)
+        return handle if handle is not None else self.load(name)
+
+    def model_id(self, name: str) -> str:
+        """Identifier of the weights being served; other backends and precisions get a suffix so cached results don't mix."""
+        model_id = self._specs[name]["model_id"]
+        if self.backend.name != "torch":
+            model_id = f"{model_id}@{self.backend.name}"
+        return model_id if self.precision == "fp32" else f"{model_id}@{self.precision}"
+
+    def stats(self) -> dict:
+        return {
+            "device": self.device,
+            "backend": self.backend.name,
+            "precision": self.precision,
+            "models": {
+                name: {"model_id": spec["model_id"], "loaded": name in self._handles, **self._timings.get(name, {})}
+                for name, spec in self._specs.items()
+            },
+        }
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Optional
+
+from config import (
+    RESULT_CACHE_PATH, RESULT_CACHE_MEMORY_MB, RESULT_CACHE_DISK_MAX_ENTRIES, RESULT_CACHE_VERSION
+)
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace so trivially different copies share a key."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class ResultCache:
+    """
+    Content-addressed cache of analysis results.
+
+    Keys hash the normalized text together with the namespace (endpoint), the
+    model identifiers and options that produced the result, and a cache version.
+    Results live in an in-memory LRU tier bounded by `max_memory_bytes` and, when
+    `path` is set, in a SQLite tier that survives restarts. Hits do not write to
+    SQLite: the keys read are collected and their `last_access` updated in one
+    batch every `touch_batch` hits or `touch_interval` seconds, or with the next
+    write. Hashing and SQLite I/O block, so async callers run them in a thread.
+    """
+
+    def __init__(self, path: Optional[str], max_memory_bytes: int, max_disk_entries: int = 100000,
+                 version: str = "1", touch_batch: int = 100, touch_interval: float = 60.0):
+        self.path = path
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_entries = max_disk_entries
+        self.version = version
+        self.touch_batch = touch_batch
+        self.touch_interval = touch_interval
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._connection = None
+        self._writes = 0
+        self._touched = {}
+        self._last_touch_flush = time.monotonic()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+    @property
+    def _db(self):
+        # Opened on first use so importing the module (e.g. in worker processes) touches no files
+        if self._connection is None and self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, namespace TEXT, value TEXT, created REAL, last_access REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS results_namespace ON results (namespace)")
+            self._connection.commit()
+        return self._connection
+
+    def key(self, namespace: str, text: str, *parts: Any) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps([self.version, namespace, [str(p) for p in parts]]).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return f"{namespace}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                self._touch(key)
+                return json.loads(entry)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._counters["disk_hits"] += 1
+                    self._touch(key)
+                    self._remember(key, row[0])
+                    return json.loads(row[0])
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        encoded = json.dumps(value)
+        with self._lock:
+            self._counters["sets"] += 1
+            self._remember(key, encoded)
+            if self._db is not None:
+                now = time.time()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, namespace, value, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, key.split(":", 1)[0], encoded, now, now)
+                )
+                self._touched.pop(key, None)
+                self._flush_touched()
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._evict_disk()
+                self._db.commit()
+
+    def invalidate(self, key: Optional[str] = None, namespace: Optional[str] = None) -> int:
+        """Drop one key, every key in a namespace, or (with neither) everything. Returns the count removed."""
+        with self._lock:
+            if key is not None:
+                keys = [key] if key in self._memory else []
+            elif namespace is not None:
+                keys = [k for k in self._memory if k.startswith(f"{namespace}:")]
+            else:
+                keys = list(self._memory)
+            for k in keys:
+                self._memory_bytes -= len(self._memory.pop(k))
+            removed = len(keys)
+
+            if self._db is not None:
+                if key is not None:
+                    cursor = self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                elif namespace is not None:
+                    cursor = self._db.execute("DELETE FROM results WHERE namespace = ?", (namespace,))
+                else:
+                    cursor = self._db.execute("DELETE FROM results")
+                self._db.commit()
+                removed = max(removed, cursor.rowcount)
+            return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = lookups - self._counters["misses"]
+            disk_entries = None
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                **self._counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_entries": disk_entries,
+                "version": self.version,
+            }
+
+    def _remember(self, key: str, encoded: str):
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        if len(encoded) > self.max_memory_bytes:
+            return
+        self._memory[key] = encoded
+        self._memory_bytes += len(encoded)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._counters["evictions"] += 1
+
+    def _touch(self, key: str):
+        if self._db is None:
+            return
+        self._touched[key] = time.time()
+        if (len(self._touched) >= self.touch_batch
+                or time.monotonic() - self._last_touch_flush >= self.touch_interval):
+            self._flush_touched()
+            self._db.commit()
+
+    def _flush_touched(self):
+        # Callers hold the lock and commit
+        if self._touched:
+            self._db.executemany("UPDATE results SET last_access = ? WHERE key = ?",
+                                 [(accessed, key) for key, accessed in self._touched.items()])
+            self._touched = {}
+        self._last_touch_flush = time.monotonic()
+
+    def _evict_disk(self):
+        self._db.execute(
+            "DELETE FROM results WHERE key IN ("
+            "SELECT key FROM results ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+
+result_cache = ResultCache(
+    RESULT_CACHE_PATH or None,
+    max_memory_bytes=int(RESULT_CACHE_MEMORY_MB * 1024 * 1024),
+    max_disk_entries=RESULT_CACHE_DISK_MAX_ENTRIES,
+    version=RESULT_CACHE_VERSION,
+)
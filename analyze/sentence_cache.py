@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from analyze.result_cache import normalize_text
+from config import SENTENCE_CACHE_PATH, SENTENCE_CACHE_MAX_ENTRIES
+
+# SQLite's default limit on host parameters per statement is 999
+_LOOKUP_CHUNK = 500
+
+
+class SentenceCache:
+    """
+    Persistent cache of per-sentence model outputs, keyed by model and sentence hash.
+
+    A company's reports repeat much of their text from one year to the next,
+    so scoring a new report through the cache runs the model only on sentences
+    it has not seen with that model before. Sentences are normalized like the
+    result cache's texts before hashing. Entries live in SQLite at `path` (no
+    path disables the cache); beyond `max_entries` the least recently used
+    ones are evicted.
+    """
+
+    def __init__(self, path: Optional[str], max_entries: int = 1000000):
+        self.path = path
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._connection = None
+        self._writes = 0
+        self._counters = {"lookups": 0, "hits": 0, "scored": 0, "chars_looked_up": 0, "chars_hit": 0,
+                          "evictions": 0}
+
+    @property
+    def _db(self):
+        # Opened on first use so importing the module (e.g. in worker processes) touches no files
+        if self._connection is None and self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sentences ("
+                "model TEXT, sha256 TEXT, value TEXT, last_access REAL, PRIMARY KEY (model, sha256))"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS sentences_last_access ON sentences (last_access)")
+            self._connection.commit()
+        return self._connection
+
+    @staticmethod
+    def key(sentence: str) -> str:
+        return hashlib.sha256(normalize_text(sentence).encode("utf-8")).hexdigest()
+
+    def score(self, model: str, sentences: List[str], score: Callable[[List[str]], List[Any]],
+              batch_size: int = 16) -> Tuple[List[Any], dict]:
+        """
+        `score`'s output for every sentence, running it (in batches) only on sentences not cached for `model`.
+
+        Returns the outputs in sentence order and this call's hit statistics.
+        """
+        keys = [self.key(sentence) for sentence in sentences]
+        cached = self._lookup(model, list(dict.fromkeys(keys)))
+
+        # Each distinct missing sentence is scored once, however often it repeats
+        missing = {}
+        for key, sentence in zip(keys, sentences):
+            if key not in cached and key not in missing:
+                missing[key] = sentence
+        missing_keys = list(missing)
+        scored = {}
+        for start in range(0, len(missing_keys), batch_size):
+            batch = missing_keys[start:start + batch_size]
+            scored.update(zip(batch, score([missing[key] for key in batch])))
+        self._store(model, scored)
+
+        hits = [key in cached for key in keys]
+        chars = sum(len(sentence) for sentence in sentences)
+        chars_hit = sum(len(sentence) for sentence, hit in zip(sentences, hits) if hit)
+        with self._lock:
+            self._counters["lookups"] += len(sentences)
+            self._counters["hits"] += sum(hits)
+            self._counters["scored"] += len(scored)
+            self._counters["chars_looked_up"] += chars
+            self._counters["chars_hit"] += chars_hit
+
+        results = [cached[key] if key in cached else scored[key] for key in keys]
+        return results, {
+            "sentences": len(sentences),
+            "hits": sum(hits),
+            "hit_rate": sum(hits) / len(sentences) if sentences else 0.0,
+            "scored": len(scored),
+            "inference_saved": chars_hit / chars if chars else 0.0,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = None
+            if self._db is not None:
+                entries = self._db.execute("SELECT COUNT(*) FROM sentences").fetchone()[0]
+            lookups = self._counters["lookups"]
+            return {
+                **self._counters,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+                "inference_saved": (self._counters["chars_hit"] / self._counters["chars_looked_up"]
+                                    if self._counters["chars_looked_up"] else 0.0),
+                "entries": entries,
+                "max_entries": self.max_entries,
+            }
+
+    def _lookup(self, model: str, keys: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            if self._db is None or not keys:
+                return found
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT sha256, value FROM sentences WHERE model = ? AND sha256 IN ({placeholders})",
+                    (model, *chunk)
+                ).fetchall()
+                found.update((key, json.loads(value)) for key, value in rows)
+            if found:
+                self._db.executemany("UPDATE sentences SET last_access = ? WHERE model = ? AND sha256 = ?",
+                                     [(time.time(), model, key) for key in found])
+                self._db.commit()
+        return found
+
+    def _store(self, model: str, scored: dict):
+        with self._lock:
+            if self._db is None or not scored:
+                return
+            now = time.time()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sentences (model, sha256, value, last_access) VALUES (?, ?, ?, ?)",
+                [(model, key, json.dumps(value), now) for key, value in scored.items()]
+            )
+            previous, self._writes = self._writes, self._writes + len(scored)
+            if previous // 1000 != self._writes // 1000:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        cursor = self._db.execute(
+            "DELETE FROM sentences WHERE rowid IN ("
+            "SELECT rowid FROM sentences ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        self._counters["evictions"] += max(cursor.rowcount, 0)
+
+
+sentence_cache = SentenceCache(SENTENCE_CACHE_PATH or None, max_entries=SENTENCE_CACHE_MAX_ENTRIES)
@@ -0,0 +1,75 @@
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+
+class Startup:
+    """
+    Runs slow initialization (model loading, data downloads) in the background.
+
+    The app starts serving immediately; `/ready` reports whether every component
+    has finished, and each component's status and duration are kept for `/metrics`.
+    Code that needs a component before it is ready loads it on demand instead
+    of waiting for the background thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[str, dict] = {}
+        self._thread = None
+        self._done = threading.Event()
+        self._total_ms = None
+
+    @contextmanager
+    def component(self, name: str):
+        """Time a block of startup work and record whether it succeeded."""
+        with self._lock:
+            self._components[name] = {"status": "loading"}
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self._components[name] = {
+                    "status": "failed", "error": str(e), "ms": (time.perf_counter() - started) * 1000.0
+                }
+            raise
+        with self._lock:
+            self._components[name] = {"status": "ready", "ms": (time.perf_counter() - started) * 1000.0}
+
+    def start(self, target: Callable[[], None]):
+        """Run `target` once in a daemon thread. Failures are recorded, not raised."""
+        if self._thread is not None:
+            return
+
+        def run():
+            started = time.perf_counter()
+            try:
+                target()
+            except Exception:
+                traceback.print_exc()
+            finally:
+                self._total_ms = (time.perf_counter() - started) * 1000.0
+                self._done.set()
+
+        self._thread = threading.Thread(target=run, name="startup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self._done.is_set() and all(c["status"] == "ready" for c in self._components.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self._done.is_set() and all(c["status"] == "ready" for c in self._components.values()),
+                "finished": self._done.is_set(),
+                "total_ms": self._total_ms,
+                "components": {name: dict(c) for name, c in self._components.items()},
+            }
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Literal, Optional
+
+import torch
+
+from analyze.extraction import PAGE_SEPARATOR, extract_document, extract_pdf_pages, pdf_page_count
+from analyze.inference import ESG_CATEGORIES, build_analysis_result, normalize_esg_scores
+from analyze.long_document import aggregate
+
+StreamFormat = Literal["ndjson", "sse"]
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def encode_record(record: dict, stream_format: str = "ndjson") -> str:
+    """One streamed record: a JSON line, or a server-sent event named after the record type."""
+    data = json.dumps(record)
+    if stream_format == "sse":
+        return f"event: {record['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def page_batches(page_count: int, first: int = 1, largest: int = 32) -> List[tuple]:
+    """
+    [start, stop) page ranges that start small and double up to `largest`.
+
+    The first page is extracted and scored on its own so the first result
+    arrives quickly; later ranges grow so a long report needs few extraction tasks.
+    """
+    ranges, start, size = [], 0, first
+    while start < page_count:
+        stop = min(page_count, start + size)
+        ranges.append((start, stop))
+        start, size = stop, min(largest, size * 2)
+    return ranges
+
+
+def split_sections(text: str, max_chars: int = 4000) -> List[tuple]:
+    """
+    Split text without pages into (start offset, section) pairs of whole paragraphs.
+
+    Sections stay under `max_chars` unless a single paragraph is longer, in which
+    case it is cut into `max_chars` pieces.
+    """
+    sections, start, end = [], 0, 0
+    for paragraph_end in [i for i, c in enumerate(text) if c == "\n"] + [len(text)]:
+        if end > start and paragraph_end - start > max_chars:
+            sections.append((start, text[start:end]))
+            start = end + 1
+        while paragraph_end - start > max_chars:
+            sections.append((start, text[start:start + max_chars]))
+            start += max_chars
+        end = paragraph_end
+    if end > start or not sections:
+        sections.append((start, text[start:end]))
+    return sections
+
+
+async def page_groups(data: bytes, file_extension: str, run_cpu, largest: int = 32,
+                      section_chars: int = 4000) -> AsyncIterator[List[tuple]]:
+    """
+    Yield a document's pages as groups of (page number, start offset, text), extracted on `run_cpu`.
+
+    Offsets are positions in the document text `/upload` would return.
+
+    PDF page ranges come from `page_batches`, and the next range is extracted
+    while the caller scores the current one. DOCX and text files have no pages,
+    so they are split into sections of whole paragraphs.
+    """
+    if file_extension != '.pdf':
+        document = await run_cpu(extract_document, data, file_extension)
+        sections = split_sections(document.text, section_chars)
+        for first in range(0, len(sections), largest):
+            yield [(first + i + 1, start, text) for i, (start, text) in enumerate(sections[first:first + largest])]
+        return
+
+    ranges = page_batches(await run_cpu(pdf_page_count, data), largest=largest)
+    pending = asyncio.ensure_future(run_cpu(extract_pdf_pages, data, *ranges[0])) if ranges else None
+    offset = 0
+    try:
+        for i, (first, _) in enumerate(ranges):
+            texts = await pending
+            pending = asyncio.ensure_future(run_cpu(extract_pdf_pages, data, *ranges[i + 1])) \
+                if i + 1 < len(ranges) else None
+            group = []
+            for j, text in enumerate(texts):
+                group.append((first + j + 1, offset, text))
+                offset += len(text) + len(PAGE_SEPARATOR)
+            yield group
+    finally:
+        # The client may stop reading mid-document
+        if pending is not None:
+            pending.cancel()
+
+
+class PageAggregator:
+    """
+    Running per-page scores for a streamed document.
+
+    Only a handful of floats per page are kept, never the page text, so memory
+    stays flat as the report grows.
+    """
+
+    def __init__(self):
+        self._chars = []
+        self._climate = []
+        self._esg = []
+
+    def add(self, chars: int, analysis: dict, esg: Dict[str, float]):
+        self._chars.append(chars)
+        self._climate.append([analysis["commitment_probability"], analysis["specificity_probability"]])
+        self._esg.append([esg.get(category, 0.0) for category in ESG_CATEGORIES])
+
+    def result(self, aggregation: str = "weighted") -> Optional[dict]:
+        """Document-level scores, or None when no page had text. `weighted` weights pages by characters."""
+        if not self._chars:
+            return None
+        weights = torch.tensor(self._chars)
+        commitment, specificity = aggregate(torch.tensor(self._climate), weights, aggregation).tolist()
+        esg = aggregate(torch.tensor(self._esg), weights, aggregation).tolist()
+        return {
+            "analysis": build_analysis_result(commitment, specificity),
+            "esg": normalize_esg_scores([
+                {"label": category, "score": score} for category, score in zip(ESG_CATEGORIES, esg)
+            ]),
+            "aggregation": aggregation,
+            "scored_pages": len(self._chars),
+        }
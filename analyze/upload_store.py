@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from analyze.ingest import IngestedUpload, ingest_upload
+from analyze.jobs import job_queue
+from config import UPLOAD_DIR, UPLOAD_STORE_MAX_MB, UPLOAD_STORE_MAX_AGE_DAYS
+
+# Suffix of the extracted-text file kept next to each blob; distinct from any upload extension
+TEXT_SUFFIX = ".extracted.txt"
+
+
+class UploadStore:
+    """
+    Content-addressed store of uploaded files and their extracted text.
+
+    Blobs are stored by `ingest_upload` as `<sha256><extension>` in `directory`,
+    so a duplicate upload is a lookup rather than a second copy, and the text
+    extracted from a blob is cached next to it as `<sha256><extension>.extracted.txt`
+    so a duplicate is not extracted again. Both are keyed by content and
+    extension, since the same bytes uploaded as .txt and as .pdf extract
+    differently. An index in `directory`/index.sqlite3 records each blob's size
+    and last use. `evict()` removes blobs not used for
+    `max_age` seconds, then the least recently used ones until the store fits
+    in `max_bytes`. Blobs whose paths `pinned()` returns, those of queued and
+    running analysis jobs, are never evicted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float,
+                 pinned: Optional[Callable[[], set]] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.pinned = pinned
+
+        self._lock = threading.Lock()
+        self._connection = None
+        self._counters = {"uploads": 0, "duplicates": 0, "bytes_deduplicated": 0,
+                          "text_hits": 0, "text_misses": 0, "evictions": 0, "bytes_evicted": 0,
+                          "pinned_skips": 0}
+
+    @property
+    def _db(self):
+        # Opened on first use so importing the module (e.g. in worker processes) touches no files
+        if self._connection is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._connection = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"),
+                                               check_same_thread=False)
+            self._migrate_sha256_key(self._connection)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "sha256 TEXT, extension TEXT, size INTEGER, text_size INTEGER, "
+                "uploads INTEGER, created REAL, last_access REAL, PRIMARY KEY (sha256, extension))"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access)")
+            self._connection.commit()
+        return self._connection
+
+    def ingest(self, source, file_extension: str, max_size: int) -> Optional[IngestedUpload]:
+        """Store an upload (see `ingest_upload`) and record it in the index. Returns None if it is too large."""
+        os.makedirs(self.directory, exist_ok=True)
+        upload = ingest_upload(source, self.directory, file_extension, max_size)
+        if upload is None:
+            return None
+
+        now = time.time()
+        with self._lock:
+            self._counters["uploads"] += 1
+            if upload.duplicate:
+                self._counters["duplicates"] += 1
+                self._counters["bytes_deduplicated"] += upload.size
+            self._db.execute(
+                "INSERT INTO blobs (sha256, extension, size, text_size, uploads, created, last_access) "
+                "VALUES (?, ?, ?, 0, 1, ?, ?) "
+                "ON CONFLICT(sha256, extension) DO UPDATE SET uploads = uploads + 1, last_access = excluded.last_access",
+                (upload.sha256, file_extension, upload.size, now, now)
+            )
+            self._db.commit()
+
+        if not upload.duplicate:
+            self.evict()
+        return upload
+
+    def text(self, sha256: str, extension: str) -> Optional[str]:
+        """The cached extracted text of a blob, or None if it has not been extracted yet."""
+        try:
+            with open(self._text_path(sha256, extension), "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._counters["text_misses"] += 1
+            return None
+        with self._lock:
+            self._counters["text_hits"] += 1
+        return text
+
+    def put_text(self, sha256: str, extension: str, text: str):
+        path = self._text_path(sha256, extension)
+        temp_path = f"{path}.{os.urandom(8).hex()}.part"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._db.execute("UPDATE blobs SET text_size = ? WHERE sha256 = ? AND extension = ?",
+                             (os.path.getsize(path), sha256, extension))
+            self._db.commit()
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Remove expired blobs, then least recently used ones while over `max_bytes`. Returns how many went."""
+        now = time.time() if now is None else now
+        pinned = {os.path.abspath(path) for path in self.pinned()} if self.pinned is not None else set()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT sha256, extension, size + text_size, last_access FROM blobs ORDER BY last_access"
+            ).fetchall()
+            total = sum(row[2] for row in rows)
+            evicted = []
+            for sha256, extension, size, last_access in rows:
+                if last_access >= now - self.max_age and total <= self.max_bytes:
+                    break
+                if os.path.abspath(os.path.join(self.directory, f"{sha256}{extension}")) in pinned:
+                    self._counters["pinned_skips"] += 1
+                    continue
+                evicted.append((sha256, extension))
+                total -= size
+                self._counters["bytes_evicted"] += size
+            if not evicted:
+                return 0
+
+            for sha256, extension in evicted:
+                for path in (os.path.join(self.directory, f"{sha256}{extension}"), self._text_path(sha256, extension)):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            self._db.executemany("DELETE FROM blobs WHERE sha256 = ? AND extension = ?", evicted)
+            self._db.commit()
+            self._counters["evictions"] += len(evicted)
+        return len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            blobs, size, text_size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(text_size), 0) FROM blobs"
+            ).fetchone()
+            lookups = self._counters["text_hits"] + self._counters["text_misses"]
+            return {
+                **self._counters,
+                "text_hit_rate": self._counters["text_hits"] / lookups if lookups else 0.0,
+                "blobs": blobs,
+                "bytes": size + text_size,
+                "text_bytes": text_size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _text_path(self, sha256: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{sha256}{extension}{TEXT_SUFFIX}")
+
+    def _migrate_sha256_key(self, connection):
+        """Re-key an index from before blobs were keyed by extension, moving cached texts to their new names."""
+        columns = connection.execute("PRAGMA table_info(blobs)").fetchall()
+        if not columns or sum(1 for column in columns if column[5]) != 1:
+            return
+        rows = connection.execute("SELECT sha256, extension FROM blobs").fetchall()
+        connection.execute("ALTER TABLE blobs RENAME TO blobs_sha256")
+        connection.execute(
+            "CREATE TABLE blobs ("
+            "sha256 TEXT, extension TEXT, size INTEGER, text_size INTEGER, "
+            "uploads INTEGER, created REAL, last_access REAL, PRIMARY KEY (sha256, extension))"
+        )
+        connection.execute("INSERT INTO blobs SELECT sha256, extension, size, text_size, uploads, created, "
+                           "last_access FROM blobs_sha256")
+        connection.execute("DROP TABLE blobs_sha256")
+        connection.commit()
+        for sha256, extension in rows:
+            old_path = os.path.join(self.directory, f"{sha256}{TEXT_SUFFIX}")
+            if os.path.exists(old_path):
+                os.replace(old_path, self._text_path(sha256, extension))
+
+
+upload_store = UploadStore(UPLOAD_DIR, max_bytes=int(UPLOAD_STORE_MAX_MB * 1024 * 1024),
+                           max_age=UPLOAD_STORE_MAX_AGE_DAYS * 24 * 3600,
+                           pinned=lambda: job_queue.active_payload_values("path"))
@@ -91,11 +91,15 @@ Your FINAL_ANSWER in JSON (no format errors):
 # ---------- HELPER FUNCTIONS ----------
 
 import sys
-import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+from analyze.extraction import extract_document
+from analyze.chunk_store import chunk_store
 
 def extract_text_from_pdf(file_path):
-    doc = fitz.open(file_path)
-    return "\n".join(page.get_text() for page in doc)
+    with open(file_path, "rb") as f:
+        return extract_document(f.read(), ".pdf").text
 
 if __name__ == "__main__":
     file_path = sys.argv[1]
@@ -105,12 +109,35 @@ if __name__ == "__main__":
 
 
 
-def pull_text_for_analysis(pdf_name: str) -> str:
+def pull_text_for_analysis(pdf_name: str, store=chunk_store, warnings: list = None) -> str:
     """
     Replaces the old createRetriever code.
-    Use Pinecone to pull the doc's full text.
+    Stream the doc's full text, in order, from the local chunk store. A doc
+    not stored yet is extracted once if pdf_name is a local PDF and kept in
+    the store. Otherwise it is pulled from Pinecone, and stored only if the
+    query returned fewer than PINECONE_TOP_K chunks: a full page of matches
+    may be truncated, so that text is used for this audit only and a warning
+    is logged and appended to `warnings`.
     """
-    return pull_text_from_pinecone(pdf_name)
+    key = os.path.basename(pdf_name)
+    if store.has(key):
+        return store.text(key)
+    if os.path.isfile(pdf_name):
+        with open(pdf_name, "rb") as f:
+            document = extract_document(f.read(), ".pdf")
+        store.put_pages(key, [page.text for page in document.pages])
+        return store.text(key)
+
+    chunks = pull_chunks_from_pinecone(pdf_name)
+    if len(chunks) < PINECONE_TOP_K:
+        store.put(key, chunks)
+    else:
+        warning = (f"Pinecone returned {len(chunks)} chunks for {pdf_name}, the query limit; the text may be "
+                   f"truncated and was not stored. Load the PDF with scripts/load_chunks.py.")
+        print(warning)
+        if warnings is not None:
+            warnings.append(warning)
+    return "\n\n".join(text for _, text in chunks)
 
 
 
@@ -186,10 +213,15 @@ def write_to_excel(answers, questions, prompts, report_name, df, model, output_f
 
 from pinecone import Pinecone
 
-def pull_text_from_pinecone(pdf_name: str) -> str:
+# Most chunks one Pinecone query returns; a response this long may be missing chunks
+PINECONE_TOP_K = 100
+
+def pull_chunks_from_pinecone(pdf_name: str) -> list:
     """
-    Query Pinecone for all chunks belonging to pdf_name,
-    then return one big string of text.
+    Query Pinecone for all chunks belonging to pdf_name and return
+    (page_number, text) pairs in page order. The query returns at most
+    PINECONE_TOP_K chunks; pull_text_for_analysis only falls back to it for
+    docs missing from the local chunk store.
     """
     # 1) Initialize Pinecone
     pc = Pinecone(
@@ -203,7 +235,7 @@ def pull_text_from_pinecone(pdf_name: str) -> str:
     dummy_vector = [0.0] * 1536
     query_response = index.query(
         vector=[0.0]*1536,
-        top_k=100,
+        top_k=PINECONE_TOP_K,
         include_metadata=True,
         filter={"pdf_name": pdf_name}
     )
@@ -218,12 +250,19 @@ def pull_text_from_pinecone(pdf_name: str) -> str:
         key=lambda m: m.metadata.get("page_number", 0)
     )
 
-    # 4) Join all chunk texts
+    # 4) Keep the chunk texts with their pages
     # We assume 'text' was the field used at ingestion
-    full_text = "\n\n".join(
-        m.metadata["text"] for m in sorted_matches if "text" in m.metadata
-    )
-    return full_text
+    return [
+        (int(m.metadata.get("page_number", 0)), m.metadata["text"])
+        for m in sorted_matches if "text" in m.metadata
+    ]
+
+def pull_text_from_pinecone(pdf_name: str) -> str:
+    """
+    Query Pinecone for all chunks belonging to pdf_name,
+    then return one big string of text.
+    """
+    return "\n\n".join(text for _, text in pull_chunks_from_pinecone(pdf_name))
 
 def chunk_local_text(
     full_text: str,
@@ -247,15 +286,17 @@ def chunk_local_text(
 # ---------- MAIN ----------
 # ============ <NEW> MAIN FUNCTION: run_engine() ============
 
-async def run_engine(report_path: str, model: str = "gpt-4", num_questions: int = None) -> dict:
+async def run_engine(report_path: str, model: str = "gpt-4", num_questions: int = None,
+                     store=chunk_store) -> dict:
     # 1) Load the questions
     questions_xlsx = "/Users/achalme2/Desktop/reports_rag/app/api/transition-audit/data/Questions.xlsx"
     df = pd.read_excel(questions_xlsx)
     if num_questions:
         df = df.head(num_questions)
 
-    # 2) Pull text from Pinecone, then re-chunk with LlamaIndex
-    full_text = pull_text_from_pinecone(report_path)
+    # 2) Stream text from the local chunk store (Pinecone only for new docs), then re-chunk with LlamaIndex
+    warnings = []
+    full_text = pull_text_for_analysis(report_path, store, warnings)
     retriever = chunk_local_text(full_text, 350, 50, 8)
 
     # 3) Grab basic info + year
@@ -293,6 +334,7 @@ async def run_engine(report_path: str, model: str = "gpt-4", num_questions: int
         "metadata": metadata,
         "excel_path": excel_path,
         "num_questions": len(questions),
+        "warnings": warnings,
     }
 
 
@@ -19,6 +19,99 @@ MAX_TOKENS = 600
 MAX_LENGTH = 512
 MODEL_NAME = "gpt-3.5-turbo"
 
+# Inference precision: "fp32", or "int8" for dynamically quantized models on CPU
+INFERENCE_PRECISION = os.environ.get("INFERENCE_PRECISION", "fp32")
+
+# Inference backend: "torch", or "onnx" to serve graphs exported with scripts/export_onnx.py
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch")
+ONNX_MODEL_DIR = os.environ.get("ONNX_MODEL_DIR", "onnx_models")
+
+# Startup: load models in the background, MODEL_LOAD_WORKERS at a time. With
+# PRELOAD_MODELS=false each model loads on its first request instead.
+PRELOAD_MODELS = os.environ.get("PRELOAD_MODELS", "true").lower() == "true"
+MODEL_LOAD_WORKERS = int(os.environ.get("MODEL_LOAD_WORKERS", 3))
+
+# Number of warm-up forward passes per model at startup
+WARMUP_PASSES = int(os.environ.get("WARMUP_PASSES", 2))
+
+# Inference micro-batching
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 16))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 10))
+BATCH_MAX_PENDING = int(os.environ.get("BATCH_MAX_PENDING", 256))
+
+# Run the commitment and specificity forward passes concurrently
+FUSED_CONCURRENT = os.environ.get("FUSED_CONCURRENT", "true").lower() == "true"
+
+# Long-document mode: overlapping 512-token windows scored in batches
+LONG_DOC_OVERLAP = int(os.environ.get("LONG_DOC_OVERLAP", 128))
+LONG_DOC_BATCH_SIZE = int(os.environ.get("LONG_DOC_BATCH_SIZE", 16))
+
+# Execution layer: thread pool for torch inference, process pool for pure-Python work.
+# EXECUTOR_OVERFLOW is "reject" (429 once EXECUTOR_MAX_QUEUE callers wait) or "queue"
+# (wait up to EXECUTOR_QUEUE_TIMEOUT seconds for a slot).
+EXECUTOR_INFERENCE_WORKERS = int(os.environ.get("EXECUTOR_INFERENCE_WORKERS", 2))
+EXECUTOR_CPU_WORKERS = int(os.environ.get("EXECUTOR_CPU_WORKERS", 2))
+EXECUTOR_MAX_QUEUE = int(os.environ.get("EXECUTOR_MAX_QUEUE", 32))
+EXECUTOR_OVERFLOW = os.environ.get("EXECUTOR_OVERFLOW", "reject")
+EXECUTOR_QUEUE_TIMEOUT = float(os.environ.get("EXECUTOR_QUEUE_TIMEOUT", 30))
+
+# Memory ceiling for the dense block of segment similarities computed at a time in /consistency
+CONSISTENCY_MEMORY_MB = float(os.environ.get("CONSISTENCY_MEMORY_MB", 16))
+# Tokenizer for readability and clarity: "nltk" (punkt + treebank) or the faster "regex"
+# approximation (see scripts/eval_tokenizer.py for its accuracy delta)
+CONSISTENCY_TOKENIZER = os.environ.get("CONSISTENCY_TOKENIZER", "nltk")
+# Language gate: classify up to LANGUAGE_SAMPLES slices of LANGUAGE_SAMPLE_CHARS characters,
+# stopping once the top language reaches LANGUAGE_CONFIDENCE
+LANGUAGE_SAMPLES = int(os.environ.get("LANGUAGE_SAMPLES", 5))
+LANGUAGE_SAMPLE_CHARS = int(os.environ.get("LANGUAGE_SAMPLE_CHARS", 1000))
+LANGUAGE_CONFIDENCE = float(os.environ.get("LANGUAGE_CONFIDENCE", 0.99))
+# Most documents one /consistency/batch request may score
+CONSISTENCY_BATCH_MAX_DOCUMENTS = int(os.environ.get("CONSISTENCY_BATCH_MAX_DOCUMENTS", 500))
+
+# PDFs with at least this many pages are extracted in page ranges across the CPU workers
+EXTRACTION_PARALLEL_MIN_PAGES = int(os.environ.get("EXTRACTION_PARALLEL_MIN_PAGES", 32))
+
+# Analysis result cache: in-memory LRU tier plus an optional SQLite tier (empty path disables it).
+# Bump RESULT_CACHE_VERSION to invalidate every stored result.
+RESULT_CACHE_PATH = os.environ.get("RESULT_CACHE_PATH", "cache/results.sqlite3")
+RESULT_CACHE_MEMORY_MB = float(os.environ.get("RESULT_CACHE_MEMORY_MB", 64))
+RESULT_CACHE_DISK_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_DISK_MAX_ENTRIES", 100000))
+RESULT_CACHE_VERSION = os.environ.get("RESULT_CACHE_VERSION", "1")
+
+# Per-sentence model outputs, so a new year's report only runs the models on sentences not
+# seen before (empty path disables it); least recently used entries beyond the maximum are evicted
+SENTENCE_CACHE_PATH = os.environ.get("SENTENCE_CACHE_PATH", "cache/sentences.sqlite3")
+SENTENCE_CACHE_MAX_ENTRIES = int(os.environ.get("SENTENCE_CACHE_MAX_ENTRIES", 1000000))
+
+# Background analysis jobs: SQLite-backed queue and the number of in-process workers
+# (0 leaves the work to scripts/job_worker.py). Failed jobs are retried with
+# exponential backoff starting at JOB_RETRY_BACKOFF seconds. A running job's lease lasts
+# JOB_LEASE_SECONDS and is renewed while it runs; jobs with an expired lease are run again.
+JOB_QUEUE_PATH = os.environ.get("JOB_QUEUE_PATH", "cache/jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_BACKOFF = float(os.environ.get("JOB_RETRY_BACKOFF", 5))
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", 60))
+
+# Content-addressed upload store: blobs and their extracted text, evicted when unused
+# for UPLOAD_STORE_MAX_AGE_DAYS or, least recently used first, above UPLOAD_STORE_MAX_MB
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "uploads")
+UPLOAD_STORE_MAX_MB = float(os.environ.get("UPLOAD_STORE_MAX_MB", 2048))
+UPLOAD_STORE_MAX_AGE_DAYS = float(os.environ.get("UPLOAD_STORE_MAX_AGE_DAYS", 30))
+
+# Ordered report chunks with page numbers, keyed by pdf_name, for the transition-audit engine
+CHUNK_STORE_PATH = os.environ.get("CHUNK_STORE_PATH", "cache/chunks.sqlite3")
+CHUNK_STORE_CHUNK_CHARS = int(os.environ.get("CHUNK_STORE_CHUNK_CHARS", 2000))
+
+# Extracted document text, so clients can refer to an upload by document_id; least recently
+# used documents are evicted above DOCUMENT_STORE_MAX_MB
+DOCUMENT_STORE_PATH = os.environ.get("DOCUMENT_STORE_PATH", "cache/documents.sqlite3")
+DOCUMENT_STORE_MAX_MB = float(os.environ.get("DOCUMENT_STORE_MAX_MB", 512))
+
+# Response compression: "gzip", "brotli" (needs brotli-asgi, otherwise gzip) or "none"
+RESPONSE_COMPRESSION = os.environ.get("RESPONSE_COMPRESSION", "gzip")
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
 # CORS Settings
 ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -3,22 +3,53 @@
 from fastapi import FastAPI, HTTPException, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.routing import APIRouter
-from analyze.consistency import router as consistency_router
-from typing import Optional
+from analyze.consistency import router as consistency_router, ensure_nltk_data
+from analyze.batching import MicroBatcher
+from analyze.registry import ModelRegistry
+from analyze.long_document import Aggregation, score_long_document, classify_esg_long_document
+from analyze.inference import ESG_CATEGORIES, DEFAULT_SCORE, get_esg_scores, build_analysis_result
+from analyze.fused import FusedClimateScorer
+from analyze.executor import execution, Overloaded
+from analyze.extraction import extract_document_async
+from analyze.upload_store import upload_store
+from analyze.result_cache import result_cache
+from analyze.jobs import JobWorkers, TERMINAL, job_queue
+from analyze.startup import Startup
+from analyze.compression import CompressionMiddleware
+from analyze.document_store import document_store, resolve_text
+from analyze.language import language_gate
+from analyze.cheap_talk import scanner as cheap_talk_scanner
+from analyze.cascade import score_cascade, score_esg_sentences, without_run_measurements
+from analyze.sentence_cache import sentence_cache
+from analyze.streaming import MEDIA_TYPES, PageAggregator, StreamFormat, encode_record, page_groups
+from config import (
+    BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_MAX_PENDING, WARMUP_PASSES, LONG_DOC_OVERLAP,
+    LONG_DOC_BATCH_SIZE, FUSED_CONCURRENT, EXECUTOR_INFERENCE_WORKERS, EXECUTOR_CPU_WORKERS, INFERENCE_PRECISION,
+    INFERENCE_BACKEND, ONNX_MODEL_DIR, PRELOAD_MODELS, MODEL_LOAD_WORKERS, JOB_WORKERS,
+    RESPONSE_COMPRESSION, COMPRESSION_MIN_SIZE
+)
+from typing import List, Literal, Optional
 import os
-import shutil
+import asyncio
+import threading
+import time
 from pydantic import BaseModel, ValidationError
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
+from starlette.concurrency import run_in_threadpool
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
-import langid
-import math
 import openai
 from openai import AsyncOpenAI
 import json
 
-app = FastAPI(title="Combined API Service")
+# orjson encodes responses several times faster than the standard library when installed
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
+app = FastAPI(title="Combined API Service", default_response_class=DefaultResponse)
 
 # Custom exception handlers
 @app.exception_handler(HTTPException)
@@ -43,6 +74,18 @@ async def validation_exception_handler(request, exc):
         }
     )
 
+@app.exception_handler(Overloaded)
+async def overloaded_exception_handler(request, exc):
+    return JSONResponse(
+        status_code=429,
+        content={
+            "message": str(exc),
+            "code": "OVERLOADED",
+            "status": "error"
+        },
+        headers={"Retry-After": "1"}
+    )
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     return JSONResponse(
@@ -64,70 +107,158 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compress large responses; streamed responses are left alone so records arrive as they are sent
+app.add_middleware(
+    CompressionMiddleware,
+    compression=RESPONSE_COMPRESSION,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    streaming_paths=("/stream", "/events", "/chat"),
+)
+
 # Include the consistency router
 app.include_router(consistency_router, prefix="/consistency", tags=["consistency"])
 
-# Load models at startup
-print("Loading models...")
 # ClimateBERT models for commitment and specificity
 device = "cuda" if torch.cuda.is_available() else "cpu"
 print(f"Device set to use {device}")
 
-commitment_model = AutoModelForSequenceClassification.from_pretrained(
-    "climatebert/distilroberta-base-climate-commitment"
-).to(device)
-specificity_model = AutoModelForSequenceClassification.from_pretrained(
-    "climatebert/distilroberta-base-climate-specificity"
-).to(device)
-
-commitment_tokenizer = AutoTokenizer.from_pretrained(
-    "climatebert/distilroberta-base-climate-commitment"
+# INFERENCE_PRECISION=int8 serves dynamically quantized models on CPU nodes;
+# INFERENCE_BACKEND=onnx serves the graphs written by scripts/export_onnx.py
+registry = ModelRegistry(device, precision=INFERENCE_PRECISION, backend=INFERENCE_BACKEND,
+                         onnx_model_dir=ONNX_MODEL_DIR)
+registry.register("commitment", "climatebert/distilroberta-base-climate-commitment")
+registry.register("specificity", "climatebert/distilroberta-base-climate-specificity")
+# FinBERT ESG model, served through a pipeline built once at startup
+model_name = "yiyanghkust/finbert-esg-9-categories"
+registry.register("esg", model_name, pipeline_task="text-classification")
+
+# Commitment and specificity share one tokenization pass and run side by side
+fused_scorer = None
+fused_scorer_lock = threading.Lock()
+
+# Background initialization; / and /ready answer while it runs
+app_startup = Startup()
+
+def get_fused_scorer():
+    """The fused ClimateBERT scorer, built (loading its models if needed) on first use."""
+    global fused_scorer
+    with fused_scorer_lock:
+        if fused_scorer is None:
+            commitment = registry.get("commitment")
+            specificity = registry.get("specificity")
+            fused_scorer = FusedClimateScorer(
+                commitment.model, specificity.model, commitment.tokenizer, specificity.tokenizer,
+                device, concurrent=FUSED_CONCURRENT
+            )
+        return fused_scorer
+
+def load_models():
+    """
+    Load, warm up and wire the models and tokenizer data.
+
+    This runs in a background thread started by the startup hook rather than at
+    import: the CPU process pool spawns workers that re-import this module, and
+    they must not load the models. Requests that arrive first load what they
+    need on demand.
+    """
+    with app_startup.component("nltk"):
+        ensure_nltk_data()
+    if not PRELOAD_MODELS:
+        return
+    with app_startup.component("models"):
+        registry.load_all(workers=MODEL_LOAD_WORKERS)
+    with app_startup.component("warmup"):
+        registry.warmup(WARMUP_PASSES)
+    with app_startup.component("fused_scorer"):
+        get_fused_scorer()
+    print("Models loaded.")
+
+@app.on_event("startup")
+async def startup():
+    app_startup.start(load_models)
+    if job_workers.workers > 0:
+        job_workers.start()
+
+def score_climate_batch(texts):
+    return get_fused_scorer().score(texts)
+
+def score_esg_batch(texts):
+    return get_esg_scores(registry.get("esg").classifier, texts)
+
+# Micro-batchers: concurrent requests for the same model share one forward pass
+climate_batcher = MicroBatcher(
+    "climatebert",
+    score_climate_batch,
+    max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS,
+    pool=execution.inference, max_pending=BATCH_MAX_PENDING,
+    max_in_flight=EXECUTOR_INFERENCE_WORKERS
 )
-specificity_tokenizer = AutoTokenizer.from_pretrained(
-    "climatebert/distilroberta-base-climate-specificity"
+esg_batcher = MicroBatcher(
+    "esg",
+    score_esg_batch,
+    max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS,
+    pool=execution.inference, max_pending=BATCH_MAX_PENDING,
+    max_in_flight=EXECUTOR_INFERENCE_WORKERS
 )
 
-# FinBERT ESG model
-model_name = "yiyanghkust/finbert-esg-9-categories"
-esg_tokenizer = AutoTokenizer.from_pretrained(model_name)
-esg_model = AutoModelForSequenceClassification.from_pretrained(model_name).to(device)
-print("Models loaded.")
-
 # Initialize OpenAI client
 client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
-def is_english(text: str) -> bool:
-    lang, _ = langid.classify(text)
-    return lang == "en"
-
-def get_score(model, tokenizer, text: str) -> float:
+async def get_batched_analysis(text: str) -> dict:
     try:
-        # Move model to device
-        model.to(device)
-        
-        # Tokenize with truncation
-        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-        inputs = {k: v.to(device) for k, v in inputs.items()}
-        
-        # Get predictions
-        with torch.no_grad():
-            outputs = model(**inputs)
-            logits = outputs.logits if hasattr(outputs, 'logits') else outputs[0]
-            probs = torch.nn.functional.softmax(logits, dim=-1)
-            score = float(probs[0, 1].item())  # Get probability of positive class
-            
-            # Ensure score is a valid float between 0 and 1
-            if not isinstance(score, float) or math.isnan(score):
-                print(f"Invalid score generated: {score}")
-                return 0.951066792011261  # Return default score instead of 0
-            return max(0.0, min(1.0, score))
-            
+        return await climate_batcher.submit(text)
+    except Overloaded:
+        raise
     except Exception as e:
-        print(f"Error in get_score: {str(e)}")
-        return 0.951066792011261  # Return default score instead of raising error
+        print(f"Error in get_batched_analysis: {str(e)}")
+        # Return default scores instead of raising error
+        return build_analysis_result(DEFAULT_SCORE, DEFAULT_SCORE)
+
+def run_long_document_analysis(text: str, aggregation: str = "mean", include_windows: bool = False,
+                               models=("commitment", "specificity", "esg")) -> dict:
+    """Score every overlapping 512-token window of the text instead of only the first one."""
+    window_args = {"overlap": LONG_DOC_OVERLAP, "batch_size": LONG_DOC_BATCH_SIZE}
+    results = {}
+    for name in ("commitment", "specificity"):
+        if name in models:
+            handle = registry.get(name)
+            results[name] = score_long_document(
+                handle.model, handle.tokenizer, text, device, aggregation, include_windows, **window_args)
+    if "esg" in models:
+        handle = registry.get("esg")
+        results["esg"] = classify_esg_long_document(
+            handle.model, handle.tokenizer, text, device, aggregation, include_windows, **window_args)
+    return results
+
+def run_esg_sentence_analysis(text: str, aggregation: str = "mean", include_sentences: bool = False) -> dict:
+    """ESG scores combined over the text's sentences, only the ones not seen before going through the model."""
+    return score_esg_sentences(score_esg_batch, text, aggregation, LONG_DOC_BATCH_SIZE, include_sentences,
+                               cache=sentence_cache, model=registry.model_id("esg"))
+
+async def analyze_document(text: str, long_document: bool = False, aggregation: str = "mean",
+                           include_windows: bool = False, score_climate=get_batched_analysis):
+    """Analysis, ESG scores and (in long-document mode) the per-model window details for a document's text."""
+    if long_document:
+        # Score the whole report window by window
+        long_doc = await execution.run_inference(
+            run_long_document_analysis, text, aggregation, include_windows)
+        analysis_result = build_analysis_result(
+            long_doc["commitment"]["score"], long_doc["specificity"]["score"])
+        return analysis_result, long_doc["esg"]["scores"], long_doc
+
+    # Get the four-probability analysis and ESG scores in one round of batches
+    analysis_result, esg_scores = await asyncio.gather(score_climate(text), esg_batcher.submit(text))
+    return analysis_result, esg_scores, None
 
 class ESGInput(BaseModel):
-    text: str
+    text: Optional[str] = None
+    document_id: Optional[str] = None
+    long_document: bool = False
+    aggregation: Aggregation = "mean"
+    include_windows: bool = False
+    # "sentences" scores every sentence (through the sentence cache) and combines them;
+    # include_windows then returns the per-sentence scores
+    mode: Literal["model", "sentences"] = "model"
 
 class UploadResponse(BaseModel):
     status: str
@@ -135,47 +266,44 @@ class UploadResponse(BaseModel):
     filename: str
     original_name: str
     size: int
-    text: str
+    sha256: Optional[str] = None
+    document_id: Optional[str] = None
+    text: Optional[str] = None
     analysis: dict
     esg: dict
-
-# ESG categories
-ESG_CATEGORIES = [
-    'Business Ethics & Values', 'Climate Change', 'Community Relations',
-    'Corporate Governance', 'Human Capital', 'Natural Capital', 'Non-ESG',
-    'Pollution & Waste', 'Product Liability'
-]
+    long_document: Optional[dict] = None
 
 @app.post("/esg")
 async def analyze_esg(input: ESGInput):
+    text = await run_in_threadpool(resolve_text, input.text, input.document_id)
     try:
-        if not input.text.strip():
+        if not text.strip():
             raise HTTPException(status_code=400, detail="No text provided")
             
-        # Initialize classifier with top_k=None to get scores for all categories
-        classifier = pipeline("text-classification", model=esg_model, tokenizer=esg_tokenizer, device=device, top_k=None)
-        
-        # Process text with truncation
-        results = classifier(input.text, truncation=True, max_length=512)
-        
-        # Convert to category-score pairs and ensure they are valid floats
-        scores = {}
-        for pred in results[0]:
-            score = float(pred['score'])
-            if not (isinstance(score, float) and score >= 0 and score <= 1):
-                score = 0.0
-            scores[pred['label']] = score
-            
-        # Ensure all categories have a score
-        for category in ESG_CATEGORIES:
-            if category not in scores:
-                scores[category] = 0.0
-                
-        # Normalize scores to ensure they sum to 1
-        total = sum(scores.values())
-        if total > 0:  # Prevent division by zero
-            scores = {k: float(v/total) for k, v in scores.items()}
-        
+        cache_key = await run_in_threadpool(
+            result_cache.key, "esg", text, registry.model_id("esg"),
+            input.long_document, input.aggregation, input.include_windows,
+            *((input.mode,) if input.mode == "sentences" else ())
+        )
+        cached = await run_in_threadpool(result_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+        if input.mode == "sentences":
+            # Scores combined over every sentence, each scored once across all documents
+            by_sentence = await execution.run_inference(
+                run_esg_sentence_analysis, text, input.aggregation, input.include_windows)
+            scores = by_sentence["scores"]
+        elif input.long_document:
+            # Scores combined over every window of the document
+            long_doc = await execution.run_inference(
+                run_long_document_analysis, text, input.aggregation, input.include_windows,
+                models=("esg",))
+            scores = long_doc["esg"]["scores"]
+        else:
+            # Scores for all categories, batched with concurrent requests
+            scores = await esg_batcher.submit(text)
+
         # Format scores as percentages
         formatted_scores = {}
         for category in ESG_CATEGORIES:
@@ -183,8 +311,18 @@ async def analyze_esg(input: ESGInput):
             formatted_scores[category] = max(0.0, min(1.0, float(score)))
             
         print(f"ESG Analysis completed successfully: {formatted_scores}")
-        return formatted_scores
-        
+        result = formatted_scores
+        if input.mode == "sentences":
+            result = {"esg": formatted_scores, "sentences": by_sentence["sentences"]}
+        elif input.long_document:
+            # Window statistics (and per-window scores on request) alongside the document scores
+            result = {"esg": formatted_scores, "long_document": long_doc}
+        # Timings describe this run, not the text, so they are not cached
+        await run_in_threadpool(result_cache.set, cache_key, without_run_measurements(result))
+        return result
+
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"ESG Analysis Error: {str(e)}")
         # Return default scores instead of error
@@ -208,13 +346,10 @@ async def upload_to_pinecone(input: PineconeInput):
 
 # Main analysis endpoints
 @app.post("/upload", response_model=UploadResponse)
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), long_document: bool = False,
+                      aggregation: Aggregation = "mean", include_windows: bool = False,
+                      include_text: bool = True):
     try:
-        # Ensure uploads directory exists with proper permissions
-        upload_dir = "uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        os.chmod(upload_dir, 0o777)
-
         # Validate file
         if not file:
             return JSONResponse(
@@ -226,23 +361,6 @@ async def upload_file(file: UploadFile = File(...)):
                 }
             )
 
-        # Validate file size (10MB limit)
-        max_size = 10 * 1024 * 1024  # 10MB
-        file_size = 0
-        chunk_size = 1024
-        while chunk := await file.read(chunk_size):
-            file_size += len(chunk)
-            if file_size > max_size:
-                return JSONResponse(
-                    status_code=400,
-                    content={
-                        "status": "error",
-                        "message": "File size exceeds 10MB limit",
-                        "code": "FILE_TOO_LARGE"
-                    }
-                )
-        await file.seek(0)
-
         # Validate file type
         allowed_extensions = {'.txt', '.pdf', '.doc', '.docx'}
         file_extension = os.path.splitext(file.filename)[1].lower()
@@ -256,29 +374,32 @@ async def upload_file(file: UploadFile = File(...)):
                 }
             )
 
-        # Generate unique filename
-        unique_filename = f"{os.urandom(8).hex()}{file_extension}"
-        file_path = os.path.join(upload_dir, unique_filename)
-
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Stream the upload once: size check (10MB limit), hash and save in a worker thread.
+        # A duplicate of a stored upload is not written again.
+        max_size = 10 * 1024 * 1024  # 10MB
+        upload = await run_in_threadpool(upload_store.ingest, file.file, file_extension, max_size)
+        if upload is None:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "status": "error",
+                    "message": "File size exceeds 10MB limit",
+                    "code": "FILE_TOO_LARGE"
+                }
+            )
 
-        # Extract text from the file
-        text = ""
+        # Extract text from the file in the CPU worker pool, unless this content was extracted before
         try:
-            if file_extension == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-            elif file_extension == '.pdf':
-                import PyPDF2
-                with open(file_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    text = "\n".join(page.extract_text() for page in pdf_reader.pages)
-            elif file_extension in ['.doc', '.docx']:
-                import docx
-                doc = docx.Document(file_path)
-                text = "\n".join(paragraph.text for paragraph in doc.paragraphs)
+            text = await run_in_threadpool(upload_store.text, upload.sha256, file_extension)
+            if text is None:
+                document = await extract_document_async(
+                    upload.data, file_extension, execution.run_cpu, EXECUTOR_CPU_WORKERS)
+                text = document.text
+                await run_in_threadpool(upload_store.put_text, upload.sha256, file_extension, text)
+            # Keep the text server-side; later requests can send document_id instead
+            document_id = await run_in_threadpool(document_store.put, text, file.filename, upload.sha256)
+        except Overloaded:
+            raise
         except Exception as e:
             return JSONResponse(
                 status_code=500,
@@ -290,45 +411,12 @@ async def upload_file(file: UploadFile = File(...)):
             )
 
         # Perform analysis immediately after text extraction
+        long_doc = None
         try:
-            # Get commitment and specificity scores
-            commitment_score = get_score(commitment_model, commitment_tokenizer, text)
-            specificity_score = get_score(specificity_model, specificity_tokenizer, text)
-            
-            # Calculate derived scores
-            cheap_talk_score = commitment_score * (1 - specificity_score)
-            safe_talk_score = (1 - commitment_score) * specificity_score
-
-            # Format analysis results
-            analysis_result = {
-                "commitment_probability": commitment_score,
-                "specificity_probability": specificity_score,
-                "cheap_talk_probability": cheap_talk_score,
-                "safe_talk_probability": safe_talk_score
-            }
-
-            # Get ESG scores
-            classifier = pipeline("text-classification", model=esg_model, tokenizer=esg_tokenizer, device=device, top_k=None)
-            esg_results = classifier(text, truncation=True, max_length=512)
-            
-            # Process ESG scores
-            esg_scores = {}
-            for pred in esg_results[0]:
-                score = float(pred['score'])
-                if not (isinstance(score, float) and score >= 0 and score <= 1):
-                    score = 0.0
-                esg_scores[pred['label']] = score
-                
-            # Ensure all ESG categories have a score
-            for category in ESG_CATEGORIES:
-                if category not in esg_scores:
-                    esg_scores[category] = 0.0
-                    
-            # Normalize ESG scores
-            total = sum(esg_scores.values())
-            if total > 0:
-                esg_scores = {k: float(v/total) for k, v in esg_scores.items()}
-
+            analysis_result, esg_scores, long_doc = await analyze_document(
+                text, long_document, aggregation, include_windows)
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"Analysis Error during upload: {str(e)}")
             analysis_result = {
@@ -342,14 +430,19 @@ async def upload_file(file: UploadFile = File(...)):
         return {
             "status": "success",
             "message": "File uploaded and analyzed successfully",
-            "filename": unique_filename,
+            "filename": os.path.basename(upload.path),
             "original_name": file.filename,
-            "size": file_size,
-            "text": text,
+            "size": upload.size,
+            "sha256": upload.sha256,
+            "document_id": document_id,
+            "text": text if include_text else None,
             "analysis": analysis_result,
-            "esg": esg_scores
+            "esg": esg_scores,
+            "long_document": long_doc
         }
 
+    except Overloaded:
+        raise
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -360,77 +453,273 @@ async def upload_file(file: UploadFile = File(...)):
             }
         )
 
-class AnalyzeInput(BaseModel):
-    text: str
+@app.post("/upload/stream")
+async def upload_file_stream(file: UploadFile = File(...), aggregation: Aggregation = "weighted",
+                             format: StreamFormat = "ndjson"):
+    """
+    Extract and score an upload page by page, streaming results as they are ready.
+
+    Sends one "page" record per PDF page (per section of paragraphs for DOCX and
+    text files) with its offsets, analysis and ESG scores, then a "summary"
+    record aggregating the pages. Failures after streaming starts arrive as an
+    "error" record. The page text itself is not sent back.
+    """
+    allowed_extensions = {'.txt', '.pdf', '.doc', '.docx'}
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    if file_extension not in allowed_extensions:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}",
+                "code": "INVALID_FILE_TYPE"
+            }
+        )
+
+    max_size = 10 * 1024 * 1024  # 10MB
+    upload = await run_in_threadpool(upload_store.ingest, file.file, file_extension, max_size)
+    if upload is None:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": "File size exceeds 10MB limit",
+                "code": "FILE_TOO_LARGE"
+            }
+        )
+
+    async def records():
+        aggregator = PageAggregator()
+        pages = 0
+        try:
+            async for group in page_groups(upload.data, file_extension, execution.run_cpu):
+                # Every page of a group goes to the micro-batchers at once
+                scored = [(number, start, text) for number, start, text in group if text.strip()]
+                results = await asyncio.gather(*(
+                    asyncio.gather(climate_batcher.submit(text), esg_batcher.submit(text))
+                    for _, _, text in scored
+                ))
+                scores = {number: result for (number, _, _), result in zip(scored, results)}
+
+                for number, start, text in group:
+                    pages += 1
+                    record = {"type": "page", "page": number, "start": start, "end": start + len(text),
+                              "chars": len(text), "analysis": None, "esg": None}
+                    if number in scores:
+                        record["analysis"], record["esg"] = scores[number]
+                        aggregator.add(len(text), *scores[number])
+                    yield encode_record(record, format)
+        except Exception as e:
+            print(f"Streaming upload error: {str(e)}")
+            yield encode_record({
+                "type": "error",
+                "message": str(e),
+                "code": "OVERLOADED" if isinstance(e, Overloaded) else "STREAM_FAILED"
+            }, format)
+            return
+
+        summary = aggregator.result(aggregation) or {"analysis": None, "esg": None}
+        yield encode_record({
+            "type": "summary",
+            "filename": os.path.basename(upload.path),
+            "original_name": file.filename,
+            "size": upload.size,
+            "sha256": upload.sha256,
+            "pages": pages,
+            **summary
+        }, format)
+
+    return StreamingResponse(records(), media_type=MEDIA_TYPES[format], headers={"Cache-Control": "no-cache"})
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+async def run_document_job(payload: dict, timings: dict) -> dict:
+    """Job handler: extract and analyze a stored upload, as /upload does, minus the text."""
+    data = await run_in_threadpool(read_file, payload["path"])
+
+    started = time.perf_counter()
+    document = await extract_document_async(
+        data, payload["extension"], execution.run_cpu, EXECUTOR_CPU_WORKERS)
+    timings["extract_ms"] = (time.perf_counter() - started) * 1000.0
+
+    # Errors propagate (no default scores) so the queue retries the job
+    started = time.perf_counter()
+    analysis_result, esg_scores, long_doc = await analyze_document(
+        document.text, payload["long_document"], payload["aggregation"], payload["include_windows"],
+        score_climate=climate_batcher.submit)
+    timings["analysis_ms"] = (time.perf_counter() - started) * 1000.0
 
-# Cheap Talk Analysis patterns
-COMMITMENT_PATTERNS = [
-    r'will|shall|must|commit|pledge|promise|ensure|guarantee|dedicated to|aim to|target|goal|by \d{4}',
-    r'we are committed|we will|we shall|we must|we promise|we guarantee|we ensure'
-]
-
-SPECIFICITY_PATTERNS = [
-    r'\d+%|\d+ percent|\d+ tonnes|\d+MW|\d+ megawatts|\d+ GW|\d+ gigawatts',
-    r'specific|measurable|timebound|quantifiable|detailed|precise|exact|defined',
-    r'by \d{4}|by 20\d{2}|in \d{4}|in 20\d{2}'
-]
-
-def analyze_cheap_talk(text: str) -> dict:
-    import re
-    
-    # Count commitment indicators
-    commitment_count = sum(len(re.findall(pattern, text, re.IGNORECASE)) 
-                         for pattern in COMMITMENT_PATTERNS)
-    
-    # Count specificity indicators
-    specificity_count = sum(len(re.findall(pattern, text, re.IGNORECASE)) 
-                          for pattern in SPECIFICITY_PATTERNS)
-    
-    # Normalize scores using word count
-    word_count = len(text.split())
-    commitment_prob = min(commitment_count / (word_count * 0.05), 1.0)
-    specificity_prob = min(specificity_count / (word_count * 0.05), 1.0)
-    
-    # Calculate cheap talk and safe talk scores
-    cheap_talk_prob = commitment_prob * (1 - specificity_prob)
-    safe_talk_prob = (1 - commitment_prob) * specificity_prob
-    
     return {
-        "commitment_probability": commitment_prob,
-        "specificity_probability": specificity_prob,
-        "cheap_talk_probability": cheap_talk_prob,
-        "safe_talk_probability": safe_talk_prob
+        "filename": os.path.basename(payload["path"]),
+        "original_name": payload["original_name"],
+        "size": payload["size"],
+        "sha256": payload["sha256"],
+        "pages": len(document.pages),
+        "chars": len(document.text),
+        "analysis": analysis_result,
+        "esg": esg_scores,
+        "long_document": long_doc
     }
 
+job_workers = JobWorkers(job_queue, {"document": run_document_job}, workers=JOB_WORKERS)
+
+def job_view(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "created": job["created"],
+        "started": job["started"],
+        "finished": job["finished"],
+        "timings": job["timings"],
+        "result": job["result"],
+        "error": job["error"]
+    }
+
+@app.post("/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...), priority: int = 0, long_document: bool = False,
+                     aggregation: Aggregation = "mean", include_windows: bool = False):
+    """Queue an upload for analysis and return its job id straight away; poll GET /jobs/{id} for the result."""
+    allowed_extensions = {'.txt', '.pdf', '.doc', '.docx'}
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    if file_extension not in allowed_extensions:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}",
+                "code": "INVALID_FILE_TYPE"
+            }
+        )
+
+    max_size = 10 * 1024 * 1024  # 10MB
+    upload = await run_in_threadpool(upload_store.ingest, file.file, file_extension, max_size)
+    if upload is None:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": "File size exceeds 10MB limit",
+                "code": "FILE_TOO_LARGE"
+            }
+        )
+
+    job_id = await run_in_threadpool(job_queue.submit, "document", {
+        "path": upload.path,
+        "extension": file_extension,
+        "original_name": file.filename,
+        "size": upload.size,
+        "sha256": upload.sha256,
+        "long_document": long_document,
+        "aggregation": aggregation,
+        "include_windows": include_windows
+    }, priority)
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events with the job's state each time it changes, ending once it has finished."""
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last = None
+        while True:
+            job = await run_in_threadpool(job_queue.get, job_id)
+            state = (job["status"], job["attempts"])
+            if state != last:
+                last = state
+                yield encode_record({"type": job["status"], **job_view(job)}, "sse")
+            if job["status"] in TERMINAL:
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type=MEDIA_TYPES["sse"], headers={"Cache-Control": "no-cache"})
+
+class AnalyzeInput(BaseModel):
+    text: Optional[str] = None
+    document_id: Optional[str] = None
+    long_document: bool = False
+    aggregation: Aggregation = "mean"
+    include_windows: bool = False
+    # "heuristic" scores with the cheap-talk indicator patterns instead of the models,
+    # for one text or a batch of `texts`, optionally with the span of every hit.
+    # "cascade" runs the models only on the sentences the patterns select (include_windows
+    # returns their scores); `compare` also scores every sentence to measure the difference.
+    mode: Literal["model", "heuristic", "cascade"] = "model"
+    texts: Optional[List[str]] = None
+    include_spans: bool = False
+    compare: bool = False
+
+def run_cascade_analysis(text: str, aggregation: str = "mean", include_sentences: bool = False,
+                         compare: bool = False) -> dict:
+    """Commitment and specificity from the claim-bearing sentences of the text, scored in batches."""
+    model = f"{registry.model_id('commitment')}+{registry.model_id('specificity')}"
+    return score_cascade(get_fused_scorer().score, text, aggregation, LONG_DOC_BATCH_SIZE,
+                         include_sentences, compare, cache=sentence_cache, model=model)
+
+def run_heuristic_analysis(texts: List[str], include_spans: bool) -> List[dict]:
+    return [cheap_talk_scanner.analyze(text, include_spans) for text in texts]
+
 @app.post("/analyze")
 async def analyze_text(input: AnalyzeInput):
+    if input.mode == "heuristic":
+        if input.texts is not None:
+            return {"results": await run_in_threadpool(run_heuristic_analysis, input.texts, input.include_spans)}
+        text = await run_in_threadpool(resolve_text, input.text, input.document_id)
+        return (await run_in_threadpool(run_heuristic_analysis, [text], input.include_spans))[0]
+
+    text = await run_in_threadpool(resolve_text, input.text, input.document_id)
     try:
-        if not input.text:
+        if not text:
             raise HTTPException(status_code=400, detail="No text provided")
 
-        # Move models to device
-        commitment_model.to(device)
-        specificity_model.to(device)
-        
-        # Get commitment and specificity scores
-        commitment_score = get_score(commitment_model, commitment_tokenizer, input.text)
-        specificity_score = get_score(specificity_model, specificity_tokenizer, input.text)
-        
-        # Calculate derived scores
-        cheap_talk_score = commitment_score * (1 - specificity_score)
-        safe_talk_score = (1 - commitment_score) * specificity_score
-
-        # Format analysis results with actual calculated values
-        analysis_result = {
-            "commitment_probability": float(commitment_score),
-            "specificity_probability": float(specificity_score),
-            "cheap_talk_probability": float(cheap_talk_score),
-            "safe_talk_probability": float(safe_talk_score)
-        }
-
-        print(f"Analysis completed successfully: {{'analysis': {analysis_result}}}")
-        return {"analysis": analysis_result}
-
+        cache_key = await run_in_threadpool(
+            result_cache.key, "analyze", text, registry.model_id("commitment"), registry.model_id("specificity"),
+            input.long_document, input.aggregation, input.include_windows,
+            *((input.mode, input.compare) if input.mode == "cascade" else ())
+        )
+        cached = await run_in_threadpool(result_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+        if input.mode == "cascade":
+            result = await execution.run_inference(
+                run_cascade_analysis, text, input.aggregation, input.include_windows, input.compare)
+            print(f"Cascade analysis completed successfully: {{'analysis': {result['analysis']}}}")
+        elif input.long_document:
+            # Score every window of the document and combine the results
+            long_doc = await execution.run_inference(
+                run_long_document_analysis, text, input.aggregation, input.include_windows,
+                models=("commitment", "specificity"))
+            analysis_result = build_analysis_result(long_doc["commitment"]["score"], long_doc["specificity"]["score"])
+            print(f"Long-document analysis completed successfully: {{'analysis': {analysis_result}}}")
+            result = {"analysis": analysis_result, "long_document": long_doc}
+        else:
+            # Commitment, specificity and derived scores from one fused pass; failures fall
+            # through to the default scores below and are never cached
+            analysis_result = await climate_batcher.submit(text)
+            print(f"Analysis completed successfully: {{'analysis': {analysis_result}}}")
+            result = {"analysis": analysis_result}
+
+        # Timings describe this run, not the text, so they are not cached
+        await run_in_threadpool(result_cache.set, cache_key, without_run_measurements(result))
+        return result
+
+    except Overloaded:
+        raise
     except Exception as e:
         import traceback
         print(f"Analysis Error: {str(e)}")
@@ -445,13 +734,66 @@ async def analyze_text(input: AnalyzeInput):
             }
         }
 
+class DocumentInput(BaseModel):
+    text: str
+    name: Optional[str] = None
+
+@app.post("/documents")
+async def store_document(input: DocumentInput):
+    """Store text once and get a document_id to send to the analysis endpoints instead."""
+    document_id = await run_in_threadpool(document_store.put, input.text, input.name)
+    return {"document_id": document_id, "chars": len(input.text)}
+
+@app.get("/documents/{document_id}")
+async def get_document(document_id: str):
+    document = await run_in_threadpool(document_store.get, document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
 @app.get("/")
 async def root():
     return {"message": "API is running"}
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once background startup has loaded everything, 503 until then."""
+    stats = app_startup.stats()
+    return JSONResponse(status_code=200 if stats["ready"] else 503, content=stats)
+
+@app.delete("/cache")
+async def invalidate_cache(namespace: Optional[str] = None, key: Optional[str] = None):
+    """Drop cached analysis results: one key, one namespace (analyze, esg, consistency) or all."""
+    removed = result_cache.invalidate(key=key, namespace=namespace)
+    return {"status": "success", "removed": removed}
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_workers.stop()
+    execution.shutdown()
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "startup": app_startup.stats(),
+        "models": registry.stats(),
+        "executor": execution.stats(),
+        "cache": result_cache.stats(),
+        "jobs": job_queue.stats(),
+        "documents": document_store.stats(),
+        "uploads": upload_store.stats(),
+        "language": language_gate.stats(),
+        "sentence_cache": sentence_cache.stats(),
+        "batching": {
+            batcher.name: batcher.stats()
+            for batcher in (climate_batcher, esg_batcher)
+        }
+    }
+
 class ChatInput(BaseModel):
     messages: list
     docText: str = ""
+    documentId: str = ""
     docName: str = ""
     consistencyResult: dict = None
     analysisResult: dict = None
@@ -475,6 +817,8 @@ async def chat(input: ChatInput):
         system_message = "You are a helpful assistant analyzing sustainability and ESG reports."
         
         # Add document context if available
+        if not input.docText and input.documentId:
+            input.docText = await run_in_threadpool(resolve_text, None, input.documentId)
         if input.docText:
             # Truncate document text if it's too long and split into chunks
             text_chunks = [input.docText[i:i+500] for i in range(0, min(len(input.docText), 2000), 500)]
@@ -547,6 +891,4 @@ async def generate_chunks(response):
 
 if __name__ == "__main__":
     import uvicorn
-    # Create uploads directory if it doesn't exist
-    os.makedirs("uploads", exist_ok=True)
     uvicorn.run(app, host="0.0.0.0", port=5001)
@@ -0,0 +1,185 @@
+"""
+Score every report listed in data/mapping file.csv and write the results to Parquet.
+
+Each worker process loads the models once, extracts a report's PDF, scores the
+whole text window by window (batched inference, as in long-document mode) with
+the commitment, specificity and ESG models, and computes the consistency
+metrics. Results are written in Parquet part files under <output>/parts as
+they complete. A rerun skips every report already in a part file, so an
+interrupted run resumes where it stopped. The finished parts are merged into
+<output>/results.parquet.
+
+usage: python scripts/batch_score.py --pdf-dir DIR [--output DIR] [--workers N]
+                                     [--limit N] [--checkpoint-every N] [--retry-failed]
+"""
+import argparse
+import contextlib
+import glob
+import io
+import multiprocessing
+import os
+import sys
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.consistency import consistency_metrics
+from analyze.extraction import extract_document
+from analyze.inference import ESG_CATEGORIES, build_analysis_result
+from analyze.long_document import classify_esg_long_document, score_long_document
+from analyze.mapping import MAPPING_PATH
+from analyze.registry import ModelRegistry
+from config import (
+    INFERENCE_BACKEND, INFERENCE_PRECISION, LONG_DOC_BATCH_SIZE, LONG_DOC_OVERLAP, ONNX_MODEL_DIR
+)
+
+MAPPING_COLUMNS = ["pdf_name", "ID", "company_name", "year", "Sector", "RQI", "CT"]
+
+# Per-process state, filled by init_worker
+_worker = {}
+
+
+def init_worker(threads: int):
+    """Load and warm up the models once per worker process."""
+    torch.set_num_threads(threads)
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    registry = ModelRegistry(device, precision=INFERENCE_PRECISION, backend=INFERENCE_BACKEND,
+                             onnx_model_dir=ONNX_MODEL_DIR)
+    registry.register("commitment", "climatebert/distilroberta-base-climate-commitment")
+    registry.register("specificity", "climatebert/distilroberta-base-climate-specificity")
+    registry.register("esg", "yiyanghkust/finbert-esg-9-categories")
+    registry.load_all()
+    registry.warmup(1)
+    _worker.update(registry=registry, device=device)
+
+
+def score_report(task) -> dict:
+    """One output row: the mapping columns plus scores, or an error message."""
+    row, path = task
+    record = {**row, "pages": None, "chars": None, "windows": None, "seconds": None, "error": None}
+    started = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            document = extract_document(f.read(), ".pdf")
+        text = document.text
+        registry, device = _worker["registry"], _worker["device"]
+        window_args = {"overlap": LONG_DOC_OVERLAP, "batch_size": LONG_DOC_BATCH_SIZE}
+
+        scores = {}
+        for name in ("commitment", "specificity"):
+            handle = registry.get(name)
+            scores[name] = score_long_document(handle.model, handle.tokenizer, text, device, "weighted",
+                                               **window_args)
+        handle = registry.get("esg")
+        esg = classify_esg_long_document(handle.model, handle.tokenizer, text, device, "weighted", **window_args)
+        # consistency_metrics reports progress with print(); keep the CLI output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            consistency = consistency_metrics([text])
+
+        record.update(
+            pages=len(document.pages),
+            chars=len(text),
+            windows=scores["commitment"]["windows"],
+            **build_analysis_result(scores["commitment"]["score"], scores["specificity"]["score"]),
+            **{f"esg_{category}": esg["scores"].get(category, 0.0) for category in ESG_CATEGORIES},
+            **{key: consistency.get(key) for key in
+               ("consistency_score", "consistency_variability", "readability_score", "clarity_score")},
+            error=consistency.get("error"),
+        )
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = time.perf_counter() - started
+    return record
+
+
+def completed_reports(parts_dir: str, retry_failed: bool = False) -> set:
+    """pdf_name of every report already written to a part file (only successful ones with retry_failed)."""
+    done = set()
+    for path in glob.glob(os.path.join(parts_dir, "part-*.parquet")):
+        table = pq.read_table(path, columns=["pdf_name", "error"]).to_pydict()
+        done.update(name for name, error in zip(table["pdf_name"], table["error"])
+                    if not (retry_failed and error is not None))
+    return done
+
+
+def write_part(parts_dir: str, records: list):
+    """Write a part atomically, so a crash never leaves a half-written checkpoint behind."""
+    path = os.path.join(parts_dir, f"part-{time.time_ns()}.parquet")
+    pd.DataFrame.from_records(records).to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+
+def merge_parts(parts_dir: str, destination: str) -> int:
+    frames = [pd.read_parquet(path) for path in sorted(glob.glob(os.path.join(parts_dir, "part-*.parquet")))]
+    if not frames:
+        return 0
+    merged = pd.concat(frames, ignore_index=True).drop_duplicates("pdf_name", keep="last")
+    merged.to_parquet(destination, index=False)
+    return len(merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf-dir", required=True, help="directory holding the reports named in pdf_name")
+    parser.add_argument("--output", default="batch_results", help="output directory")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--limit", type=int, default=None, help="score at most this many reports")
+    parser.add_argument("--checkpoint-every", type=int, default=25, help="reports per part file")
+    parser.add_argument("--retry-failed", action="store_true", help="score reports that failed last time again")
+    args = parser.parse_args()
+
+    parts_dir = os.path.join(args.output, "parts")
+    os.makedirs(parts_dir, exist_ok=True)
+
+    mapping = pd.read_csv(MAPPING_PATH)[MAPPING_COLUMNS]
+    done = completed_reports(parts_dir, args.retry_failed)
+    tasks, missing = [], 0
+    for row in mapping.to_dict("records"):
+        path = os.path.join(args.pdf_dir, row["pdf_name"])
+        if row["pdf_name"] in done:
+            continue
+        if not os.path.exists(path):
+            missing += 1
+            continue
+        tasks.append((row, path))
+    tasks = tasks[:args.limit] if args.limit is not None else tasks
+    print(f"{len(mapping)} reports in the mapping file: {len(done)} already scored, "
+          f"{missing} missing from {args.pdf_dir}, {len(tasks)} to score with {args.workers} workers")
+
+    if not tasks:
+        return
+
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    started = time.perf_counter()
+    scored = failed = pages = 0
+    buffer = []
+    with multiprocessing.get_context("spawn").Pool(args.workers, initializer=init_worker,
+                                                    initargs=(threads,)) as pool:
+        for record in pool.imap_unordered(score_report, tasks):
+            buffer.append(record)
+            scored += 1
+            failed += record["error"] is not None
+            pages += record["pages"] or 0
+            if len(buffer) >= args.checkpoint_every:
+                write_part(parts_dir, buffer)
+                buffer = []
+            if scored % 10 == 0 or scored == len(tasks):
+                elapsed = time.perf_counter() - started
+                print(f"{scored}/{len(tasks)} reports, {failed} failed, "
+                      f"{scored / elapsed * 3600:.0f} docs/hour, {pages / elapsed:.1f} pages/sec")
+    if buffer:
+        write_part(parts_dir, buffer)
+
+    elapsed = time.perf_counter() - started
+    total = merge_parts(parts_dir, os.path.join(args.output, "results.parquet"))
+    print(f"Scored {scored} reports ({failed} failed) in {elapsed:.0f}s: "
+          f"{scored / elapsed * 3600 if elapsed else 0:.0f} docs/hour. "
+          f"{total} reports in {os.path.join(args.output, 'results.parquet')}")
+
+
+if __name__ == "__main__":
+    main()
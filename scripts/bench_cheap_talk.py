@@ -0,0 +1,55 @@
+"""
+Compare cheap-talk scoring with one IGNORECASE re.findall per pattern against CheapTalkScanner.
+
+Reports milliseconds per page (3000 characters) for the old per-pattern scoring,
+the scanner, and the scanner with spans, and checks the counts agree.
+
+usage: python scripts/bench_cheap_talk.py [report.pdf|report.txt] [repeats]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.cheap_talk import COMMITMENT_PATTERNS, SPECIFICITY_PATTERNS, scanner
+from analyze.extraction import extract_text_from_file
+
+PAGE_CHARS = 3000
+SAMPLE = ("We are committed to reducing our Scope 1 and 2 emissions by 45% by 2030 "
+          "against a 2019 baseline, and we will report progress annually. Our operations "
+          "span twelve countries and our people remain our most important asset. ") * 200
+
+
+def findall_counts(text: str) -> tuple:
+    return (sum(len(re.findall(pattern, text, re.IGNORECASE)) for pattern in COMMITMENT_PATTERNS),
+            sum(len(re.findall(pattern, text, re.IGNORECASE)) for pattern in SPECIFICITY_PATTERNS))
+
+
+def per_page(score, pages, repeats: int) -> float:
+    """Mean milliseconds per page."""
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for page in pages:
+            score(page)
+    return (time.perf_counter() - started) * 1000.0 / (repeats * len(pages))
+
+
+def main():
+    text = extract_text_from_file(sys.argv[1], os.path.splitext(sys.argv[1])[1].lower()) if len(sys.argv) > 1 else SAMPLE
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    pages = [text[start:start + PAGE_CHARS] for start in range(0, len(text), PAGE_CHARS)]
+
+    for page in pages:
+        counts = scanner.analyze(page)["counts"]
+        assert (counts["commitment"], counts["specificity"]) == findall_counts(page)
+
+    print(f"{len(pages)} pages of {PAGE_CHARS} characters, ms per page")
+    print(f"  findall per pattern  {per_page(findall_counts, pages, repeats):.3f}")
+    print(f"  scanner              {per_page(scanner.analyze, pages, repeats):.3f}")
+    print(f"  scanner + spans      {per_page(lambda page: scanner.analyze(page, True), pages, repeats):.3f}")
+
+
+if __name__ == "__main__":
+    main()
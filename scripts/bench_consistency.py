@@ -0,0 +1,90 @@
+"""
+Compare the dense and the blocked TF-IDF segment similarity statistics over document length,
+then the per-granularity vectorizers /consistency used to fit with one tokenization for all.
+
+The dense path builds the n x n cosine similarity matrix and copies its lower
+triangle; the blocked path (pairwise_similarity_stats) never holds more than
+the configured ceiling of it. Documents are synthetic, with Zipf-distributed
+words, split into segments of `segment_words` words.
+
+The second table times the segment lengths /consistency uses (500 and 1000
+words and the whole document), each fitted separately vs segment_consistency.
+
+usage: python scripts/bench_consistency.py [segment_words] [max_mb]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.consistency import (
+    compute_tfidf_consistency, pairwise_similarity_stats, segment_consistency, split_into_segments
+)
+
+# The dense matrix plus its lower-triangle copies take ~20 bytes per segment pair
+DENSE_MAX_SEGMENTS = 10000
+VOCABULARY = [f"term{i}" for i in range(20000)]
+
+
+def synthetic_text(words: int, seed: int = 0) -> str:
+    ranks = np.random.default_rng(seed).zipf(1.2, words) % len(VOCABULARY)
+    return " ".join(VOCABULARY[r] for r in ranks)
+
+
+def dense_stats(matrix):
+    similarities = cosine_similarity(matrix)
+    values = similarities[np.tril_indices_from(similarities, k=-1)]
+    return float(np.mean(values)), float(np.std(values))
+
+
+def per_granularity(text: str, segment_lengths: list) -> list:
+    """The previous loop: split and fit a fresh vectorizer for every segment length."""
+    return [compute_tfidf_consistency(split_into_segments(text, length)) for length in segment_lengths]
+
+
+def measure(fn, *args):
+    """Result, seconds and peak traced memory (MB) of one call."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def main():
+    segment_words = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    max_bytes = int(float(sys.argv[2]) * 1024 * 1024) if len(sys.argv) > 2 else 16 * 1024 * 1024
+
+    print(f"{segment_words}-word segments, {max_bytes / 1024 / 1024:.0f} MB ceiling")
+    for words in (50_000, 200_000, 500_000, 1_000_000):
+        matrix = TfidfVectorizer().fit_transform(split_into_segments(synthetic_text(words), segment_words))
+        blocked, blocked_s, blocked_mb = measure(pairwise_similarity_stats, matrix, max_bytes)
+        line = f"{words:>9d} words {matrix.shape[0]:>6d} segments | blocked {blocked_s:7.2f}s {blocked_mb:8.1f} MB"
+        if matrix.shape[0] <= DENSE_MAX_SEGMENTS:
+            dense, dense_s, dense_mb = measure(dense_stats, matrix)
+            assert np.allclose(dense, blocked), (dense, blocked)
+            line += f" | dense {dense_s:7.2f}s {dense_mb:8.1f} MB"
+        else:
+            line += f" | dense skipped (needs ~{matrix.shape[0] ** 2 * 20 / 1e9:.0f} GB)"
+        print(line)
+
+    print("Segment lengths 500, 1000 and the whole document")
+    for words in (50_000, 200_000, 1_000_000):
+        text = synthetic_text(words)
+        lengths = [500, 1000, words]
+        separate, separate_s, _ = measure(per_granularity, text, lengths)
+        single, single_s, _ = measure(segment_consistency, text, lengths)
+        assert all(a == b or np.allclose(list(a.values()), list(b.values())) for a, b in zip(separate, single))
+        print(f"{words:>9d} words | vectorizer per length {separate_s:6.2f}s | one tokenization {single_s:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
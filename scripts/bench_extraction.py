@@ -0,0 +1,66 @@
+"""
+Pages/sec of the old PyPDF2 upload path against the shared extraction engine.
+
+Uses the given PDF, or generates a text-heavy one when no path is passed.
+
+usage: python scripts/bench_extraction.py [pdf_path | pages] [workers]
+"""
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+import PyPDF2
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.extraction import extract_document, pdf_page_count
+
+PARAGRAPH = (
+    "We are committed to reducing our Scope 1 and 2 greenhouse gas emissions by 40% by 2030 "
+    "compared to a 2019 baseline, and we report our progress annually to our stakeholders. "
+) * 6
+
+
+def generate_pdf(pages):
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(54, 54, 558, 738), PARAGRAPH * 4, fontsize=9)
+    return doc.tobytes()
+
+
+def pypdf2_text(data):
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() for page in reader.pages)
+
+
+def pages_per_sec(fn, pages, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return pages / best
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "200"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    if os.path.exists(source):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = generate_pdf(int(source))
+    pages = pdf_page_count(data)
+
+    print(f"{pages} pages, {len(data) / 2**20:.1f} MB, {workers} workers")
+    print(f"PyPDF2 sequential (old /upload) : {pages_per_sec(lambda: pypdf2_text(data), pages):8.1f} pages/sec")
+    print(f"engine sequential               : {pages_per_sec(lambda: extract_document(data, '.pdf'), pages):8.1f} pages/sec")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        extract_document(data, ".pdf", executor=executor, workers=workers, min_parallel_pages=1)  # start workers
+        parallel = pages_per_sec(
+            lambda: extract_document(data, ".pdf", executor=executor, workers=workers, min_parallel_pages=1), pages)
+    print(f"engine page-parallel            : {parallel:8.1f} pages/sec")
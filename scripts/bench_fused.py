@@ -0,0 +1,56 @@
+"""
+Compare separate commitment/specificity scoring against the fused single-tokenization scorer.
+
+usage: python scripts/bench_fused.py [requests] [batch_size]
+"""
+import os
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.fused import FusedClimateScorer
+from analyze.inference import build_analysis_result, get_scores
+from analyze.registry import ModelRegistry, WARMUP_TEXT
+
+
+def time_ms(fn, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) * 1000.0 / repeats
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    texts = [WARMUP_TEXT] * batch_size
+
+    registry = ModelRegistry(device)
+    registry.register("commitment", "climatebert/distilroberta-base-climate-commitment")
+    registry.register("specificity", "climatebert/distilroberta-base-climate-specificity")
+    registry.load_all()
+    registry.warmup()
+    commitment = registry.get("commitment")
+    specificity = registry.get("specificity")
+
+    def separate():
+        c = get_scores(commitment.model, commitment.tokenizer, texts, device)
+        s = get_scores(specificity.model, specificity.tokenizer, texts, device)
+        return [build_analysis_result(a, b) for a, b in zip(c, s)]
+
+    sequential = FusedClimateScorer(commitment.model, specificity.model, commitment.tokenizer,
+                                    specificity.tokenizer, device, concurrent=False)
+    concurrent = FusedClimateScorer(commitment.model, specificity.model, commitment.tokenizer,
+                                    specificity.tokenizer, device, concurrent=True)
+    assert separate() == concurrent.score(texts)
+
+    baseline = time_ms(separate, repeats)
+    print(f"Device: {device}, batch size: {batch_size}, shared tokenizer: {concurrent.shared_tokenizer}")
+    print(f"separate tokenize + 2 passes : {baseline:8.2f} ms")
+    for name, scorer in (("fused sequential", sequential), ("fused concurrent", concurrent)):
+        elapsed = time_ms(lambda: scorer.score(texts), repeats)
+        print(f"{name:29s}: {elapsed:8.2f} ms ({baseline / elapsed:.2f}x)")
@@ -0,0 +1,64 @@
+"""
+Compare the old three-pass upload handling with single-pass ingestion.
+
+The old path read the upload in 1 KB chunks to measure it, copied it to disk with
+shutil.copyfileobj and then re-opened the file for extraction.
+
+usage: python scripts/bench_ingest.py [size_mb] [repeats]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.ingest import ingest_upload
+
+
+def three_pass(source, upload_dir):
+    file_size = 0
+    while chunk := source.read(1024):
+        file_size += len(chunk)
+    source.seek(0)
+    path = os.path.join(upload_dir, f"{os.urandom(8).hex()}.pdf")
+    with open(path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def single_pass(source, upload_dir):
+    return ingest_upload(source, upload_dir, ".pdf", max_size=1 << 40).data
+
+
+def measure(fn, payload, repeats):
+    """Mean milliseconds and peak traced memory (MB) per call, starting from an already spooled upload."""
+    elapsed, peak = 0.0, 0
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as upload_dir:
+            source = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+            source.write(payload)
+            source.seek(0)
+            tracemalloc.start()
+            started = time.perf_counter()
+            fn(source, upload_dir)
+            elapsed += time.perf_counter() - started
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            source.close()
+    return elapsed * 1000.0 / repeats, peak / 2**20
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    payload = os.urandom(int(size_mb * 2**20))
+
+    before_ms, before_mb = measure(three_pass, payload, repeats)
+    after_ms, after_mb = measure(single_pass, payload, repeats)
+    print(f"{size_mb:.0f} MB upload, {repeats} repeats")
+    print(f"three passes, 1 KB reads : {before_ms:8.2f} ms, peak {before_mb:6.1f} MB")
+    print(f"single pass, 1 MB reads  : {after_ms:8.2f} ms, peak {after_mb:6.1f} MB (+ sha256)")
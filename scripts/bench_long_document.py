@@ -0,0 +1,53 @@
+"""
+Measure long-document scoring throughput (tokens/sec) for each classifier.
+
+usage: python scripts/bench_long_document.py <report.pdf|report.txt> [batch_size] [overlap]
+"""
+import os
+import sys
+
+import fitz  # PyMuPDF
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.long_document import window_probabilities
+from analyze.registry import ModelRegistry
+
+MODELS = {
+    "commitment": "climatebert/distilroberta-base-climate-commitment",
+    "specificity": "climatebert/distilroberta-base-climate-specificity",
+    "esg": "yiyanghkust/finbert-esg-9-categories",
+}
+
+
+def read_text(path):
+    if path.lower().endswith(".pdf"):
+        return "\n".join(page.get_text() for page in fitz.open(path))
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/bench_long_document.py <report.pdf|report.txt> [batch_size] [overlap]")
+        sys.exit(1)
+
+    text = read_text(sys.argv[1])
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    overlap = int(sys.argv[3]) if len(sys.argv) > 3 else 128
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    registry = ModelRegistry(device)
+    for name, model_id in MODELS.items():
+        registry.register(name, model_id)
+    registry.load_all()
+    registry.warmup()
+
+    print(f"Device: {device}, characters: {len(text)}, batch size: {batch_size}, overlap: {overlap}")
+    for name in MODELS:
+        handle = registry.get(name)
+        _, _, stats = window_probabilities(handle.model, handle.tokenizer, text, device,
+                                           overlap=overlap, batch_size=batch_size)
+        print(f"{name:12s} windows: {stats['windows']:5d} | tokens: {stats['tokens']:8d} | "
+              f"{stats['seconds']:7.2f} s | {stats['tokens_per_sec']:9.1f} tokens/sec")
@@ -0,0 +1,72 @@
+"""
+Compare request and response payload sizes and serialization time.
+
+A typical upload round trip used to send the extracted text back to the client
+and then post it again to /analyze, /esg and /consistency. This reports the
+bytes on the wire for full text vs a document_id, JSON encoding time with the
+standard library vs orjson, and the size after gzip.
+
+usage: python scripts/bench_payload.py [report.pdf|report.txt] [repeats]
+"""
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.extraction import extract_text_from_file
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SAMPLE = ("We are committed to reducing our Scope 1 and 2 emissions by 45% by 2030 "
+          "against a 2019 baseline, and we will report progress annually. ") * 2000
+
+
+def encode_time(encode, payload, repeats: int) -> float:
+    """Mean milliseconds per call."""
+    started = time.perf_counter()
+    for _ in range(repeats):
+        encode(payload)
+    return (time.perf_counter() - started) * 1000.0 / repeats
+
+
+def main():
+    text = extract_text_from_file(sys.argv[1], os.path.splitext(sys.argv[1])[1].lower()) if len(sys.argv) > 1 else SAMPLE
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    document_id = "0" * 64
+
+    upload = {"name": "report.pdf", "size": len(text), "sha256": document_id, "document_id": document_id,
+              "text": text, "analysis": {"commitment_probability": 0.5}}
+    payloads = {
+        "upload response with text": upload,
+        "upload response without text": {**upload, "text": None},
+        "analyze request with text": {"text": text},
+        "analyze request with document_id": {"document_id": document_id},
+    }
+
+    encoders = {"json": lambda p: json.dumps(p).encode("utf-8")}
+    if orjson is not None:
+        encoders["orjson"] = orjson.dumps
+    print(f"{len(text)} characters of text, {repeats} repeats")
+    for name, payload in payloads.items():
+        raw = encoders["json"](payload)
+        compressed = gzip.compress(raw, compresslevel=9)
+        timings = ", ".join(f"{encoder} {encode_time(encode, payload, repeats):.3f} ms"
+                            for encoder, encode in encoders.items())
+        print(f"{name:34s} {len(raw):>10d} B raw {len(compressed):>9d} B gzip  {timings}")
+
+    # The old flow posted the full text to three endpoints after every upload
+    before = len(encoders["json"](payloads["upload response with text"])) + \
+        3 * len(encoders["json"](payloads["analyze request with text"]))
+    after = len(encoders["json"](payloads["upload response without text"])) + \
+        3 * len(encoders["json"](payloads["analyze request with document_id"]))
+    print(f"Upload plus three analysis requests: {before} B -> {after} B")
+
+
+if __name__ == "__main__":
+    main()
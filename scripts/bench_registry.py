@@ -0,0 +1,60 @@
+"""
+Measure the per-request latency saved by serving the ESG classifier from the model registry.
+
+usage: python scripts/bench_registry.py [requests]
+"""
+import os
+import sys
+import time
+
+import torch
+from transformers import pipeline
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.inference import get_esg_scores, get_scores
+from analyze.registry import ModelRegistry, WARMUP_TEXT
+
+
+def time_ms(fn, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) * 1000.0 / repeats
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    registry = ModelRegistry(device)
+    registry.register("commitment", "climatebert/distilroberta-base-climate-commitment")
+    registry.register("esg", "yiyanghkust/finbert-esg-9-categories", pipeline_task="text-classification")
+    registry.load_all()
+    registry.warmup()
+    commitment = registry.get("commitment")
+    esg = registry.get("esg")
+
+    def esg_per_request_pipeline():
+        classifier = pipeline("text-classification", model=esg.model, tokenizer=esg.tokenizer, device=device, top_k=None)
+        classifier(WARMUP_TEXT, truncation=True, max_length=512)
+
+    def esg_registry():
+        get_esg_scores(esg.classifier, [WARMUP_TEXT])
+
+    def score_with_move():
+        commitment.model.to(device)
+        get_scores(commitment.model, commitment.tokenizer, [WARMUP_TEXT], device)
+
+    def score_registry():
+        get_scores(commitment.model, commitment.tokenizer, [WARMUP_TEXT], device)
+
+    before_esg = time_ms(esg_per_request_pipeline, repeats)
+    after_esg = time_ms(esg_registry, repeats)
+    before_score = time_ms(score_with_move, repeats)
+    after_score = time_ms(score_registry, repeats)
+
+    print(f"Device: {device}, requests: {repeats}")
+    print(f"ESG    per-request pipeline(): {before_esg:8.2f} ms | registry: {after_esg:8.2f} ms | saved: {before_esg - after_esg:8.2f} ms")
+    print(f"Score  per-request model.to(): {before_score:8.2f} ms | registry: {after_score:8.2f} ms | saved: {before_score - after_score:8.2f} ms")
+    print("Startup timings:", registry.stats())
@@ -0,0 +1,104 @@
+"""
+Accuracy-regression harness for INFERENCE_PRECISION=int8.
+
+Scores a fixed corpus (the company descriptions in data/mapping file.csv) with
+fp32 and dynamically quantized int8 models on CPU and reports latency, model
+size, process memory and the max/mean drift of every score.
+
+usage: python scripts/eval_quantization.py [documents] [batch_size]
+"""
+import csv
+import os
+import resource
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.inference import ESG_CATEGORIES, get_esg_scores, get_scores
+from analyze.registry import ModelRegistry
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "mapping file.csv")
+MODELS = {
+    "commitment": ("climatebert/distilroberta-base-climate-commitment", None),
+    "specificity": ("climatebert/distilroberta-base-climate-specificity", None),
+    "esg": ("yiyanghkust/finbert-esg-9-categories", "text-classification"),
+}
+
+
+def load_corpus(limit):
+    texts = []
+    with open(CORPUS_PATH, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            text = (row.get("Description") or "").strip()
+            if text and text not in texts:
+                texts.append(text)
+            if len(texts) == limit:
+                break
+    return texts
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def score_all(registry, texts, batch_size):
+    """Scores per model (a flat list per text) and the total seconds spent per model."""
+    scores, seconds = {}, {}
+    for name in MODELS:
+        handle = registry.get(name)
+        scores[name], started = [], time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            if handle.classifier is not None:
+                rows = get_esg_scores(handle.classifier, batch)
+                scores[name].extend([row[c] for c in ESG_CATEGORIES] for row in rows)
+            else:
+                scores[name].extend([s] for s in get_scores(handle.model, handle.tokenizer, batch, "cpu"))
+        seconds[name] = time.perf_counter() - started
+    return scores, seconds
+
+
+def build(precision):
+    registry = ModelRegistry("cpu", precision=precision)
+    for name, (model_id, task) in MODELS.items():
+        registry.register(name, model_id, pipeline_task=task)
+    registry.load_all()
+    registry.warmup()
+    return registry
+
+
+if __name__ == "__main__":
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    torch.manual_seed(0)
+    texts = load_corpus(documents)
+    print(f"Corpus: {len(texts)} descriptions, batch size {batch_size}, {torch.get_num_threads()} threads")
+
+    results = {}
+    for precision in ("fp32", "int8"):
+        registry = build(precision)
+        scores, seconds = score_all(registry, texts, batch_size)
+        results[precision] = (scores, seconds, registry.stats()["models"], peak_rss_mb())
+        del registry
+
+    fp32_scores, fp32_seconds, fp32_stats, fp32_rss = results["fp32"]
+    int8_scores, int8_seconds, int8_stats, int8_rss = results["int8"]
+    print(f"{'model':12s} {'fp32 ms/doc':>12s} {'int8 ms/doc':>12s} {'speedup':>8s} "
+          f"{'fp32 MB':>8s} {'int8 MB':>8s} {'max drift':>10s} {'mean drift':>10s} {'top-1 agree':>11s}")
+    for name in MODELS:
+        before = torch.tensor(fp32_scores[name])
+        after = torch.tensor(int8_scores[name])
+        drift = (after - before).abs()
+        if before.shape[1] == 1:
+            agreement = ((before > 0.5) == (after > 0.5)).float().mean().item()
+        else:
+            agreement = (before.argmax(dim=1) == after.argmax(dim=1)).float().mean().item()
+        print(f"{name:12s} {fp32_seconds[name] * 1000 / len(texts):12.2f} {int8_seconds[name] * 1000 / len(texts):12.2f} "
+              f"{fp32_seconds[name] / int8_seconds[name]:7.2f}x "
+              f"{fp32_stats[name]['size_bytes'] / 2**20:8.1f} {int8_stats[name]['size_bytes'] / 2**20:8.1f} "
+              f"{drift.max().item():10.4f} {drift.mean().item():10.4f} {agreement:11.1%}")
+    # ru_maxrss only grows, so the int8 figure is the peak across both runs
+    print(f"Peak RSS after fp32: {fp32_rss:.0f} MB, after int8: {int8_rss:.0f} MB")
@@ -0,0 +1,108 @@
+"""
+Accuracy and speed of the regex tokenizer against NLTK for the consistency metrics.
+
+Tokenizes a corpus (the company descriptions in data/mapping file.csv, or the
+given text files) with both tokenizers and reports the word-token F1, the
+sentence-count difference and the readability and clarity score drift, then
+times the previous metric code (sent_tokenize, word_tokenize, textstat on the
+whole text) against the shared preprocessing pass.
+
+Without NLTK's punkt data the NLTK side can only tokenize words, so sentences
+come from the regex splitter on both sides and the old pipeline is not timed.
+
+usage: python scripts/eval_tokenizer.py [text files...]
+"""
+import collections
+import csv
+import math
+import os
+import sys
+import time
+
+import nltk
+import textstat
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.preprocessing import alpha_words, preprocess_document, split_sentences
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "mapping file.csv")
+
+
+def load_corpus(paths):
+    if paths:
+        texts = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                texts.append(f.read())
+        return texts
+    with open(CORPUS_PATH, newline="", encoding="utf-8") as f:
+        descriptions = ((row.get("Description") or "").strip() for row in csv.DictReader(f))
+        return [text for text in dict.fromkeys(descriptions) if text]
+
+
+def token_f1(expected, actual) -> float:
+    overlap = sum((collections.Counter(expected) & collections.Counter(actual)).values())
+    if not expected or not actual:
+        return float(expected == actual)
+    precision, recall = overlap / len(actual), overlap / len(expected)
+    return 2 * precision * recall / (precision + recall) if overlap else 0.0
+
+
+def clarity(words) -> float:
+    return min(1.0, len(set(words)) / math.sqrt(2 * len(words)) / 25.0) if words else 0.0
+
+
+def old_metrics(text):
+    """The readability and clarity code the shared pass replaced."""
+    readability = max(0.0, min(textstat.flesch_reading_ease(" ".join(nltk.sent_tokenize(text))) / 100.0, 1.0))
+    words = [w for w in nltk.word_tokenize(text.lower()) if w.isalpha()]
+    return readability, clarity(words)
+
+
+def main():
+    texts = load_corpus(sys.argv[1:])
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+        has_punkt = True
+    except LookupError:
+        has_punkt = False
+
+    f1s, sentence_deltas, readability_deltas, clarity_deltas = [], [], [], []
+    for text in texts:
+        regex = preprocess_document(text, "regex")
+        if has_punkt:
+            reference = preprocess_document(text, "nltk")
+        else:
+            reference = preprocess_document(text, "regex")
+            reference.words = alpha_words(regex.sentences, "nltk")
+        f1s.append(token_f1(reference.words, regex.words))
+        sentence_deltas.append(abs(len(reference.sentences) - len(regex.sentences)))
+        readability_deltas.append(abs(reference.flesch_reading_ease() - regex.flesch_reading_ease()) / 100.0)
+        clarity_deltas.append(abs(clarity(reference.words) - clarity(regex.words)))
+
+    print(f"{len(texts)} documents, NLTK sentences: {'punkt' if has_punkt else 'unavailable, regex on both sides'}")
+    print(f"word-token F1            mean {sum(f1s) / len(f1s):.4f}  min {min(f1s):.4f}")
+    print(f"sentence count |delta|   mean {sum(sentence_deltas) / len(texts):.2f}  max {max(sentence_deltas)}")
+    print(f"readability |delta|      mean {sum(readability_deltas) / len(texts):.4f}  max {max(readability_deltas):.4f}")
+    print(f"clarity |delta|          mean {sum(clarity_deltas) / len(texts):.4f}  max {max(clarity_deltas):.4f}")
+
+    # One large report: the corpus repeated to ~1M characters
+    report = "\n".join(texts)
+    report = report * max(1, 1_000_000 // len(report))
+    timings = {}
+    if has_punkt:
+        started = time.perf_counter()
+        old_metrics(report)
+        timings["previous metric code"] = time.perf_counter() - started
+    for tokenizer in ("nltk", "regex") if has_punkt else ("regex",):
+        started = time.perf_counter()
+        preprocess_document(report, tokenizer)
+        timings[f"shared pass, {tokenizer}"] = time.perf_counter() - started
+    print(f"{len(report)} characters, {len(split_sentences(report, 'regex'))} sentences")
+    for name, seconds in timings.items():
+        print(f"{name:24s} {seconds:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
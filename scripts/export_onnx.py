@@ -0,0 +1,58 @@
+"""
+Export the commitment, specificity and ESG classifiers to optimized ONNX graphs.
+
+Writes <output_dir>/<model id>/model.onnx (and model.int8.onnx with --int8) plus
+the model config and tokenizer, ready for INFERENCE_BACKEND=onnx.
+
+usage: python scripts/export_onnx.py [output_dir] [--int8]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from analyze.backends import export_onnx, onnx_model_dir, optimize_onnx, quantize_onnx
+from analyze.registry import WARMUP_TEXT
+from config import ONNX_MODEL_DIR
+
+MODEL_IDS = [
+    "climatebert/distilroberta-base-climate-commitment",
+    "climatebert/distilroberta-base-climate-specificity",
+    "yiyanghkust/finbert-esg-9-categories",
+]
+
+
+def size_mb(path):
+    return os.path.getsize(path) / 2**20
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    output_dir = args[0] if args else ONNX_MODEL_DIR
+    int8 = "--int8" in sys.argv
+
+    for model_id in MODEL_IDS:
+        started = time.perf_counter()
+        directory = onnx_model_dir(output_dir, model_id)
+        os.makedirs(directory, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        model = AutoModelForSequenceClassification.from_pretrained(model_id)
+        model.config.save_pretrained(directory)
+        tokenizer.save_pretrained(directory)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = os.path.join(tmp, "raw.onnx")
+            export_onnx(model, tokenizer, raw, sample_text=WARMUP_TEXT)
+            optimize_onnx(raw, os.path.join(directory, "model.onnx"))
+            line = f"{model_id}: model.onnx {size_mb(os.path.join(directory, 'model.onnx')):.1f} MB"
+            if int8:
+                # Quantize the plain export; ORT's fused operators are applied afterwards
+                quantized = os.path.join(tmp, "int8.onnx")
+                quantize_onnx(raw, quantized)
+                optimize_onnx(quantized, os.path.join(directory, "model.int8.onnx"))
+                line += f", model.int8.onnx {size_mb(os.path.join(directory, 'model.int8.onnx')):.1f} MB"
+        print(f"{line} ({time.perf_counter() - started:.1f}s)")
@@ -1,22 +1,21 @@
 import sys
 import os
-from docx import Document
-import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_text_docx(path):
-    doc = Document(path)
-    return "\n".join([p.text for p in doc.paragraphs])
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-def extract_text_pdf(path):
-    doc = fitz.open(path)
-    return "\n".join([page.get_text() for page in doc])
+from analyze.extraction import extract_document
 
-file_path = sys.argv[1]
-ext = os.path.splitext(file_path)[1].lower()
+if __name__ == "__main__":
+    file_path = sys.argv[1]
+    ext = os.path.splitext(file_path)[1].lower()
 
-if ext == ".docx":
-    print(extract_text_docx(file_path))
-elif ext == ".pdf":
-    print(extract_text_pdf(file_path))
-else:
-    print("Unsupported file type", file=sys.stderr)
+    if ext not in (".docx", ".pdf"):
+        print("Unsupported file type", file=sys.stderr)
+        sys.exit(0)
+
+    with open(file_path, "rb") as f:
+        data = f.read()
+    workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        print(extract_document(data, ext, executor=executor, workers=workers).text)
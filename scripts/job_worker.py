@@ -0,0 +1,32 @@
+"""
+Run analysis job workers without the HTTP API, so they can be scaled separately.
+
+Workers share the job queue (JOB_QUEUE_PATH) with the API, which only needs
+JOB_WORKERS=0 to leave all jobs to processes like this one.
+
+usage: python scripts/job_worker.py [workers]
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import main
+from analyze.jobs import JobWorkers, job_queue
+
+
+async def run(workers):
+    await asyncio.to_thread(main.load_models)
+    job_workers = JobWorkers(job_queue, {"document": main.run_document_job}, workers=workers)
+    job_workers.start()
+    print(f"{workers} job workers running on {job_queue.path}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_workers.stop()
+        main.execution.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 2))
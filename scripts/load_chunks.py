@@ -0,0 +1,52 @@
+"""
+Extract report PDFs into the local chunk store, so the transition-audit engine
+reads them without querying Pinecone.
+
+Each PDF is stored under its file name (the pdf_name of data/mapping file.csv),
+split into chunks with their page numbers. Reports already in the store are
+skipped unless --replace is given.
+
+usage: python scripts/load_chunks.py --pdf-dir DIR [--limit N] [--replace]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyze.chunk_store import chunk_store
+from analyze.extraction import extract_document
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf-dir", required=True)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--replace", action="store_true")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pdf_dir, "*.pdf")))[:args.limit]
+    started = time.perf_counter()
+    loaded = 0
+    for path in paths:
+        pdf_name = os.path.basename(path)
+        if not args.replace and chunk_store.has(pdf_name):
+            continue
+        try:
+            with open(path, "rb") as f:
+                document = extract_document(f.read(), ".pdf")
+        except Exception as e:
+            print(f"{pdf_name}: extraction failed: {e}")
+            continue
+        chunks = chunk_store.put_pages(pdf_name, [page.text for page in document.pages])
+        loaded += 1
+        print(f"{pdf_name}: {len(document.pages)} pages, {chunks} chunks")
+
+    print(f"Loaded {loaded} of {len(paths)} reports in {time.perf_counter() - started:.1f}s; "
+          f"store holds {chunk_store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Tiny stand-ins for Hugging Face models and tokenizers, so inference code can be tested offline."""
+from types import SimpleNamespace
+
+import torch
+
+CLS, PAD, SEP = 0, 1, 2
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with a deterministic vocabulary, mimicking the fast-tokenizer call API."""
+
+    def __init__(self, vocab_size: int = 50, offset: int = 0):
+        self.vocab_size = vocab_size
+        self.offset = offset
+        self.all_special_tokens = ["<s>", "<pad>", "</s>"]
+
+    def get_vocab(self):
+        return {f"tok{i}": i + 3 + self.offset for i in range(self.vocab_size)}
+
+    def token_ids(self, text):
+        return [sum(map(ord, word)) % self.vocab_size + 3 + self.offset for word in text.split()]
+
+    def __call__(self, texts, return_tensors="pt", truncation=True, max_length=512, padding=True,
+                 stride=0, return_overflowing_tokens=False):
+        if isinstance(texts, str):
+            texts = [texts]
+
+        rows, mapping = [], []
+        content = max_length - 2
+        for index, text in enumerate(texts):
+            ids = self.token_ids(text)
+            if return_overflowing_tokens:
+                start = 0
+                while True:
+                    rows.append([CLS] + ids[start:start + content] + [SEP])
+                    mapping.append(index)
+                    if start + content >= len(ids):
+                        break
+                    start += content - stride
+            else:
+                rows.append([CLS] + ids[:content] + [SEP])
+                mapping.append(index)
+
+        width = max(len(row) for row in rows)
+        encoded = {
+            "input_ids": torch.tensor([row + [PAD] * (width - len(row)) for row in rows]),
+            "attention_mask": torch.tensor([[1] * len(row) + [0] * (width - len(row)) for row in rows]),
+        }
+        if return_overflowing_tokens:
+            encoded["overflow_to_sample_mapping"] = torch.tensor(mapping)
+        return encoded
+
+
+class StubModel(torch.nn.Module):
+    """Mean-pooled embedding classifier with a Hugging Face-like config and output."""
+
+    def __init__(self, num_labels: int = 2, vocab_size: int = 128, seed: int = 0):
+        super().__init__()
+        torch.manual_seed(seed)
+        self.embedding = torch.nn.Embedding(vocab_size, num_labels)
+        self.config = SimpleNamespace(
+            problem_type=None,
+            num_labels=num_labels,
+            id2label={i: f"LABEL_{i}" for i in range(num_labels)},
+        )
+
+    def forward(self, input_ids, attention_mask=None, **kwargs):
+        mask = attention_mask.unsqueeze(-1).to(torch.float32)
+        logits = (self.embedding(input_ids) * mask).sum(dim=1) / mask.sum(dim=1)
+        return SimpleNamespace(logits=logits)
@@ -0,0 +1,66 @@
+import math
+import os
+
+import pytest
+import torch
+
+from analyze import backends as backends_module
+from analyze.backends import (
+    OnnxBackend, TextClassifier, create_backend, export_onnx, onnx_model_dir, optimize_onnx
+)
+from analyze.inference import get_scores
+from tests.stubs import StubModel, StubTokenizer
+
+TEXTS = ["We will cut emissions by 40% by 2030", "Our business performed well this year"]
+
+pytest.importorskip("onnxruntime")
+
+
+@pytest.fixture
+def exported(tmp_path, monkeypatch):
+    """A stub model exported and optimized the way scripts/export_onnx.py does it"""
+    model, tokenizer = StubModel(num_labels=3), StubTokenizer()
+    directory = onnx_model_dir(str(tmp_path), "stub/esg")
+    raw = str(tmp_path / "raw.onnx")
+
+    os.makedirs(directory)
+    export_onnx(model, tokenizer, raw)
+    optimize_onnx(raw, os.path.join(directory, "model.onnx"))
+    monkeypatch.setattr(backends_module.AutoConfig, "from_pretrained", lambda path: model.config)
+    return model, tokenizer, str(tmp_path)
+
+
+def test_onnx_model_matches_torch(exported):
+    model, tokenizer, model_dir = exported
+    onnx_model = OnnxBackend("cpu", model_dir=model_dir).load_model("stub/esg")
+    inputs = tokenizer(TEXTS)
+
+    with torch.inference_mode():
+        expected = model(**inputs).logits
+    assert torch.allclose(onnx_model(**inputs).logits, expected, atol=1e-5)
+    assert get_scores(onnx_model, tokenizer, TEXTS, "cpu") == pytest.approx(get_scores(model, tokenizer, TEXTS, "cpu"))
+
+
+def test_text_classifier_mimics_the_pipeline_output(exported):
+    model, tokenizer, model_dir = exported
+    backend = OnnxBackend("cpu", model_dir=model_dir)
+    classifier = backend.build_classifier("text-classification", backend.load_model("stub/esg"), tokenizer)
+
+    results = classifier(TEXTS, truncation=True, max_length=512, batch_size=1)
+    assert len(results) == 2
+    for predictions in results:
+        assert {p["label"] for p in predictions} == {"LABEL_0", "LABEL_1", "LABEL_2"}
+        assert [p["score"] for p in predictions] == sorted((p["score"] for p in predictions), reverse=True)
+        assert math.isclose(sum(p["score"] for p in predictions), 1.0, rel_tol=1e-5)
+
+    torch_results = TextClassifier(model, tokenizer)(TEXTS)
+    for onnx_predictions, torch_predictions in zip(results, torch_results):
+        assert [p["label"] for p in onnx_predictions] == [p["label"] for p in torch_predictions]
+        assert [p["score"] for p in onnx_predictions] == pytest.approx([p["score"] for p in torch_predictions])
+
+
+def test_missing_export_and_unknown_backend(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        OnnxBackend("cpu", model_dir=str(tmp_path)).load_model("stub/missing")
+    with pytest.raises(ValueError):
+        create_backend("tensorrt", "cpu")
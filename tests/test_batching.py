@@ -0,0 +1,90 @@
+import asyncio
+import time
+import pytest
+
+from analyze.batching import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_batch():
+    """Requests arriving within the wait window are run as one batch"""
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher("double", batch_fn, max_batch_size=8, max_wait_ms=50)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert results == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["batch_size"]["max"] == 5
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_size():
+    """A full batch is dispatched immediately and the rest queue for the next one"""
+    sizes = []
+
+    def batch_fn(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher("identity", batch_fn, max_batch_size=4, max_wait_ms=1000)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(8)))
+
+    assert results == list(range(8))
+    assert sizes == [4, 4]
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller():
+    """An exception in the batch function is raised to each waiting request"""
+    def batch_fn(items):
+        raise ValueError("model failure")
+
+    batcher = MicroBatcher("broken", batch_fn, max_batch_size=4, max_wait_ms=5)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert batcher.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batches_overlap_up_to_max_in_flight():
+    """With two slots a second batch starts while the first is still running"""
+    running = []
+    peak = []
+
+    def batch_fn(items):
+        running.append(1)
+        peak.append(len(running))
+        time.sleep(0.1)
+        running.pop()
+        return items
+
+    batcher = MicroBatcher("overlap", batch_fn, max_batch_size=2, max_wait_ms=1, max_in_flight=2)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+
+    assert results == [0, 1, 2, 3]
+    assert max(peak) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_releases_callers():
+    """Cancelling a running batch cancels its callers instead of leaving them waiting"""
+    def batch_fn(items):
+        time.sleep(0.2)
+        return items
+
+    batcher = MicroBatcher("cancelled", batch_fn, max_batch_size=1, max_wait_ms=1)
+    caller = asyncio.ensure_future(batcher.submit(1))
+    await asyncio.sleep(0.05)
+    for task in list(batcher._in_flight):
+        task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(caller, 1.0)
@@ -0,0 +1,92 @@
+from fastapi.testclient import TestClient
+
+from analyze.cascade import candidate_sentences, score_cascade, without_run_measurements
+from analyze.inference import build_analysis_result
+from analyze.sentence_cache import SentenceCache
+
+TEXT = ("Our headquarters moved to a new building last year. We will cut emissions 45% by 2030. "
+        "The board met six times. Staff satisfaction remained high. We are committed to net zero.")
+
+
+class FakeScorer:
+    """Commitment 0.9 for sentences mentioning "will" or "committed", specificity 0.8 for percentages."""
+
+    def __init__(self):
+        self.scored = []
+
+    def score(self, texts):
+        self.scored.extend(texts)
+        return [build_analysis_result(0.9 if "will" in text or "committed" in text else 0.1,
+                                      0.8 if "%" in text else 0.2) for text in texts]
+
+
+def test_only_claim_sentences_are_scored():
+    sentences, candidates = candidate_sentences(TEXT)
+    assert len(sentences) == 5 and candidates == [1, 4]
+
+    scorer = FakeScorer()
+    result = score_cascade(scorer.score, TEXT, batch_size=1, include_sentences=True)
+
+    assert scorer.scored == [sentences[1], sentences[4]]
+    assert result["analysis"]["commitment_probability"] == 0.9
+    cascade = result["cascade"]
+    assert cascade["selectivity"] == 0.4 and 0.0 < cascade["compute_saved"] < 1.0
+    assert [sentence["sentence"] for sentence in cascade["sentence_scores"]] == [1, 4]
+
+
+def test_comparison_with_full_scoring():
+    scorer = FakeScorer()
+    comparison = score_cascade(scorer.score, TEXT, compare=True)["cascade"]["comparison"]
+
+    assert len(scorer.scored) == 2 + 5
+    assert comparison["claims"] == 2 and comparison["claim_recall"] == 1.0
+    assert comparison["full_analysis"]["commitment_probability"] < 0.9
+    assert comparison["absolute_difference"]["commitment_probability"] > 0.0
+
+
+def test_comparison_bypasses_the_sentence_cache():
+    scorer = FakeScorer()
+    cache = SentenceCache(None)
+    score_cascade(scorer.score, TEXT, cache=cache, model="climate", compare=True)
+
+    # The full-scoring baseline scores the candidates again rather than reading them from the cache
+    assert len(scorer.scored) == 2 + 5
+    assert cache.stats()["lookups"] == 2 and cache.stats()["hits"] == 0
+
+
+def test_text_without_candidates_is_scored_whole():
+    scorer = FakeScorer()
+    result = score_cascade(scorer.score, "The board met six times. Staff satisfaction remained high.")
+
+    assert scorer.scored == ["The board met six times. Staff satisfaction remained high."]
+    assert result["cascade"]["candidates"] == 0 and result["cascade"]["compute_saved"] == 0.0
+
+
+def test_cascade_mode(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    import main
+
+    scorer = FakeScorer()
+    monkeypatch.setattr(main, "get_fused_scorer", lambda: scorer)
+    monkeypatch.setattr(main.result_cache, "get", lambda key: None)
+    cached = {}
+    monkeypatch.setattr(main.result_cache, "set", lambda key, value: cached.update(value=value))
+    monkeypatch.setattr(main, "sentence_cache", SentenceCache(None))
+    client = TestClient(main.app)
+
+    response = client.post("/analyze", json={"text": TEXT, "mode": "cascade"})
+    assert response.status_code == 200
+    assert response.json()["cascade"]["candidates"] == 2
+    assert len(scorer.scored) == 2
+
+    response = client.post("/analyze", json={"text": TEXT, "mode": "cascade", "compare": True})
+    assert "full_seconds" in response.json()["cascade"]["comparison"]
+    assert "seconds" not in cached["value"]["cascade"]
+    assert "full_seconds" not in cached["value"]["cascade"]["comparison"]
+    assert "speedup" not in cached["value"]["cascade"]["comparison"]
+
+
+def test_run_measurements_are_removed_from_nested_results():
+    result = {"esg": {"environmental": 0.5}, "sentences": [{"seconds": 1.0, "score": 0.2}], "seconds": 2.0}
+    assert without_run_measurements(result) == {"esg": {"environmental": 0.5}, "sentences": [{"score": 0.2}]}
+    assert result["seconds"] == 2.0
@@ -0,0 +1,56 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from analyze.cheap_talk import COMMITMENT_PATTERNS, SPECIFICITY_PATTERNS, analyze_cheap_talk, scanner
+
+TEXTS = [
+    "We will cut Scope 1 emissions 45% by 2030. We are committed to 100MW of solar in 2025!",
+    "WE WILL ENSURE a DETAILED plan: 20 GW by 2050, 3 tonnes per unit, goodwill targets in 20301.",
+    "Die Zielvorgabe İst 12 percent by 2040 and we shall pledge more.",
+    "",
+]
+
+
+def findall_counts(text: str) -> tuple:
+    # What the per-pattern re.findall scoring counted
+    return (sum(len(re.findall(pattern, text, re.IGNORECASE)) for pattern in COMMITMENT_PATTERNS),
+            sum(len(re.findall(pattern, text, re.IGNORECASE)) for pattern in SPECIFICITY_PATTERNS))
+
+
+def test_single_pass_counts_match_findall():
+    for text in TEXTS:
+        counts = scanner.analyze(text)["counts"]
+        assert (counts["commitment"], counts["specificity"]) == findall_counts(text)
+    assert analyze_cheap_talk("")["cheap_talk_probability"] == 0.0
+
+
+def test_spans_locate_matches_and_sentences():
+    text = TEXTS[0]
+    spans = scanner.analyze(text, include_spans=True)["spans"]
+
+    assert [span["match"] for span in spans if span["category"] == "commitment"] == [
+        "We will", "will", "by 2030", "We are committed", "commit"]
+    for span in spans:
+        assert text[span["start"]:span["end"]] == span["match"]
+        assert span["sentence_start"] <= span["start"] < span["sentence_end"]
+    assert {span["sentence"] for span in spans} == {0, 1}
+    assert ("specificity", "45%") in {(span["category"], span["match"]) for span in spans}
+
+
+def test_heuristic_mode(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    import main
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("heuristic mode must not run the models")
+
+    monkeypatch.setattr(main.climate_batcher, "submit", fail)
+    client = TestClient(main.app)
+
+    single = client.post("/analyze", json={"text": TEXTS[0], "mode": "heuristic", "include_spans": True}).json()
+    assert single["analysis"] == analyze_cheap_talk(TEXTS[0])
+    assert single["spans"]
+    batch = client.post("/analyze", json={"texts": TEXTS, "mode": "heuristic"}).json()
+    assert [result["analysis"] for result in batch["results"]] == [analyze_cheap_talk(text) for text in TEXTS]
+    assert "spans" not in batch["results"][0]
@@ -0,0 +1,42 @@
+from analyze.chunk_store import CHUNK_SEPARATOR, ChunkStore, split_page
+
+
+def test_chunks_stream_back_in_order_with_pages():
+    store = ChunkStore(":memory:")
+    chunks = [(1 + i // 40, f"Chunk {i}.") for i in range(250)]
+    assert store.put("10_Abbott Laboratories_2009.pdf", chunks) == 250
+
+    # More chunks than the old top_k=100 and than one read batch
+    assert list(store.chunks("10_Abbott Laboratories_2009.pdf", batch_size=64)) == chunks
+    assert store.text("10_Abbott Laboratories_2009.pdf") == CHUNK_SEPARATOR.join(text for _, text in chunks)
+    assert store.text("missing.pdf") is None and not store.has("missing.pdf")
+
+
+def test_put_replaces_and_delete_removes():
+    store = ChunkStore(":memory:")
+    store.put("a.pdf", [(1, "old"), (2, "older")])
+    store.put("a.pdf", [(1, "new")])
+    store.put("b.pdf", [(1, "other")])
+
+    assert store.text("a.pdf") == "new"
+    assert store.stats() == {"documents": 2, "chunks": 2}
+    assert store.delete("a.pdf") and not store.has("a.pdf")
+
+
+def test_pages_are_split_into_bounded_chunks():
+    page = "First paragraph." + CHUNK_SEPARATOR + "word " * 100 + CHUNK_SEPARATOR + "Last."
+    chunks = split_page(page, 120)
+
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(page.split())
+
+    store = ChunkStore(":memory:", chunk_chars=120)
+    store.put_pages("r.pdf", [page, "Second page."])
+    pages = [number for number, _ in store.chunks("r.pdf")]
+    assert pages == sorted(pages) and pages[-1] == 2 and pages.count(2) == 1
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "chunks.sqlite3")
+    ChunkStore(path).put("a.pdf", [(3, "kept")])
+    assert list(ChunkStore(path).chunks("a.pdf")) == [(3, "kept")]
@@ -0,0 +1,123 @@
+import importlib
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from analyze.consistency import (
+    batch_document_metrics, compute_tfidf_consistency, consistency_metrics, pairwise_similarity_stats, peer_similarity,
+    segment_consistency, split_into_segments, year_over_year_similarity
+)
+
+SEGMENTS = [
+    "we will reduce scope one emissions by half",
+    "our emissions target covers scope one and two",
+    "the board reviews climate risk every quarter",
+    "",
+    "we will report progress on our emissions target annually",
+    "climate risk is part of the board remuneration policy",
+    "net zero by 2050 across our operations",
+]
+
+
+def dense_stats(matrix):
+    similarities = cosine_similarity(matrix)
+    values = similarities[np.tril_indices_from(similarities, k=-1)]
+    return float(np.mean(values)), float(np.std(values))
+
+
+@pytest.mark.parametrize("max_bytes", [1, 8 * 7 * 3, 1 << 20])
+def test_blocked_stats_match_the_dense_matrix(max_bytes):
+    matrix = TfidfVectorizer().fit_transform(SEGMENTS)
+
+    mean, std = pairwise_similarity_stats(matrix, max_bytes=max_bytes)
+    expected_mean, expected_std = dense_stats(matrix)
+    assert mean == pytest.approx(expected_mean, abs=1e-12)
+    assert std == pytest.approx(expected_std, abs=1e-9)
+
+
+def test_one_tokenization_matches_a_vectorizer_per_segmentation():
+    rng = np.random.default_rng(0)
+    words = [f"w{rng.zipf(1.5) % 300}" for _ in range(2500)]
+    text = " ".join(words)
+    lengths = [500, 1000, 300, len(words)]
+
+    results = segment_consistency(text, lengths)
+    for length, result in zip(lengths, results):
+        expected = compute_tfidf_consistency(split_into_segments(text, length))
+        if expected is None:
+            assert result is None
+            continue
+        assert result["consistency_score"] == pytest.approx(expected["consistency_score"], abs=1e-12)
+        assert result["consistency_variability"] == pytest.approx(expected["consistency_variability"], abs=1e-9)
+    assert results[-1] is None
+
+
+def test_batch_metrics_equal_single_document_metrics():
+    rng = np.random.default_rng(1)
+    vocabulary = " ".join(SEGMENTS).split()
+    texts = [" ".join(vocabulary[rng.zipf(1.5) % len(vocabulary)] for _ in range(n)) for n in (2500, 700, 300)]
+
+    results, matrix = batch_document_metrics(texts, "regex")
+    for text, result in zip(texts, results):
+        expected = consistency_metrics([text], "regex")
+        assert result.keys() == expected.keys()
+        for key, value in expected.items():
+            assert result[key] == (pytest.approx(value, abs=1e-12) if value is not None else None)
+    assert results[0]["consistency_score"] is not None and results[2]["consistency_score"] is None
+    assert matrix.shape[0] == 3
+
+
+def test_cross_document_similarity_is_vectorized_over_pairs_and_peers():
+    matrix = TfidfVectorizer().fit_transform(SEGMENTS)
+    dense = cosine_similarity(matrix)
+
+    companies = ["a", "a", "b", None, "a", "b", "c"]
+    pairs = year_over_year_similarity(matrix, companies, [2010, 2009, 2020, 2010, 2011, 2021, 2020])
+    assert [(p["company"], p["from_year"], p["to_year"]) for p in pairs] == [
+        ("a", 2009, 2010), ("a", 2010, 2011), ("b", 2020, 2021)
+    ]
+    assert pairs[0]["similarity"] == pytest.approx(dense[1, 0])
+    assert pairs[2]["similarity"] == pytest.approx(dense[2, 5])
+
+    sectors = ["x", "x", "y", None, "x", "y", "z"]
+    peer_means, statistics = peer_similarity(matrix, sectors)
+    assert peer_means[0] == pytest.approx((dense[0, 1] + dense[0, 4]) / 2)
+    assert peer_means[2] == pytest.approx(dense[2, 5])
+    assert peer_means[3] is None and peer_means[6] is None
+    assert [s["sector"] for s in statistics] == ["x", "y"]
+    assert statistics[0]["mean_similarity"] == pytest.approx((dense[0, 1] + dense[0, 4] + dense[1, 4]) / 3)
+
+
+def test_batch_endpoint_fills_metadata_from_the_mapping_file(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    main = importlib.import_module("main")
+
+    async def run_inline(fn, *args):
+        return fn(*args)
+
+    monkeypatch.setattr(main.execution, "run_cpu", run_inline)
+    client = TestClient(main.app)
+    text = "We will cut our Scope 1 and 2 emissions by half before 2030 and report on progress every year. " * 20
+
+    response = client.post("/consistency/batch", json={"documents": [
+        {"pdf_name": "10_Abbott Laboratories_2010.pdf", "text": text},
+        {"pdf_name": "10_Abbott Laboratories_2009.pdf", "text": text + " Our suppliers must also report."},
+        {"id": "peer", "sector": "Chemicals, Petroleum, Rubber & Plastic",
+         "text": "Climate risk is reviewed by the board."},
+    ]})
+    result = response.json()
+
+    assert response.status_code == 200
+    assert [d["id"] for d in result["documents"]] == [
+        "10_Abbott Laboratories_2010.pdf", "10_Abbott Laboratories_2009.pdf", "peer"
+    ]
+    (pair,) = result["year_over_year"]
+    assert (pair["company"], pair["from_year"], pair["to_year"]) == ("Abbott Laboratories", 2009, 2010)
+    assert pair["from"] == "10_Abbott Laboratories_2009.pdf" and 0.9 < pair["similarity"] <= 1.0
+    assert result["sectors"][0]["documents"] == 3
+    assert result["documents"][2]["sector_peer_similarity"] < result["documents"][0]["sector_peer_similarity"]
+    assert client.post("/consistency/batch", json={"documents": []}).status_code == 400
@@ -0,0 +1,81 @@
+import importlib
+
+import pytest
+from fastapi import HTTPException
+
+import analyze.document_store as document_store_module
+from analyze.document_store import DocumentStore, resolve_text
+from analyze.inference import build_analysis_result
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"))
+    monkeypatch.setattr(document_store_module, "document_store", store)
+    return store
+
+
+def test_documents_are_addressed_by_text_hash(store):
+    document_id = store.put("We will cut emissions by 2030.", name="report.pdf")
+
+    assert document_id == store.put("We will cut emissions by 2030.")
+    assert store.get(document_id)["chars"] == 30
+    assert store.text(document_id) == "We will cut emissions by 2030."
+    assert store.put("Other text", document_id="upload-sha") == "upload-sha"
+    stats = store.stats()
+    assert stats["documents"] == 2 and stats["chars"] == 40 and stats["bytes"] == 40
+
+
+def test_least_recently_used_documents_are_evicted(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"), max_bytes=25)
+    old = store.put("a" * 10)
+    used = store.put("b" * 10)
+    store.get(used)
+    newest = store.put("c" * 10)
+
+    assert store.get(old) is None
+    assert store.text(used) == "b" * 10 and store.text(newest) == "c" * 10
+    assert store.stats()["evictions"] == 1
+    # A document larger than the whole store is still kept until the next one arrives
+    big = store.put("d" * 40)
+    assert store.text(big) == "d" * 40 and store.stats()["documents"] == 1
+
+
+def test_resolve_text_prefers_text_then_document_id(store):
+    document_id = store.put("stored text")
+
+    assert resolve_text("sent text", document_id) == "sent text"
+    assert resolve_text(None, document_id) == "stored text"
+    with pytest.raises(HTTPException) as missing:
+        resolve_text(None, "unknown")
+    assert missing.value.status_code == 404
+    with pytest.raises(HTTPException) as empty:
+        resolve_text(None, None)
+    assert empty.value.status_code == 400
+
+
+def test_analyze_accepts_document_id_and_compresses_large_responses(store, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    main = importlib.import_module("main")
+    monkeypatch.setattr(main, "document_store", store)
+
+    async def climate(text):
+        return build_analysis_result(0.8, 0.4)
+
+    monkeypatch.setattr(main.climate_batcher, "submit", climate)
+    monkeypatch.setattr(main.result_cache, "get", lambda key: None)
+    monkeypatch.setattr(main.result_cache, "set", lambda key, value: None)
+    client = TestClient(main.app)
+
+    text = "We will cut emissions by 2030. " * 100
+    document_id = client.post("/documents", json={"text": text, "name": "report"}).json()["document_id"]
+    response = client.post("/analyze", json={"document_id": document_id})
+    assert response.json()["analysis"]["commitment_probability"] == pytest.approx(0.8)
+    assert client.post("/analyze", json={"document_id": "unknown"}).status_code == 404
+
+    # The test client decodes gzip transparently
+    response = client.get(f"/documents/{document_id}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["text"] == text
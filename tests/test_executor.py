@@ -0,0 +1,96 @@
+import asyncio
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from analyze.batching import MicroBatcher
+from analyze.executor import BoundedPool, Overloaded
+
+
+def slow_identity(value, delay=0.2):
+    time.sleep(delay)
+    return value
+
+
+def thread_pool(overflow, queue_timeout=30.0):
+    return BoundedPool(
+        "test", lambda n: ThreadPoolExecutor(max_workers=n),
+        workers=1, max_queue=0, overflow=overflow, queue_timeout=queue_timeout
+    )
+
+
+@pytest.mark.asyncio
+async def test_reject_mode_refuses_work_when_saturated():
+    """With no queue allowed, a second call while the only slot is busy is refused"""
+    pool = thread_pool("reject")
+    results = await asyncio.gather(pool.run(slow_identity, 1), pool.run(slow_identity, 2), return_exceptions=True)
+
+    assert results[0] == 1
+    assert isinstance(results[1], Overloaded)
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queue_mode_waits_for_a_slot():
+    """In queue mode callers wait for a free slot instead of being refused"""
+    pool = thread_pool("queue", queue_timeout=5.0)
+    results = await asyncio.gather(pool.run(slow_identity, 1, delay=0.05), pool.run(slow_identity, 2, delay=0.05))
+
+    assert results == [1, 2]
+    stats = pool.stats()
+    assert stats["rejected"] == 0
+    assert stats["max_queue_depth"] == 1
+    assert stats["queue_depth"] == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queue_mode_gives_up_after_timeout():
+    """A queued call is refused once queue_timeout passes without a free slot"""
+    pool = thread_pool("queue", queue_timeout=0.05)
+    results = await asyncio.gather(pool.run(slow_identity, 1, delay=0.3), pool.run(slow_identity, 2), return_exceptions=True)
+
+    assert results[0] == 1
+    assert isinstance(results[1], Overloaded)
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_block_ignores_the_queue_limit():
+    """Blocking calls (used by the batchers) always wait for a slot"""
+    pool = thread_pool("reject")
+    results = await asyncio.gather(
+        pool.run(slow_identity, 1, delay=0.05, block=True),
+        pool.run(slow_identity, 2, delay=0.05, block=True)
+    )
+
+    assert results == [1, 2]
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batcher_refuses_requests_beyond_max_pending():
+    """Requests beyond max_pending are refused with Overloaded"""
+    batcher = MicroBatcher("bounded", lambda items: items, max_batch_size=8, max_wait_ms=50, max_pending=2)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    assert results[:2] == [0, 1]
+    assert isinstance(results[2], Overloaded)
+
+
+@pytest.mark.asyncio
+async def test_overloaded_maps_to_429(monkeypatch):
+    """The API answers Overloaded with a 429 and a Retry-After header"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    main = importlib.import_module("main")
+
+    response = await main.overloaded_exception_handler(None, Overloaded("inference pool is saturated"))
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert b"OVERLOADED" in response.body
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+
+from analyze.extraction import (
+    PDF_BACKEND, extract_document, extract_document_async, extract_text_from_bytes, page_ranges
+)
+
+
+def make_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        doc.new_page().insert_text((72, 72), f"Page {number}: we will cut emissions by {number}%.")
+    return doc.tobytes()
+
+
+def test_page_ranges_cover_every_page_once():
+    assert page_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert page_ranges(2, 8) == [(0, 1), (1, 2)]
+
+
+def test_pages_keep_numbers_and_offsets():
+    document = extract_document(make_pdf(3), ".pdf")
+
+    assert document.backend == PDF_BACKEND == "pymupdf"
+    assert [page.number for page in document.pages] == [1, 2, 3]
+    for page in document.pages:
+        assert f"Page {page.number}:" in page.text
+        assert document.text[page.start:page.end] == page.text
+
+
+def test_parallel_extraction_matches_sequential():
+    data = make_pdf(9)
+    sequential = extract_document(data, ".pdf")
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        parallel = extract_document(data, ".pdf", executor=executor, workers=3, min_parallel_pages=4)
+
+    assert parallel.text == sequential.text
+    assert [p.start for p in parallel.pages] == [p.start for p in sequential.pages]
+
+
+async def test_async_extraction_fans_out_page_ranges():
+    calls = []
+
+    async def run_cpu(fn, *args):
+        calls.append(fn.__name__)
+        return fn(*args)
+
+    data = make_pdf(9)
+    document = await extract_document_async(data, ".pdf", run_cpu, workers=3, min_parallel_pages=4)
+
+    assert calls == ["pdf_page_count"] + ["extract_pdf_pages"] * 3
+    assert document.text == extract_text_from_bytes(data, ".pdf")
+
+    calls.clear()
+    await extract_document_async(data, ".pdf", run_cpu, workers=3, min_parallel_pages=10)
+    assert calls == ["pdf_page_count", "extract_document"]
+
+
+def test_unsupported_extension_is_rejected():
+    with pytest.raises(ValueError):
+        extract_document(b"", ".rtf")
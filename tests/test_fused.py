@@ -0,0 +1,44 @@
+import pytest
+
+from analyze.fused import FusedClimateScorer, tokenizers_compatible
+from analyze.inference import build_analysis_result, get_scores
+from tests.stubs import StubModel, StubTokenizer
+
+TEXTS = [
+    "We will cut emissions by 40% by 2030",
+    "Our business performed well this year",
+    "We are committed to net zero",
+]
+
+
+def separate_scores(commitment_model, specificity_model, commitment_tokenizer, specificity_tokenizer):
+    commitment = get_scores(commitment_model, commitment_tokenizer, TEXTS, "cpu")
+    specificity = get_scores(specificity_model, specificity_tokenizer, TEXTS, "cpu")
+    return [build_analysis_result(c, s) for c, s in zip(commitment, specificity)]
+
+
+def test_tokenizers_compatible():
+    assert tokenizers_compatible(StubTokenizer(), StubTokenizer())
+    assert not tokenizers_compatible(StubTokenizer(), StubTokenizer(offset=5))
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_fused_scores_match_separate_scoring(concurrent):
+    commitment_model, specificity_model = StubModel(seed=1), StubModel(seed=2)
+    tokenizer = StubTokenizer()
+    scorer = FusedClimateScorer(commitment_model, specificity_model, tokenizer, StubTokenizer(),
+                                "cpu", concurrent=concurrent)
+
+    assert scorer.shared_tokenizer
+    assert scorer.score(TEXTS) == separate_scores(commitment_model, specificity_model, tokenizer, tokenizer)
+
+
+def test_fused_scorer_encodes_separately_when_tokenizers_differ():
+    commitment_model, specificity_model = StubModel(seed=1), StubModel(seed=2)
+    commitment_tokenizer, specificity_tokenizer = StubTokenizer(), StubTokenizer(offset=5)
+    scorer = FusedClimateScorer(commitment_model, specificity_model, commitment_tokenizer,
+                                specificity_tokenizer, "cpu")
+
+    assert not scorer.shared_tokenizer
+    assert scorer.score(TEXTS) == separate_scores(
+        commitment_model, specificity_model, commitment_tokenizer, specificity_tokenizer)
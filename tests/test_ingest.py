@@ -0,0 +1,65 @@
+import hashlib
+import io
+import os
+
+from analyze.extraction import extract_text_from_bytes
+from analyze.ingest import ingest_upload
+
+REPORT = b"We will cut emissions by 40% by 2030.\r\n" * 1000
+
+
+def test_ingest_hashes_stores_and_keeps_bytes(tmp_path):
+    upload = ingest_upload(io.BytesIO(REPORT), str(tmp_path), ".txt", max_size=len(REPORT), chunk_size=4096)
+
+    assert upload.size == len(REPORT)
+    assert upload.sha256 == hashlib.sha256(REPORT).hexdigest()
+    assert upload.path == os.path.join(str(tmp_path), f"{upload.sha256}.txt")
+    assert bytes(upload.data) == REPORT
+    with open(upload.path, "rb") as f:
+        assert f.read() == REPORT
+    assert os.listdir(tmp_path) == [f"{upload.sha256}.txt"]
+
+
+def test_same_content_lands_on_the_same_file(tmp_path):
+    first = ingest_upload(io.BytesIO(REPORT), str(tmp_path), ".txt", max_size=len(REPORT))
+    second = ingest_upload(io.BytesIO(REPORT), str(tmp_path), ".txt", max_size=len(REPORT))
+
+    assert first.path == second.path
+    assert not first.duplicate and second.duplicate
+    assert bytes(second.data) == REPORT
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_oversized_upload_leaves_nothing_behind(tmp_path):
+    assert ingest_upload(io.BytesIO(REPORT), str(tmp_path), ".txt", max_size=len(REPORT) - 1,
+                         chunk_size=4096) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_text_extraction_from_bytes_matches_reading_the_file(tmp_path):
+    path = tmp_path / "report.txt"
+    path.write_bytes(REPORT)
+    with open(path, "r", encoding="utf-8") as f:
+        expected = f.read()
+
+    assert extract_text_from_bytes(REPORT, ".txt") == expected
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self, data):
+        self._source = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._source.read(size)
+
+    def seekable(self):
+        return False
+
+    def tell(self):
+        raise OSError("unseekable")
+
+
+def test_unseekable_uploads_are_limited_while_streaming(tmp_path):
+    assert ingest_upload(_Unseekable(REPORT), str(tmp_path), ".txt", max_size=len(REPORT) - 1) is None
+    upload = ingest_upload(_Unseekable(REPORT), str(tmp_path), ".txt", max_size=len(REPORT), chunk_size=4096)
+    assert bytes(upload.data) == REPORT
@@ -0,0 +1,126 @@
+import asyncio
+import importlib
+import os
+import time
+
+import pytest
+
+from analyze.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobWorkers
+from analyze.upload_store import UploadStore
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=2, retry_backoff=0)
+
+
+def test_claims_highest_priority_then_oldest(queue):
+    low = queue.submit("document", {"n": 1})
+    high = queue.submit("document", {"n": 2}, priority=5)
+    later_low = queue.submit("document", {"n": 3})
+
+    claimed = [queue.claim()["id"] for _ in range(3)]
+    assert claimed == [high, low, later_low]
+    assert queue.claim() is None
+    assert queue.stats()[RUNNING] == 3
+
+
+def test_failed_jobs_retry_until_out_of_attempts(queue):
+    job_id = queue.submit("document", {})
+
+    queue.claim()
+    assert queue.fail(job_id, "model busy", {}) == QUEUED
+    assert queue.claim()["attempts"] == 2
+    assert queue.fail(job_id, "model busy", {}) == FAILED
+
+    job = queue.get(job_id)
+    assert job["status"] == FAILED and job["error"] == "model busy"
+
+
+def test_jobs_survive_a_restart(queue):
+    job_id = queue.submit("document", {"path": "uploads/report.pdf"})
+    queue.claim()
+
+    # A second process leaves the job to its live owner until the lease runs out
+    reopened = JobQueue(queue.path)
+    assert reopened.recover() == 0 and reopened.claim() is None
+    assert reopened.recover(now=time.time() + queue.lease_seconds + 1) == 1
+    job = reopened.claim()
+    assert job["id"] == job_id and job["payload"] == {"path": "uploads/report.pdf"}
+    assert job["claimed_by"] == reopened.owner
+
+
+def test_only_the_owner_renews_and_records_outcomes(queue):
+    job_id = queue.submit("document", {})
+    queue.claim()
+    other = JobQueue(queue.path)
+
+    assert queue.renew(job_id) and not other.renew(job_id)
+    other.recover(now=time.time() + queue.lease_seconds + 1)
+    other.claim()
+
+    # The first owner's lease was taken over; its late outcome is ignored
+    assert not queue.renew(job_id)
+    queue.complete(job_id, {"stale": True}, {})
+    assert queue.fail(job_id, "late", {}) == RUNNING
+    other.complete(job_id, {"pages": 1}, {})
+    assert queue.get(job_id)["result"] == {"pages": 1}
+
+
+async def test_running_jobs_keep_their_lease(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.3)
+    other = JobQueue(queue.path, lease_seconds=0.3)
+
+    async def handler(payload, timings):
+        await asyncio.sleep(1.0)
+        assert other.recover() == 0
+        return {}
+
+    job_id = queue.submit("document", {})
+    assert await JobWorkers(queue, {"document": handler}).run_once()
+    assert queue.get(job_id)["status"] == SUCCEEDED
+
+
+async def test_workers_record_results_and_timings(queue):
+    async def handler(payload, timings):
+        if payload.get("fail"):
+            raise RuntimeError("extraction failed")
+        timings["extract_ms"] = 1.0
+        return {"pages": payload["pages"]}
+
+    workers = JobWorkers(queue, {"document": handler})
+    ok = queue.submit("document", {"pages": 3})
+    bad = queue.submit("document", {"fail": True})
+
+    while await workers.run_once():
+        pass
+
+    job = queue.get(ok)
+    assert job["status"] == SUCCEEDED and job["result"] == {"pages": 3}
+    assert {"queue_wait_ms", "extract_ms", "run_ms"} <= set(job["timings"])
+    assert queue.get(bad)["status"] == FAILED
+    assert queue.get(bad)["attempts"] == 2
+
+
+def test_job_endpoints(monkeypatch, tmp_path, queue):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    main = importlib.import_module("main")
+    monkeypatch.setattr(main, "job_queue", queue)
+    store = UploadStore(str(tmp_path / "uploads"), max_bytes=1 << 20, max_age=3600,
+                        pinned=lambda: queue.active_payload_values("path"))
+    monkeypatch.setattr(main, "upload_store", store)
+    client = TestClient(main.app)
+
+    response = client.post("/jobs?priority=3", files={"file": ("report.txt", b"We will cut emissions.")})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    # The queued job's upload outlives its expiry until the job is done
+    path = queue.get(job_id)["payload"]["path"]
+    assert store.evict(now=time.time() + 7200) == 0 and os.path.exists(path)
+
+    job = client.get(f"/jobs/{job_id}").json()
+    assert job["status"] == "queued" and job["priority"] == 3
+    assert client.get("/jobs/unknown").status_code == 404
@@ -0,0 +1,37 @@
+import langid
+
+from analyze.language import LanguageGate, text_samples
+
+ENGLISH = "We will reduce our Scope 1 and 2 emissions by half before 2030 and report progress every year. "
+GERMAN = "Wir werden unsere Emissionen bis 2030 halbieren und jedes Jahr über die Fortschritte berichten. "
+
+
+def test_samples_are_deterministic_and_bounded():
+    text = ENGLISH * 2000
+    samples = text_samples(text, 5, 1000)
+
+    assert samples == text_samples(text, 5, 1000)
+    assert len(samples) == 5 and all(len(sample) <= 1100 for sample in samples)
+    assert text_samples(ENGLISH, 5, 1000) == [ENGLISH]
+
+
+def test_gate_agrees_with_langid_and_exits_early():
+    gate = LanguageGate(samples=5, sample_chars=500, confidence=0.99)
+
+    assert gate.detect(ENGLISH)[0] == langid.classify(ENGLISH)[0] == "en"
+    assert gate.is_language(ENGLISH * 1000)
+    assert not gate.is_language(GERMAN * 1000)
+    stats = gate.stats()
+    # Two agreeing samples were enough for both long texts
+    assert stats["early_exits"] == 2 and stats["samples_classified"] == 5
+
+
+def test_verdicts_are_cached_by_samples():
+    gate = LanguageGate(samples=3, sample_chars=200, cache_size=1)
+    text = ENGLISH * 100
+
+    assert gate.is_language(text)
+    assert gate.is_language(text)
+    assert gate.stats()["hits"] == 1
+    gate.is_language(GERMAN * 100)
+    assert gate.stats()["entries"] == 1
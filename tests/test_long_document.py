@@ -0,0 +1,79 @@
+import importlib
+import math
+
+import pytest
+import torch
+
+from analyze.long_document import (
+    aggregate, classify_esg_long_document, score_long_document, window_probabilities
+)
+from tests.stubs import StubModel, StubTokenizer
+
+LONG_TEXT = " ".join(f"word{i}" for i in range(40))
+
+
+def test_aggregate_modes():
+    """Mean, max and token-weighted mean combine windows column by column"""
+    values = torch.tensor([[0.2, 0.8], [0.6, 0.4]])
+    token_counts = torch.tensor([3, 1])
+
+    assert torch.allclose(aggregate(values, token_counts, "mean"), torch.tensor([0.4, 0.6]))
+    assert torch.allclose(aggregate(values, token_counts, "max"), torch.tensor([0.6, 0.8]))
+    assert torch.allclose(aggregate(values, token_counts, "weighted"), torch.tensor([0.3, 0.7]))
+
+
+def test_aggregate_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        aggregate(torch.ones(2, 2), torch.ones(2), "median")
+
+
+def test_windows_cover_the_document_with_overlap():
+    """40 tokens in windows of 8 with 3 overlapping advance 5 tokens at a time: 8 windows"""
+    probs, token_counts, stats = window_probabilities(
+        StubModel(), StubTokenizer(), LONG_TEXT, "cpu", window=10, overlap=3, batch_size=2)
+
+    assert stats["windows"] == 8 == probs.shape[0]
+    assert token_counts.tolist() == [10] * 7 + [7]
+    assert stats["tokens"] == 77
+    assert stats["tokens_per_sec"] > 0
+    assert torch.allclose(probs.sum(dim=1), torch.ones(8))
+
+
+def test_batch_size_does_not_change_results():
+    model, tokenizer = StubModel(), StubTokenizer()
+    small, _, _ = window_probabilities(model, tokenizer, LONG_TEXT, "cpu", window=10, overlap=3, batch_size=1)
+    large, _, _ = window_probabilities(model, tokenizer, LONG_TEXT, "cpu", window=10, overlap=3, batch_size=16)
+
+    assert torch.allclose(small, large)
+
+
+def test_include_windows_returns_per_window_scores():
+    result = score_long_document(StubModel(), StubTokenizer(), LONG_TEXT, "cpu", aggregation="max",
+                                 include_windows=True, window=10, overlap=3)
+
+    assert len(result["window_scores"]) == result["windows"] == 8
+    assert math.isclose(result["score"], max(result["window_scores"]), rel_tol=1e-6)
+
+    result = score_long_document(StubModel(), StubTokenizer(), LONG_TEXT, "cpu", window=10, overlap=3)
+    assert "window_scores" not in result
+
+
+def test_esg_scores_are_normalized_per_window():
+    model = StubModel(num_labels=3)
+    result = classify_esg_long_document(model, StubTokenizer(), LONG_TEXT, "cpu",
+                                        include_windows=True, window=10, overlap=3)
+
+    assert len(result["window_scores"]) == 8
+    assert math.isclose(sum(result["scores"].values()), 1.0, rel_tol=1e-6)
+
+
+def test_upload_rejects_unknown_aggregation(monkeypatch):
+    """The upload query parameter is validated like the JSON bodies"""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    main = importlib.import_module("main")
+    client = TestClient(main.app)
+
+    response = client.post("/upload?aggregation=median", files={"file": ("report.txt", b"text")})
+    assert response.status_code == 422
@@ -0,0 +1,49 @@
+import nltk
+import pytest
+import textstat
+
+from analyze.preprocessing import alpha_words, flesch_counts, preprocess_document, split_sentences
+
+TEXT = ("We don't expect emissions to fall before 2030. Our U.K. subsidiary, Acme Inc. (the \"Company\"), "
+        "will report progress annually! Low-carbon capex is 40% of the total? Yes.")
+
+
+def _has(resource):
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        return False
+
+
+def test_regex_tokenizer_matches_nltk_words_per_sentence():
+    sentences = split_sentences(TEXT, "regex")
+
+    assert len(sentences) == 4
+    assert alpha_words(sentences, "regex") == alpha_words(sentences, "nltk")
+    assert alpha_words(["We don't cut corners."], "regex") == ["we", "do", "cut", "corners"]
+
+
+def test_missing_punkt_falls_back_to_regex(monkeypatch):
+    def missing(text):
+        raise LookupError("punkt_tab")
+
+    monkeypatch.setattr("analyze.preprocessing.sent_tokenize", missing)
+    monkeypatch.setattr("analyze.preprocessing.word_syllables", len)
+    document = preprocess_document(TEXT, "nltk")
+
+    assert document.tokenizer == "regex"
+    assert document.sentences == split_sentences(TEXT, "regex")
+    with pytest.raises(ValueError):
+        preprocess_document(TEXT, "spacy")
+
+
+@pytest.mark.skipif(not _has("corpora/cmudict"), reason="needs NLTK's cmudict for textstat")
+def test_flesch_counts_reproduce_textstat():
+    words, sentences, syllables = flesch_counts(TEXT)
+
+    assert words == textstat.lexicon_count(TEXT)
+    assert sentences == textstat.sentence_count(TEXT)
+    assert syllables == textstat.syllable_count(TEXT)
+    assert preprocess_document(TEXT, "regex").flesch_reading_ease() == pytest.approx(
+        textstat.flesch_reading_ease(" ".join(split_sentences(TEXT, "regex"))))
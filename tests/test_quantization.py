@@ -0,0 +1,40 @@
+import pytest
+import torch
+
+from analyze.quantization import model_size_bytes, quantize_int8
+from analyze.registry import ModelRegistry
+
+
+def make_classifier():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(torch.nn.Linear(64, 256), torch.nn.ReLU(), torch.nn.Linear(256, 2)).eval()
+
+
+def test_int8_model_is_smaller_and_close_to_fp32():
+    model = make_classifier()
+    inputs = torch.randn(8, 64)
+    with torch.inference_mode():
+        expected = torch.softmax(model(inputs), dim=-1)
+
+    quantized = quantize_int8(model)
+    with torch.inference_mode():
+        actual = torch.softmax(quantized(inputs), dim=-1)
+
+    assert not any(isinstance(m, torch.nn.Linear) for m in quantized.modules())
+    assert model_size_bytes(quantized) < model_size_bytes(model) / 2
+    assert (actual - expected).abs().max() < 0.05
+
+
+def test_registry_falls_back_to_fp32_off_cpu():
+    assert ModelRegistry("cuda", precision="int8").precision == "fp32"
+    with pytest.raises(ValueError):
+        ModelRegistry("cpu", precision="fp16")
+
+
+def test_quantized_model_ids_do_not_collide_with_fp32():
+    fp32, int8 = ModelRegistry("cpu"), ModelRegistry("cpu", precision="int8")
+    for registry in (fp32, int8):
+        registry.register("commitment", "stub/commitment")
+
+    assert fp32.model_id("commitment") == "stub/commitment"
+    assert int8.model_id("commitment") == "stub/commitment@int8"
@@ -0,0 +1,75 @@
+import pytest
+
+from analyze import backends as backends_module
+from analyze import registry as registry_module
+from analyze.registry import ModelRegistry
+from tests.stubs import StubModel, StubTokenizer
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    pipeline_calls = []
+
+    def fake_pipeline(task, model, tokenizer, device, top_k):
+        def classifier(texts, **kwargs):
+            pipeline_calls.append(texts)
+            return [[{"label": "LABEL_0", "score": 1.0}] for _ in texts]
+        return classifier
+
+    monkeypatch.setattr(registry_module.AutoTokenizer, "from_pretrained", lambda model_id: StubTokenizer())
+    monkeypatch.setattr(backends_module.AutoModelForSequenceClassification, "from_pretrained",
+                        lambda model_id: StubModel())
+    monkeypatch.setattr(backends_module, "pipeline", fake_pipeline)
+
+    registry = ModelRegistry("cpu")
+    registry.register("commitment", "stub/commitment")
+    registry.register("esg", "stub/esg", pipeline_task="text-classification")
+    registry.pipeline_calls = pipeline_calls
+    return registry
+
+
+def test_load_puts_models_in_inference_mode(registry):
+    """Loaded models are in eval mode with gradients disabled"""
+    registry.load_all()
+    model = registry.get("commitment").model
+
+    assert not model.training
+    assert all(not p.requires_grad for p in model.parameters())
+    assert registry.get("commitment").classifier is None
+    assert registry.get("esg").classifier is not None
+
+
+def test_warmup_runs_every_model(registry):
+    """Warm-up passes go through the pipeline for pipeline-backed models"""
+    registry.load_all()
+    registry.warmup(passes=3)
+
+    assert len(registry.pipeline_calls) == 3
+
+
+def test_stats_report_timings(registry):
+    """Stats report load, pipeline-build and warm-up timings per model"""
+    registry.load("commitment")
+    stats = registry.stats()
+    assert stats["models"]["commitment"]["loaded"]
+    assert not stats["models"]["esg"]["loaded"]
+
+    registry.load_all()
+    registry.warmup(passes=1)
+    stats = registry.stats()["models"]
+    assert {"load_ms", "warmup_ms"} <= set(stats["commitment"])
+    assert "pipeline_build_ms" not in stats["commitment"]
+    assert {"load_ms", "pipeline_build_ms", "warmup_ms"} <= set(stats["esg"])
+
+
+def test_parallel_and_lazy_loads_happen_once(registry, monkeypatch):
+    """Models load in parallel at startup, on demand otherwise, and never twice"""
+    loads = []
+    original = registry._load
+    monkeypatch.setattr(registry, "_load", lambda name: loads.append(name) or original(name))
+
+    assert registry.get("commitment").model_id == "stub/commitment"
+    registry.load_all(workers=2)
+    registry.get("esg")
+
+    assert sorted(loads) == ["commitment", "esg"]
@@ -0,0 +1,71 @@
+from analyze.result_cache import ResultCache
+
+
+def test_keys_ignore_whitespace_but_not_models():
+    cache = ResultCache(None, max_memory_bytes=1024)
+    key = cache.key("analyze", "We will  cut\nemissions", "model-a")
+
+    assert key == cache.key("analyze", " We will cut emissions ", "model-a")
+    assert key != cache.key("analyze", "We will cut emissions", "model-b")
+    assert key != cache.key("esg", "We will cut emissions", "model-a")
+    assert key != ResultCache(None, 1024, version="2").key("analyze", "We will cut emissions", "model-a")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    # Each value encodes to 12 bytes of JSON, so only two fit
+    cache = ResultCache(None, max_memory_bytes=30)
+    cache.set("a:1", "x" * 10)
+    cache.set("a:2", "y" * 10)
+    cache.get("a:1")
+    cache.set("a:3", "z" * 10)
+
+    assert cache.get("a:2") is None
+    assert cache.get("a:1") == "x" * 10
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_bytes"] == 24
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    first = ResultCache(path, max_memory_bytes=1024)
+    key = first.key("analyze", "text")
+    first.set(key, {"analysis": {"commitment_probability": 0.5}})
+
+    second = ResultCache(path, max_memory_bytes=1024)
+    assert second.get(key) == {"analysis": {"commitment_probability": 0.5}}
+    assert second.get(key) == {"analysis": {"commitment_probability": 0.5}}
+    stats = second.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["hit_rate"] == 1.0
+
+
+def test_invalidate_by_namespace(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), max_memory_bytes=1024)
+    analyze_key = cache.key("analyze", "text")
+    esg_key = cache.key("esg", "text")
+    cache.set(analyze_key, 1)
+    cache.set(esg_key, 2)
+
+    assert cache.invalidate(namespace="analyze") == 1
+    assert cache.get(analyze_key) is None
+    assert cache.get(esg_key) == 2
+    assert cache.invalidate() == 1
+    assert cache.get(esg_key) is None
+
+
+def test_hits_update_last_access_in_batches(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    cache = ResultCache(path, max_memory_bytes=1024, touch_batch=3)
+    keys = [cache.key("analyze", f"text {i}") for i in range(3)]
+    for key in keys:
+        cache.set(key, 1)
+    written = dict(cache._db.execute("SELECT key, last_access FROM results").fetchall())
+
+    cache.get(keys[0])
+    cache.get(keys[1])
+    assert dict(cache._db.execute("SELECT key, last_access FROM results").fetchall()) == written
+    cache.get(keys[2])
+    touched = dict(cache._db.execute("SELECT key, last_access FROM results").fetchall())
+    assert all(touched[key] > written[key] for key in keys)
@@ -0,0 +1,68 @@
+from analyze.cascade import score_cascade, score_esg_sentences
+from analyze.inference import ESG_CATEGORIES, build_analysis_result
+from analyze.sentence_cache import SentenceCache
+
+BOILERPLATE = ("We will reduce our emissions 30% by 2030. Our code of conduct applies to every employee. "
+               "We are committed to transparent reporting. ")
+REPORT_2009 = BOILERPLATE + "In 2009 we opened two plants."
+REPORT_2010 = BOILERPLATE + "In 2010 we will   open a third plant."
+
+
+class CountingScorer:
+    def __init__(self):
+        self.scored = []
+
+    def score(self, texts):
+        self.scored.extend(texts)
+        return [build_analysis_result(0.8, 0.3) for _ in texts]
+
+
+def test_only_unseen_sentences_are_scored(tmp_path):
+    cache = SentenceCache(str(tmp_path / "sentences.sqlite3"))
+    scorer = CountingScorer()
+
+    first, stats = cache.score("m", ["A b.", "C d.", "A b."], scorer.score)
+    assert scorer.scored == ["A b.", "C d."] and stats["hits"] == 0 and first[0] == first[2]
+
+    # Whitespace differences share a key, other models do not share entries
+    second, stats = cache.score("m", ["A  b.", "E f."], scorer.score)
+    assert scorer.scored[2:] == ["E f."] and stats["hit_rate"] == 0.5 and second[0] == first[0]
+    cache.score("other", ["A b."], scorer.score)
+    assert scorer.scored[3:] == ["A b."]
+
+    # Entries survive a restart
+    assert SentenceCache(str(tmp_path / "sentences.sqlite3")).score("m", ["C d."], scorer.score)[1]["hits"] == 1
+
+
+def test_year_over_year_reports_reuse_boilerplate(tmp_path):
+    cache = SentenceCache(str(tmp_path / "sentences.sqlite3"))
+    scorer = CountingScorer()
+
+    score_cascade(scorer.score, REPORT_2009, cache=cache, model="climate")
+    scored_2009 = len(scorer.scored)
+    result = score_cascade(scorer.score, REPORT_2010, cache=cache, model="climate")
+
+    assert scorer.scored[scored_2009:] == ["In 2010 we will   open a third plant."]
+    stats = result["cascade"]["sentence_cache"]
+    assert stats["hits"] == 2 and 0.5 < stats["inference_saved"] < 1.0
+    assert cache.stats()["entries"] == scored_2009 + 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SentenceCache(str(tmp_path / "sentences.sqlite3"), max_entries=10)
+    scorer = CountingScorer()
+    cache.score("m", [f"Sentence {i}." for i in range(1200)], scorer.score, batch_size=100)
+
+    assert cache.stats()["entries"] == 10 and cache.stats()["evictions"] == 1190
+
+
+def test_esg_scores_combine_sentences(tmp_path):
+    cache = SentenceCache(str(tmp_path / "sentences.sqlite3"))
+
+    def score(texts):
+        return [{category: 1.0 if category == "Climate Change" else 0.0 for category in ESG_CATEGORIES}
+                for _ in texts]
+
+    result = score_esg_sentences(score, REPORT_2009, cache=cache, model="esg", include_sentences=True)
+    assert result["scores"]["Climate Change"] == 1.0 and sum(result["scores"].values()) == 1.0
+    assert result["sentences"]["sentences"] == 4 and len(result["sentences"]["sentence_scores"]) == 4
@@ -0,0 +1,53 @@
+import importlib
+
+from analyze.startup import Startup
+
+
+def test_components_are_timed_and_reported_ready():
+    startup = Startup()
+
+    def target():
+        with startup.component("nltk"):
+            pass
+        with startup.component("models"):
+            pass
+
+    assert not startup.ready
+    startup.start(target)
+    assert startup.wait(5)
+
+    stats = startup.stats()
+    assert stats["ready"] and startup.ready
+    assert set(stats["components"]) == {"nltk", "models"}
+    assert all(c["status"] == "ready" and c["ms"] >= 0 for c in stats["components"].values())
+    assert stats["total_ms"] >= 0
+
+
+def test_failed_component_keeps_service_unready():
+    startup = Startup()
+
+    def target():
+        with startup.component("models"):
+            raise OSError("no weights")
+
+    startup.start(target)
+    assert startup.wait(5)
+
+    stats = startup.stats()
+    assert stats["finished"] and not stats["ready"]
+    assert stats["components"]["models"]["status"] == "failed"
+    assert stats["components"]["models"]["error"] == "no weights"
+
+
+def test_ready_endpoint_is_503_before_startup(monkeypatch):
+    """Without the startup hook nothing has loaded, but the app still answers"""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    main = importlib.import_module("main")
+    client = TestClient(main.app)
+
+    assert client.get("/").status_code == 200
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
@@ -0,0 +1,101 @@
+import importlib
+import json
+
+import fitz
+import pytest
+
+from analyze.extraction import extract_document
+from analyze.inference import ESG_CATEGORIES, build_analysis_result
+from analyze.streaming import PageAggregator, encode_record, page_batches, page_groups, split_sections
+
+
+def make_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        doc.new_page().insert_text((72, 72), f"Page {number}: we will cut emissions by {number}%.")
+    return doc.tobytes()
+
+
+async def run_inline(fn, *args):
+    return fn(*args)
+
+
+def esg(category):
+    return {c: 1.0 if c == category else 0.0 for c in ESG_CATEGORIES}
+
+
+def test_page_batches_start_small_and_grow():
+    assert page_batches(20, largest=8) == [(0, 1), (1, 3), (3, 7), (7, 15), (15, 20)]
+    assert page_batches(0) == []
+
+
+def test_sections_keep_exact_offsets():
+    text = "short\n" + "x" * 25 + "\nend\n\ntail"
+    sections = split_sections(text, max_chars=10)
+
+    assert all(len(section) <= 10 for _, section in sections)
+    assert all(text[start:start + len(section)] == section for start, section in sections)
+    assert "".join(section for _, section in sections).replace("\n", "") == text.replace("\n", "")
+
+
+async def test_pdf_page_groups_match_the_extracted_document():
+    data = make_pdf(6)
+    pages = [page async for group in page_groups(data, ".pdf", run_inline, largest=2) for page in group]
+    document = extract_document(data, ".pdf")
+
+    assert [number for number, _, _ in pages] == [1, 2, 3, 4, 5, 6]
+    assert [(start, text) for _, start, text in pages] == [(p.start, p.text) for p in document.pages]
+
+
+def test_aggregator_weights_pages_by_characters():
+    aggregator = PageAggregator()
+    assert aggregator.result() is None
+
+    aggregator.add(300, build_analysis_result(1.0, 0.0), esg("Climate Change"))
+    aggregator.add(100, build_analysis_result(0.0, 1.0), esg("Human Capital"))
+    result = aggregator.result("weighted")
+
+    assert result["analysis"]["commitment_probability"] == pytest.approx(0.75)
+    assert result["analysis"]["specificity_probability"] == pytest.approx(0.25)
+    assert result["esg"]["Climate Change"] == pytest.approx(0.75)
+    assert aggregator.result("max")["esg"]["Human Capital"] == pytest.approx(0.5)
+
+
+def test_sse_records_are_named_events():
+    assert encode_record({"type": "page", "page": 1}, "sse") == 'event: page\ndata: {"type": "page", "page": 1}\n\n'
+
+
+def test_stream_endpoint_sends_pages_then_summary(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from analyze.document_store import DocumentStore
+    from analyze.result_cache import ResultCache
+    from analyze.upload_store import UploadStore
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    main = importlib.import_module("main")
+    # Keep the upload and its index out of the repo's uploads/ and cache/ directories
+    monkeypatch.setattr(main, "upload_store", UploadStore(str(tmp_path / "uploads"), 1 << 30, 3600))
+    monkeypatch.setattr(main, "document_store", DocumentStore(str(tmp_path / "documents.sqlite3")))
+    monkeypatch.setattr(main, "result_cache", ResultCache(None, max_memory_bytes=1 << 20))
+
+    async def climate(text):
+        return build_analysis_result(0.8, 0.4)
+
+    async def classify(text):
+        return esg("Climate Change")
+
+    monkeypatch.setattr(main.climate_batcher, "submit", climate)
+    monkeypatch.setattr(main.esg_batcher, "submit", classify)
+    monkeypatch.setattr(main.execution, "run_cpu", run_inline)
+    client = TestClient(main.app)
+
+    response = client.post("/upload/stream", files={"file": ("report.pdf", make_pdf(3))})
+    records = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [r["type"] for r in records] == ["page", "page", "page", "summary"]
+    assert [r["page"] for r in records[:3]] == [1, 2, 3]
+    summary = records[-1]
+    assert summary["pages"] == 3 and summary["scored_pages"] == 3
+    assert summary["analysis"]["commitment_probability"] == pytest.approx(0.8)
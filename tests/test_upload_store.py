@@ -0,0 +1,94 @@
+import io
+import os
+
+from analyze.upload_store import UploadStore
+
+REPORT = b"We will cut emissions by 40% by 2030.\n" * 100
+OTHER = b"Our suppliers must report Scope 3 emissions.\n" * 100
+
+
+def test_duplicate_uploads_are_stored_once(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=1 << 20, max_age=3600)
+    first = store.ingest(io.BytesIO(REPORT), ".txt", max_size=1 << 20)
+    second = store.ingest(io.BytesIO(REPORT), ".txt", max_size=1 << 20)
+
+    assert first.path == second.path and second.duplicate
+    stats = store.stats()
+    assert stats["uploads"] == 2 and stats["duplicates"] == 1
+    assert stats["bytes_deduplicated"] == len(REPORT)
+    assert stats["blobs"] == 1
+
+
+def test_extracted_text_is_cached_next_to_the_blob(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=1 << 20, max_age=3600)
+    upload = store.ingest(io.BytesIO(REPORT), ".txt", max_size=1 << 20)
+
+    assert store.text(upload.sha256, ".txt") is None
+    store.put_text(upload.sha256, ".txt", REPORT.decode())
+    assert store.text(upload.sha256, ".txt") == REPORT.decode()
+    stats = store.stats()
+    assert stats["text_hits"] == 1 and stats["text_misses"] == 1
+    assert stats["bytes"] == 2 * len(REPORT)
+
+
+def test_eviction_drops_expired_then_least_recently_used(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=len(REPORT) + 2 * len(OTHER) - 1, max_age=3600)
+    old = store.ingest(io.BytesIO(REPORT), ".txt", max_size=1 << 20)
+    new = store.ingest(io.BytesIO(OTHER), ".txt", max_size=1 << 20)
+
+    # Within both limits nothing goes; text pushes the store over max_bytes and the older blob is dropped
+    assert store.evict() == 0
+    store.put_text(new.sha256, ".txt", OTHER.decode())
+    assert store.evict() == 1
+    assert not os.path.exists(old.path) and os.path.exists(new.path)
+
+    # Everything left is expired an hour later
+    assert store.evict(now=os.path.getmtime(new.path) + 7200) == 1
+    assert store.stats()["blobs"] == 0
+    assert sorted(os.listdir(tmp_path)) == ["index.sqlite3"]
+
+
+def test_same_bytes_with_another_extension_are_a_separate_blob(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=1 << 20, max_age=3600)
+    as_text = store.ingest(io.BytesIO(REPORT), ".txt", max_size=1 << 20)
+    store.put_text(as_text.sha256, ".txt", "extracted as text")
+    as_pdf = store.ingest(io.BytesIO(REPORT), ".pdf", max_size=1 << 20)
+
+    assert not as_pdf.duplicate and as_pdf.path != as_text.path
+    assert store.text(as_pdf.sha256, ".pdf") is None
+    assert store.stats()["blobs"] == 2
+
+    # Both blobs are indexed, so both are evicted once expired
+    assert store.evict(now=os.path.getmtime(as_pdf.path) + 7200) == 2
+    assert sorted(os.listdir(tmp_path)) == ["index.sqlite3"]
+
+
+def test_index_keyed_by_sha256_alone_is_migrated(tmp_path):
+    import sqlite3
+
+    upload = UploadStore(str(tmp_path), max_bytes=1 << 20, max_age=3600).ingest(
+        io.BytesIO(REPORT), ".txt", max_size=1 << 20)
+    connection = sqlite3.connect(str(tmp_path / "index.sqlite3"))
+    connection.execute("DROP TABLE blobs")
+    connection.execute("CREATE TABLE blobs (sha256 TEXT PRIMARY KEY, extension TEXT, size INTEGER, "
+                       "text_size INTEGER, uploads INTEGER, created REAL, last_access REAL)")
+    connection.execute("INSERT INTO blobs VALUES (?, '.txt', ?, 0, 1, 0, 0)", (upload.sha256, len(REPORT)))
+    connection.commit()
+    (tmp_path / f"{upload.sha256}.extracted.txt").write_text("old text")
+
+    # Opening the index migrates it
+    store = UploadStore(str(tmp_path), max_bytes=1 << 20, max_age=3600)
+    assert store.stats()["blobs"] == 1
+    assert store.text(upload.sha256, ".txt") == "old text"
+
+
+def test_blobs_of_pending_jobs_are_not_evicted(tmp_path):
+    pinned = set()
+    store = UploadStore(str(tmp_path), max_bytes=1 << 20, max_age=3600, pinned=lambda: pinned)
+    queued = store.ingest(io.BytesIO(REPORT), ".txt", max_size=1 << 20)
+    done = store.ingest(io.BytesIO(OTHER), ".txt", max_size=1 << 20)
+    pinned.add(queued.path)
+
+    assert store.evict(now=os.path.getmtime(done.path) + 7200) == 1
+    assert os.path.exists(queued.path) and not os.path.exists(done.path)
+    assert store.stats()["pinned_skips"] == 1